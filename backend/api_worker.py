@@ -0,0 +1,44 @@
+from fastapi import FastAPI, APIRouter
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.routing import APIRoute
+import asyncio
+import os
+
+from .app.api.routes import router
+from .app.api.editor import router as editor_router
+from .app.engine.content_registry import ContentRegistry
+from .app.engine.state_service import StateReplica, REPLICA_ROUTES
+
+# Stateless API worker: serves the read-mostly GET routes from a replica of
+# the simulation state. Run several of these next to backend.main:
+#   STATE_SOCKET=run/state.sock uvicorn backend.main:app --port 8000
+#   STATE_SOCKET=run/state.sock uvicorn backend.api_worker:app --workers 4 --port 8010
+# and route the paths in REPLICA_ROUTES (GET only) to port 8010.
+# The socket directory must be private (0700); backend.main creates it.
+
+app = FastAPI(docs_url=None, redoc_url=None)
+
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"], # Listing cursor, readable by the browser client
+)
+
+replica_router = APIRouter()
+for route in router.routes + editor_router.routes:
+    if isinstance(route, APIRoute) and route.path in REPLICA_ROUTES and "GET" in route.methods:
+        replica_router.routes.append(route)
+app.include_router(replica_router)
+
+@app.on_event("startup")
+async def startup_event():
+    path = os.environ.get("STATE_SOCKET")
+    if not path:
+        raise RuntimeError("STATE_SOCKET is required (e.g. run/state.sock, same as backend.main)")
+    asyncio.create_task(StateReplica(path).run())
+
+    # Editor saves happen in the simulation process: follow them through the files
+    asyncio.create_task(ContentRegistry.get_instance().watch())
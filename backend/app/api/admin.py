@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Request, Form, Response, Depends, HTTPException, status
-from fastapi.responses import HTMLResponse, RedirectResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, StreamingResponse
 from fastapi.templating import Jinja2Templates
 from ..engine.state_manager import StateManager
-import psutil
+from ..core.metrics import Metrics, SamplingProfiler
+from ..services.dashboard_service import DashboardFeed
+from ..services.leaderboard_service import LeaderboardService
 import os
 import time
-from datetime import datetime
 import hashlib
 
 router = APIRouter(prefix="/admin")
@@ -77,54 +78,63 @@ async def logout():
 async def dashboard(request: Request, admin = Depends(get_current_admin)):
     if not admin: return RedirectResponse("/admin/login")
     
-    state = StateManager.get_instance()
-    
-    # Calculate stats
-    online_players = sum(1 for p in state.players.values() if p.is_online)
-    total_players = len(state.players)
-    
-    # Server Stats
-    process = psutil.Process()
-    cpu_usage = psutil.cpu_percent(interval=None) # System wide or process? System wide is usually more useful for VPS monitoring.
-    # Actually psutil.cpu_percent() without interval is non-blocking but might be 0 first call.
-    # Let's use system wide.
-    sys_cpu = psutil.cpu_percent()
-    sys_mem = psutil.virtual_memory().percent
-    
-    stats = {
-        "online_players": online_players,
-        "total_players": total_players,
-        "cpu_usage": sys_cpu,
-        "memory_usage": sys_mem
-    }
-    
-    # Top Online Players
-    online_list = [p for p in state.players.values() if p.is_online]
-    # Sort by level desc
-    online_list.sort(key=lambda x: x.level, reverse=True)
-    top_players = online_list[:10]
+    # Initial render; the page then follows /admin/dashboard/stream
+    stats = DashboardFeed.get_instance().snapshot()
     
     return templates.TemplateResponse("admin/dashboard.html", {
         "request": request, 
         "stats": stats, 
-        "top_players": top_players,
+        "top_players": stats["top_players"],
         "active_page": "dashboard",
-        "server_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        "server_time": stats["server_time"]
     })
 
+@router.get("/dashboard/stream")
+async def dashboard_stream(request: Request, admin = Depends(get_current_admin)):
+    if not admin: raise HTTPException(status_code=401, detail="Admin login required")
+    return StreamingResponse(
+        DashboardFeed.get_instance().stream(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/metrics")
+async def metrics_snapshot(admin = Depends(get_current_admin)):
+    if not admin: raise HTTPException(status_code=401, detail="Admin login required")
+    # Span times in ms (p50/p95/p99/max over the last 2048 samples) + message counters
+    return Metrics.get_instance().snapshot()
+
+@router.post("/profile")
+async def capture_profile(seconds: float = 5.0, admin = Depends(get_current_admin)):
+    if not admin: raise HTTPException(status_code=401, detail="Admin login required")
+    import asyncio
+    import threading
+
+    # Sample the event loop thread from a worker thread while the loop keeps running
+    loop_thread = threading.get_ident()
+    seconds = max(0.5, min(seconds, 60.0))
+    return await asyncio.to_thread(SamplingProfiler.capture, loop_thread, seconds)
+
 @router.get("/users", response_class=HTMLResponse)
-async def users_list(request: Request, admin = Depends(get_current_admin)):
+async def users_list(request: Request, admin = Depends(get_current_admin), page: int = 1, per_page: int = 50, sort: str = "online", q: str = ""):
     if not admin: return RedirectResponse("/admin/login")
     
     state = StateManager.get_instance()
-    all_users = list(state.players.values())
-    
-    # Sort: Online first, then new users
-    all_users.sort(key=lambda x: (not x.is_online, x.name))
+    directory = state.get_player_directory()
+
+    # Pages come straight from the sorted indexes (O(page size))
+    if sort not in directory.SORTS: sort = "online"
+    per_page = max(10, min(per_page, 200))
+    page = max(1, page)
+    q = q.strip()
+    page_ids, total = directory.page(sort, q, (page - 1) * per_page, per_page)
+    total_pages = max(1, (total + per_page - 1) // per_page)
     
     # Prepare display data
     display_users = []
-    for u in all_users:
+    for pid in page_ids:
+        u = state.players.get(pid)
+        if not u: continue
         # Avoid breaking if some fields missing
         last_seen = "Unknown" 
         # If we had a last_login timestamp, we'd use it.
@@ -148,6 +158,13 @@ async def users_list(request: Request, admin = Depends(get_current_admin)):
     return templates.TemplateResponse("admin/users.html", {
         "request": request,
         "users": display_users,
+        "total_users": len(state.players),
+        "total": total,
+        "page": page,
+        "total_pages": total_pages,
+        "per_page": per_page,
+        "sort": sort,
+        "q": q,
         "active_page": "users"
     })
 
@@ -211,6 +228,8 @@ async def user_update(
     
     # Recalculate derived stats (next_level_xp, etc)
     player.calculate_stats()
+    state.player_directory.touch(player)
+    LeaderboardService.get_instance().touch(player)
     
     # Save State
     # Assuming the game loop or StateManager saves periodically, 
@@ -227,7 +246,8 @@ async def user_delete(request: Request, player_id: str, admin = Depends(get_curr
     
     state = StateManager.get_instance()
     if player_id in state.players:
-        del state.players[player_id]
+        state.delete_player(player_id)
+        LeaderboardService.get_instance().remove(player_id)
         # Force save logic would be good here
         
     return RedirectResponse("/admin/users", status_code=status.HTTP_303_SEE_OTHER)
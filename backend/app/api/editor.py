@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException, Header, Depends
+from fastapi import APIRouter, HTTPException, Header, Depends, Request
 from ..engine.state_manager import StateManager
+from ..engine.content_registry import ContentRegistry
+from ..core.response_cache import ResponseCache
+import asyncio
 import json
 import os
 from ..data.items import ITEMS
 
 router = APIRouter()
 state_manager = StateManager.get_instance()
+content = ContentRegistry.get_instance()
+response_cache = ResponseCache.get_instance()
 
 async def verify_admin(x_player_id: str = Header(None, alias="X-Player-ID")):
     if not x_player_id:
@@ -21,25 +26,25 @@ async def verify_admin(x_player_id: str = Header(None, alias="X-Player-ID")):
     return player
 
 @router.get("/editor/world")
-async def get_world_data():
+async def get_world_data(request: Request):
     if not hasattr(state_manager, 'world_data'):
         # Try to load if not present
         state_manager.load_world_data()
-    return state_manager.world_data
+    # Largest payload (Pathfinder downloads it whole): cached + compressed, 304 on revalidation
+    return response_cache.respond(request, "world", content.versions["world"], lambda: state_manager.world_data)
 
 @router.post("/editor/world", dependencies=[Depends(verify_admin)])
 async def save_world_data(data: dict):
     try:
         path = "backend/app/data/world.json"
-        with open(path, "w") as f:
-            json.dump(data, f, indent=4)
-        
-        # Reload state
-        state_manager.load_world_data()
+        def write():
+            with open(path, "w") as f:
+                json.dump(data, f, indent=4)
+        await asyncio.to_thread(write)
         
-        # Broadcast update
-        if hasattr(state_manager, 'connection_manager'):
-            await state_manager.connection_manager.broadcast({"type": "server_update"})
+        # Incremental reload: only changed maps/spawns are rebuilt and
+        # players on affected maps get a targeted map_update
+        await state_manager.reload_world_data()
 
         return {"message": "World saved"}
     except Exception as e:
@@ -47,11 +52,7 @@ async def save_world_data(data: dict):
 
 @router.get("/editor/missions", dependencies=[Depends(verify_admin)])
 async def get_missions_editor():
-    try:
-        with open("backend/app/data/missions.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+    return content.get("missions")
 
 @router.post("/editor/missions", dependencies=[Depends(verify_admin)])
 async def save_missions_editor(data: dict):
@@ -74,17 +75,14 @@ async def save_items(data: dict):
         path = "backend/app/data/items.json"
         with open(path, "w") as f:
             json.dump(data, f, indent=4)
+        content.reload("items")
         return {"message": "Items saved"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/editor/rewards", dependencies=[Depends(verify_admin)])
 async def get_rewards_editor():
-    try:
-        with open("backend/app/data/rewards.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {"rewards": []}
+    return content.get("rewards")
 
 @router.post("/editor/rewards", dependencies=[Depends(verify_admin)])
 async def save_rewards_editor(data: dict):
@@ -92,6 +90,7 @@ async def save_rewards_editor(data: dict):
         path = "backend/app/data/rewards.json"
         with open(path, "w") as f:
             json.dump(data, f, indent=4)
+        content.reload("rewards")
         return {"message": "Rewards saved"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -99,11 +98,7 @@ async def save_rewards_editor(data: dict):
 @router.get("/editor/npcs", dependencies=[Depends(verify_admin)])
 async def get_npcs_editor():
     # Return raw dict from JSON source to preserve structure expected by Editor
-    try:
-        with open("backend/app/data/npcs.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+    return content.get("npcs")
 
 @router.post("/editor/npcs", dependencies=[Depends(verify_admin)])
 async def save_npcs_editor(data: dict):
@@ -139,8 +134,7 @@ async def get_enhancement_config():
 @router.post("/editor/enhancement", dependencies=[Depends(verify_admin)])
 async def save_enhancement_config(data: dict):
     try:
-        UpgradeService.config = data
-        UpgradeService.save_config()
+        UpgradeService.save_config(data)
         return {"message": "Config saved"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,28 +1,27 @@
-from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Header
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, Header, Request, Response
 from typing import List
 import uuid
 import random
-import json
 import os
 
 from ..models.player import Player, PlayerClass, PlayerStats, Position, PlayerState
-from ..models.item import Item, ItemType, ItemSlot, ItemRarity, ItemStats
+from ..models.item import ItemType, ItemSlot, ItemRarity, BulkItemQuery
 from ..models.map import GameMap
 from ..engine.state_manager import StateManager
-from ..engine.state_manager import StateManager
+from ..engine.content_registry import ContentRegistry
+from ..core.response_cache import ResponseCache
+from ..core.event_bus import EventBus
 from ..services.inventory_service import InventoryService
 from ..services.upgrade_service import UpgradeService
+from ..services.listing_service import ListingService
+from ..services.leaderboard_service import LeaderboardService
 
 router = APIRouter()
 state_manager = StateManager.get_instance()
-
-# Load Items
-ITEMS_DATA = {}
-try:
-    with open("backend/app/data/items.json", "r") as f:
-        ITEMS_DATA = json.load(f)
-except Exception as e:
-    print(f"Error loading items in routes: {e}")
+content = ContentRegistry.get_instance()
+response_cache = ResponseCache.get_instance()
+leaderboard = LeaderboardService.get_instance()
+event_bus = EventBus.get_instance()
 
 import hashlib
 
@@ -75,6 +74,7 @@ async def register(name: str, password: str, p_class: PlayerClass):
     player.stats.hp = player.stats.max_hp # Ensure full HP
 
     state_manager.add_player(player)
+    leaderboard.touch(player)
     
     # Force immediate persistence
     from ..services.persistence_service import PersistenceService
@@ -97,24 +97,37 @@ async def login(name: str, password: str):
     
     raise HTTPException(status_code=404, detail="Player not found")
 
+def list_map_entities(entities: list, get_xy, getters: dict, default_fields: list, fields: str, area: dict,
+                      limit: int, cursor: str) -> Response:
+    """Shared filter -> paginate -> project path for map listings."""
+    try:
+        names = ListingService.parse_fields(fields, getters, default_fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if area:
+        entities = [e for e in entities if ListingService.in_area(*get_xy(e), area)]
+
+    page, next_cursor = ListingService.paginate(entities, limit, cursor)
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else {}
+    return Response(content=ListingService.project(page, getters, names), media_type="application/json", headers=headers)
+
+def parse_area(x, y, radius, min_x, min_y, max_x, max_y):
+    try:
+        return ListingService.make_area(x, y, radius, min_x, min_y, max_x, max_y)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
 @router.get("/map/{map_id}/players")
-async def get_map_players(map_id: str):
-    # Return list of players in the map (basic info only)
-    players = []
-    for p in state_manager.players.values():
-        if p.current_map_id == map_id and p.is_online:
-            # Return subset of info to avoid leaking tokens/state
-            players.append({
-                "id": p.id,
-                "name": p.name,
-                "level": p.level,
-                "p_class": p.p_class,
-                "position": p.position,
-                "hp": p.stats.hp,
-                "max_hp": p.stats.max_hp,
-                "state": p.state
-            })
-    return players
+async def get_map_players(map_id: str, fields: str = None, x: float = None, y: float = None, radius: float = None,
+                          min_x: float = None, min_y: float = None, max_x: float = None, max_y: float = None,
+                          limit: int = None, cursor: str = None):
+    # Return list of players in the map (basic info only, never tokens/state)
+    area = parse_area(x, y, radius, min_x, min_y, max_x, max_y)
+    return list_map_entities(
+        state_manager.get_map_players(map_id), lambda p: (p.position.x, p.position.y),
+        ListingService.PLAYER_FIELDS, ListingService.PLAYER_DEFAULT_FIELDS, fields, area, limit, cursor
+    )
 
 @router.get("/player/{player_id}", response_model=Player)
 async def get_player(player_id: str):
@@ -124,23 +137,64 @@ async def get_player(player_id: str):
     state_manager.update_player_activity(player_id)
     return player
 
+def leaderboard_rows(board: str, rows: list) -> list:
+    result = []
+    for rank, player_id, score in rows:
+        p = state_manager.players.get(player_id)
+        if not p: continue
+        result.append({
+            "rank": rank,
+            "player_id": player_id,
+            "name": p.name,
+            "level": p.level,
+            "p_class": p.p_class,
+            # level board: [level, xp]
+            "score": list(score) if board == "level" else score[0]
+        })
+    return result
+
+@router.get("/leaderboard/{board}")
+async def get_leaderboard(board: str, offset: int = 0, limit: int = 50):
+    if board not in LeaderboardService.BOARDS:
+        raise HTTPException(status_code=404, detail=f"Unknown leaderboard '{board}'")
+    leaderboard.ensure(state_manager.players)
+    limit = max(1, min(limit, 100))
+    offset = max(0, offset)
+    return {
+        "board": board,
+        "total": len(leaderboard.entries[board]),
+        "entries": leaderboard_rows(board, leaderboard.page(board, offset, limit))
+    }
+
+@router.get("/leaderboard/{board}/player/{player_id}")
+async def get_leaderboard_rank(board: str, player_id: str, radius: int = 5):
+    if board not in LeaderboardService.BOARDS:
+        raise HTTPException(status_code=404, detail=f"Unknown leaderboard '{board}'")
+    player = state_manager.get_player(player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+    leaderboard.ensure(state_manager.players)
+    leaderboard.touch(player)
+    radius = max(0, min(radius, 25))
+    return {
+        "board": board,
+        "rank": leaderboard.rank(board, player_id),
+        "total": len(leaderboard.entries[board]),
+        "around": leaderboard_rows(board, leaderboard.around(board, player_id, radius))
+    }
+
 @router.post("/player/{player_id}/open_chest")
 async def open_starter_chest(player_id: str):
      # Deprecated or redirected to claim_reward('starter_chest')
      return await claim_reward(player_id, "starter_chest")
 
 def load_rewards_data():
-    import json
-    try:
-        with open("backend/app/data/rewards.json", "r") as f:
-            data = json.load(f)
-            return data.get("rewards", [])
-    except FileNotFoundError:
-        return []
+    # Served from memory; reloaded by the editor / file watcher
+    return content.get("rewards").get("rewards", [])
 
 @router.get("/rewards")
-async def get_rewards():
-    return load_rewards_data()
+async def get_rewards(request: Request):
+    return response_cache.respond(request, "rewards", content.versions["rewards"], load_rewards_data)
 
 @router.post("/player/{player_id}/reward/claim")
 async def claim_reward(player_id: str, reward_id: str):
@@ -150,8 +204,7 @@ async def claim_reward(player_id: str, reward_id: str):
     state_manager.update_player_activity(player_id)
 
     import time
-    from ..data.items import ITEMS
-    import uuid
+    from ..data.items import ITEMS, create_item
     
     rewards_list = load_rewards_data()
     reward_config = next((r for r in rewards_list if r["id"] == reward_id), None)
@@ -200,19 +253,7 @@ async def claim_reward(player_id: str, reward_id: str):
             # Item
             template = ITEMS.get(item_id)
             if template:
-                new_stats = template["stats"].model_copy()
-                new_item = Item(
-                    id=f"{item_id}_{uuid.uuid4().hex[:8]}",
-                    name=template["name"],
-                    type=template["type"],
-                    slot=template["slot"],
-                    rarity=template["rarity"],
-                    stats=new_stats,
-                    power_score=template["power_score"],
-                    icon=template["icon"],
-                    stackable=template["stackable"],
-                    quantity=qty
-                )
+                new_item = create_item(item_id, quantity=qty)
                 InventoryService.add_item(player, new_item)
                 granted_items.append(new_item)
                 
@@ -242,8 +283,14 @@ async def claim_reward(player_id: str, reward_id: str):
 
 
 @router.get("/map/{map_id}/npcs")
-async def get_map_npcs(map_id: str):
-    return [npc for npc in state_manager.npcs.values() if npc.map_id == map_id]
+async def get_map_npcs(map_id: str, request: Request):
+    # Only real maps get a cache entry (the key comes from the path)
+    if not state_manager.get_map(map_id):
+        raise HTTPException(404, "Map not found")
+    return response_cache.respond(
+        request, f"npcs:{map_id}", content.versions["npcs"],
+        lambda: [npc for npc in state_manager.npcs.values() if npc.map_id == map_id]
+    )
 
 @router.post("/player/{player_id}/interact/{npc_id}")
 async def interact_npc(player_id: str, npc_id: str):
@@ -286,7 +333,7 @@ async def buy_item(player_id: str, npc_id: str, item_id: str):
         raise HTTPException(status_code=400, detail="Item not sold here")
         
     # Get Item Template
-    from ..data.items import ITEMS
+    from ..data.items import ITEMS, create_item
     template = ITEMS.get(item_id)
     if not template:
         raise HTTPException(status_code=404, detail="Item template not found")
@@ -305,30 +352,23 @@ async def buy_item(player_id: str, npc_id: str, item_id: str):
         
     # Deduct Gold
     player.gold -= price
+    leaderboard.touch(player)
     
     # Add Item
-    stats_data = template["stats"]
-    if hasattr(stats_data, "model_copy"):
-        stats_val = stats_data.model_copy()
-    else:
-        stats_val = ItemStats(**stats_data)
-
-    new_item = Item(
-        id=f"{item_id}_{uuid.uuid4().hex[:8]}",
-        name=template["name"],
-        type=template["type"],
-        slot=template["slot"],
-        rarity=template["rarity"],
-        stats=stats_val,
-        power_score=template.get("power_score", 0),
-        icon=template.get("icon", "📦"),
-        stackable=template.get("stackable", False),
-        quantity=1
-    )
+    new_item = create_item(item_id, quantity=1)
     InventoryService.add_item(player, new_item)
     
     return {"message": "Item purchased", "gold": player.gold, "inventory": player.inventory}
 
+def notify_level_up(player: Player):
+    leaderboard.ensure(state_manager.players) # Rank against every account, not only touched ones
+    leaderboard.touch(player)
+    event_bus.publish("level_up", {
+        "player_id": player.id,
+        "new_level": player.level,
+        "rank": leaderboard.rank("level", player.id)
+    }, player.id)
+
 @router.post("/player/{player_id}/use_item")
 async def use_item(player_id: str, item_id: str):
     player = state_manager.get_player(player_id)
@@ -339,11 +379,7 @@ async def use_item(player_id: str, item_id: str):
         raise HTTPException(status_code=400, detail="Cannot use items while dead")
         
     # Find item
-    item_to_use = None
-    for item in player.inventory:
-        if item.id == item_id:
-            item_to_use = item
-            break
+    item_to_use = player.inventory.get(item_id)
             
     if not item_to_use:
         raise HTTPException(status_code=404, detail="Item not found")
@@ -352,35 +388,9 @@ async def use_item(player_id: str, item_id: str):
         raise HTTPException(status_code=400, detail="Item is not consumable")
         
     # Apply Effects
-    effects = []
-    
-    if item_to_use.stats.hp > 0:
-        healed = item_to_use.stats.hp
-        player.stats.hp = min(player.stats.hp + healed, player.stats.max_hp)
-        effects.append(f"Healed {healed} HP")
-        
-    if item_to_use.stats.xp > 0:
-        res = player.gain_xp(item_to_use.stats.xp)
-        effects.append(f"Gained {item_to_use.stats.xp} XP")
-        if res['leveled_up']:
-            effects.append(f"Leveled Up to {res['new_level']}!")
-            try:
-                 import asyncio
-                 asyncio.create_task(state_manager.connection_manager.send_personal_message(player.id, {
-                     "type": "level_up",
-                     "player_id": player.id,
-                     "new_level": res["new_level"]
-                 }))
-            except Exception as e:
-                print(f"Error broadcasting level up: {e}")
-            
-    if item_to_use.stats.gold > 0:
-        player.gold += item_to_use.stats.gold
-        effects.append(f"Gained {item_to_use.stats.gold} Gold")
-        
-    if item_to_use.stats.diamonds > 0:
-        player.diamonds += item_to_use.stats.diamonds
-        effects.append(f"Gained {item_to_use.stats.diamonds} Diamonds")
+    effects, res = InventoryService.apply_consumable(player, item_to_use)
+    if res and res['leveled_up']:
+        notify_level_up(player)
         
     # Consume Item
     if item_to_use.stackable and item_to_use.quantity > 1:
@@ -390,51 +400,102 @@ async def use_item(player_id: str, item_id: str):
             
     return {"message": "Item used", "effects": effects, "player_stats": player.stats}
 
+def resolve_route_target(player: Player, target_id: str):
+    """
+    Resolves an entity id to (map_id, x, y): a live monster, an NPC, a
+    resource, or a monster template (closest live monster by map hops).
+    """
+    monster = state_manager.monsters.get(target_id)
+    if monster:
+        return monster.map_id, monster.position_x, monster.position_y
+
+    npc = state_manager.npcs.get(target_id)
+    if npc:
+        return npc.map_id, npc.x, npc.y
+
+    for map_id, game_map in state_manager.maps.items():
+        for res in game_map.resources or []:
+            if res.id == target_id:
+                return map_id, res.x, res.y
+
+    graph = state_manager.world_graph
+    hops = graph.hops.get(player.current_map_id, {})
+    candidates = [
+        m for m in state_manager.monsters.values()
+        if m.template_id == target_id and m.map_id in hops
+    ]
+    if candidates:
+        monster = min(candidates, key=lambda m: hops[m.map_id])
+        return monster.map_id, monster.position_x, monster.position_y
+
+    return None
+
+@router.get("/player/{player_id}/route")
+async def get_route(player_id: str, target_map_id: str = None, target_id: str = None):
+    player = state_manager.get_player(player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    destination = None
+    if target_id:
+        target = resolve_route_target(player, target_id)
+        if not target:
+            raise HTTPException(status_code=404, detail="Target not found")
+        target_map_id, x, y = target
+        destination = {"x": x, "y": y}
+    elif not target_map_id:
+        raise HTTPException(status_code=400, detail="target_map_id or target_id required")
+
+    steps = state_manager.world_graph.route(
+        player.current_map_id, target_map_id, player.position.x, player.position.y
+    )
+    if steps is None:
+        raise HTTPException(status_code=404, detail=f"No route to {target_map_id}")
+
+    # Same check as /move: flag the first map the player cannot enter yet
+    blocked_at = next((s["target_map_id"] for s in steps if player.level < s["level_requirement"]), None)
+
+    return {
+        "from_map_id": player.current_map_id,
+        "target_map_id": target_map_id,
+        "steps": steps,
+        "destination": destination,
+        "blocked_at": blocked_at
+    }
+
 @router.post("/player/{player_id}/move")
 async def move_player(player_id: str, target_map_id: str, x: float, y: float):
     player = state_manager.get_player(player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
     
+    # Clamp coordinates
+    x = max(0, min(100, x))
+    y = max(0, min(100, y))
+
+    # Coalesce: clients re-send the same target while walking (no-op ack)
+    if target_map_id == player.current_map_id and player.state == PlayerState.MOVING and player.target_position \
+            and player.target_position.x == x and player.target_position.y == y:
+        state_manager.update_player_activity(player_id)
+        return {"message": "Moving", "target": player.target_position, "coalesced": True}
+    
     state_manager.update_player_activity(player_id)
     
     if player.stats.hp <= 0:
         raise HTTPException(status_code=400, detail="Cannot move while dead")
-    
-    # Clamp coordinates
-    x = max(0, min(100, x))
-    y = max(0, min(100, y))
 
     # Explicit Map Switch (Portal)
     if target_map_id != player.current_map_id:
         # Check requirements
         target_map = state_manager.get_map(target_map_id)
-        if target_map:
-            if player.level < target_map.level_requirement:
-                raise HTTPException(status_code=400, detail=f"Level {target_map.level_requirement} required to enter {target_map.name}")
-            
-            # Update Respawn if Castle
-            if target_map.type == "castle":
-                player.respawn_map_id = target_map_id
+        if target_map and player.level < target_map.level_requirement:
+            raise HTTPException(status_code=400, detail=f"Level {target_map.level_requirement} required to enter {target_map.name}")
         
-        old_map_id = player.current_map_id
-        
-        player.current_map_id = target_map_id
-        player.position.x = x
-        player.position.y = y
-        player.state = PlayerState.IDLE
-        player.target_position = None
-        player.target_monster_id = None # Clear combat target
+        from ..services.movement_service import MovementService
+        old_map_id = MovementService.switch_map(player, target_map, target_map_id, x, y)
         
         # Broadcast Leave event to old map so clients remove the ghost mesh
-        if hasattr(state_manager, 'connection_manager'):
-             import asyncio
-             # Fire and forget
-             asyncio.create_task(state_manager.connection_manager.broadcast({
-                 "type": "player_left_map",
-                 "player_id": player.id,
-                 "map_id": old_map_id
-             }))
+        event_bus.publish("player_left_map", {"player_id": player.id, "map_id": old_map_id})
         
         return {"message": "Map switched", "map_id": target_map_id, "position": player.position}
 
@@ -444,6 +505,40 @@ async def move_player(player_id: str, target_map_id: str, x: float, y: float):
     
     return {"message": "Moving", "target": player.target_position}
 
+@router.post("/player/{player_id}/auto_farm/start")
+async def start_auto_farm(player_id: str, map_id: str = None, target_template_id: str = None, mission_id: str = None):
+    player = state_manager.get_player(player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    state_manager.update_player_activity(player_id)
+
+    from ..services.auto_farm_service import AutoFarmService
+    if mission_id:
+        mission = state_manager.missions.get(mission_id)
+        if not mission or player.active_mission_id != mission_id:
+            raise HTTPException(status_code=400, detail="Mission not active")
+        # Only kill events advance mission_progress (see CombatService.check_mission_progress)
+        if mission.get("type", "kill") != "kill":
+            raise HTTPException(status_code=400, detail="Only kill missions can be auto-farmed")
+        settings = AutoFarmService.start_mission(player, mission)
+    else:
+        if map_id and not state_manager.get_map(map_id):
+            raise HTTPException(status_code=404, detail="Map not found")
+        settings = AutoFarmService.start(player, map_id, target_template_id)
+
+    return {"message": "Auto-farm started", "auto_farm": settings}
+
+@router.post("/player/{player_id}/auto_farm/stop")
+async def stop_auto_farm(player_id: str):
+    player = state_manager.get_player(player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    from ..services.auto_farm_service import AutoFarmService
+    AutoFarmService.stop(player)
+    return {"message": "Auto-farm stopped"}
+
 @router.post("/player/{player_id}/stop")
 async def stop_movement(player_id: str):
     player = state_manager.get_player(player_id)
@@ -454,21 +549,19 @@ async def stop_movement(player_id: str):
 
     player.state = PlayerState.IDLE
     player.target_position = None
+    player.auto_farm = None # Manual stop also ends server-side auto-farm
     
     # Broadcast stop details
-    if hasattr(state_manager, 'connection_manager'):
-        import asyncio
-        asyncio.create_task(state_manager.connection_manager.broadcast({
-            "type": "batch_update",
-            "entities": [{
-                "id": player.id,
-                "type": "player",
-                "x": player.position.x,
-                "y": player.position.y,
-                "state": player.state,
-                "map_id": player.current_map_id
-            }]
-        }))
+    event_bus.publish("batch_update", {
+        "entities": [{
+            "id": player.id,
+            "type": "player",
+            "x": player.position.x,
+            "y": player.position.y,
+            "state": player.state,
+            "map_id": player.current_map_id
+        }]
+    })
         
     return {"message": "Stopped", "position": player.position}
 
@@ -477,6 +570,11 @@ async def attack_monster(player_id: str, monster_id: str):
     player = state_manager.get_player(player_id)
     if not player:
         raise HTTPException(status_code=404, detail="Player not found")
+
+    # Coalesce: already fighting this monster (no-op ack)
+    if player.state == PlayerState.COMBAT and player.target_monster_id == monster_id:
+        state_manager.update_player_activity(player_id)
+        return {"message": "Combat started", "coalesced": True}
         
     state_manager.update_player_activity(player_id)
 
@@ -505,11 +603,7 @@ async def sell_item(player_id: str, item_id: str):
         raise HTTPException(status_code=400, detail="Cannot sell items while dead")
     
     # Find item in inventory
-    item_to_sell = None
-    for item in player.inventory:
-        if item.id == item_id:
-            item_to_sell = item
-            break
+    item_to_sell = player.inventory.get(item_id)
             
     if not item_to_sell:
         raise HTTPException(status_code=404, detail="Item not found in inventory")
@@ -519,14 +613,74 @@ async def sell_item(player_id: str, item_id: str):
         item_to_sell.quantity -= 1
     else:
         player.inventory.remove(item_to_sell)
-    # Simple price calculation
-    price = item_to_sell.power_score * 2 + 5
-    player.gold += price
-    
+    price = InventoryService.get_sell_price(item_to_sell)
     player.gold += price
+    leaderboard.touch(player)
     
     return {"message": "Item sold", "gold_gained": price, "current_gold": player.gold}
 
+def get_bulk_player(player_id: str, query: BulkItemQuery, action: str):
+    player = state_manager.get_player(player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    state_manager.update_player_activity(player_id)
+
+    if player.stats.hp <= 0:
+        raise HTTPException(status_code=400, detail=f"Cannot {action} items while dead")
+
+    if query.item_ids is None and query.rarity is None and query.type is None:
+        raise HTTPException(status_code=400, detail="No items selected")
+
+    items, missing = InventoryService.select_items(player, query)
+    not_found = [{"item_id": i, "ok": False, "error": "Item not found in inventory"} for i in missing]
+    return player, items, not_found
+
+@router.post("/player/{player_id}/inventory/sell")
+async def bulk_sell_items(player_id: str, query: BulkItemQuery):
+    player, items, results = get_bulk_player(player_id, query, "sell")
+
+    results = InventoryService.sell_items(player, items) + results
+    
+    return {
+        "message": f"Sold {len(items)} items",
+        "results": results,
+        "gold_gained": sum(r.get("gold", 0) for r in results),
+        "current_gold": player.gold,
+        "inventory": player.inventory
+    }
+
+@router.post("/player/{player_id}/inventory/use")
+async def bulk_use_items(player_id: str, query: BulkItemQuery):
+    player, items, results = get_bulk_player(player_id, query, "use")
+
+    used, leveled_up = InventoryService.use_items(player, items, query.quantities)
+    if leveled_up:
+        notify_level_up(player)
+
+    return {
+        "message": f"Used {sum(1 for r in used if r['ok'])} items",
+        "results": used + results,
+        "player_stats": player.stats,
+        "gold": player.gold,
+        "diamonds": player.diamonds,
+        "inventory": player.inventory
+    }
+
+@router.post("/player/{player_id}/inventory/equip")
+async def bulk_equip_items(player_id: str, query: BulkItemQuery):
+    player, items, results = get_bulk_player(player_id, query, "equip")
+
+    results = InventoryService.equip_items(player, items) + results
+
+    return {
+        "message": f"Equipped {sum(1 for r in results if r['ok'])} items",
+        "results": results,
+        "equipment": player.equipment,
+        "stats": player.stats,
+        "inventory": player.inventory
+    }
+
 @router.post("/player/{player_id}/allocate_attributes")
 async def allocate_attributes(player_id: str, attributes: dict):
     player = state_manager.get_player(player_id)
@@ -550,15 +704,9 @@ async def allocate_attributes(player_id: str, attributes: dict):
     return {"message": "Attributes allocated", "player": player}
 
 
-import json
-import os
-
 def load_missions():
-    try:
-        with open("backend/app/data/missions.json", "r") as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
+    # Missions live in StateManager (kept in sync with the content registry)
+    return state_manager.missions
 
 @router.post("/player/{player_id}/mission/start")
 async def start_mission(player_id: str, mission_id: str):
@@ -582,6 +730,13 @@ async def start_mission(player_id: str, mission_id: str):
     
     return {"message": "Mission started", "mission": mission}
 
+def find_delivery_item(player: Player, target_item_id: str):
+    # Template match first (stack), then exact instance id
+    matches = player.inventory.by_template(target_item_id)
+    if matches:
+        return matches[0]
+    return player.inventory.get(target_item_id)
+
 @router.post("/player/{player_id}/mission/claim")
 async def claim_mission(player_id: str):
     player = state_manager.get_player(player_id)
@@ -610,10 +765,8 @@ async def claim_mission(player_id: str):
         required_qty = target_count
         
         print(f"[DEBUG] Validation Delivery: Target={target_item_id} Qty={required_qty}")
-        for i in player.inventory:
-            print(f" - Inv Item: {i.id} ({i.quantity})")
 
-        found_item = next((i for i in player.inventory if i.id.startswith(target_item_id) or i.id == target_item_id), None)
+        found_item = find_delivery_item(player, target_item_id)
         
         if not found_item:
             print(f"[DEBUG] Item {target_item_id} NOT FOUND during validation.")
@@ -639,7 +792,7 @@ async def claim_mission(player_id: str):
     if m_type == "delivery":
         target_item_id = mission.get("target_item_id")
         required_qty = target_count
-        found_item = next((i for i in player.inventory if i.id.startswith(target_item_id) or i.id == target_item_id), None)
+        found_item = find_delivery_item(player, target_item_id)
         if found_item:
             if found_item.stackable:
                 found_item.quantity -= required_qty
@@ -656,15 +809,7 @@ async def claim_mission(player_id: str):
     result = player.gain_xp(xp_gained)
     
     if result["leveled_up"]:
-        try:
-             import asyncio
-             asyncio.create_task(state_manager.connection_manager.send_personal_message(player.id, {
-                 "type": "level_up",
-                 "player_id": player.id,
-                 "new_level": result["new_level"]
-             }))
-        except Exception as e:
-            print(f"Error broadcasting level up: {e}")
+        notify_level_up(player)
     
     # Item Rewards
     reward_items = mission.get("reward_items", [])
@@ -672,36 +817,17 @@ async def claim_mission(player_id: str):
     
     if reward_items:
         try:
-            with open("backend/app/data/items.json", "r") as f:
-                item_templates = json.load(f)
-                
+            from ..data.items import create_item
+
             for reward in reward_items:
                 r_item_id = reward["item_id"]
                 qty = reward.get("quantity", 1)
                 
-                if r_item_id in item_templates:
-                    tpl = item_templates[r_item_id]
-                    # Create item instance
-                    stats_data = tpl["stats"]
-                    if hasattr(stats_data, "model_copy"):
-                         stats_val = stats_data.model_copy()
-                    else:
-                         stats_val = ItemStats(**stats_data)
-
-                    new_item = Item(
-                        id=f"{r_item_id}_{uuid.uuid4().hex[:8]}",
-                        name=tpl["name"],
-                        type=tpl["type"],
-                        slot=tpl["slot"],
-                        rarity=tpl["rarity"],
-                        stats=stats_val,
-                        power_score=tpl.get("power_score", 0),
-                        icon=tpl.get("icon", "📦"),
-                        stackable=tpl.get("stackable", False),
-                        quantity=qty
-                    )
+                # Create item instance
+                new_item = create_item(r_item_id, quantity=qty)
+                if new_item:
                     InventoryService.add_item(player, new_item)
-                    granted_items.append(f"{qty}x {tpl['name']}")
+                    granted_items.append(f"{qty}x {new_item.name}")
         except Exception as e:
             print(f"Error processing matching rewards: {e}")
 
@@ -732,6 +858,8 @@ async def claim_mission(player_id: str):
         player.active_mission_id = None
         player.mission_progress = 0
     
+    leaderboard.touch(player)
+
     return {
         "message": "Mission claimed", 
         "rewards": {"xp": xp_gained, "gold": gold_gained},
@@ -749,34 +877,13 @@ async def equip_item_endpoint(player_id: str, item_id: str):
         raise HTTPException(status_code=400, detail="Cannot equip items while dead")
     
     # Find item in inventory
-    item_to_equip = None
-    for item in player.inventory:
-        if item.id == item_id:
-            item_to_equip = item
-            break
+    item_to_equip = player.inventory.get(item_id)
             
     if not item_to_equip:
         raise HTTPException(status_code=404, detail="Item not found in inventory")
         
     # Equip logic
-    if item_to_equip.quantity > 1 and not item_to_equip.stackable:
-        # Split item for equipping because it's a stack of unstackable items (bug fix)
-        # Create a clone for equip
-        final_item = item_to_equip.model_copy(deep=True)
-        final_item.quantity = 1
-        # Generate new UUID suffix
-        base_id = item_to_equip.id.split('_')[0]
-        final_item.id = f"{base_id}_{uuid.uuid4().hex[:8]}"
-        
-        # Decrement original stack
-        item_to_equip.quantity -= 1
-        
-        # Equip the new single item
-        InventoryService.equip_item(player, final_item)
-    else:
-        # Normal behavior: Remove and equip
-        player.inventory.remove(item_to_equip)
-        InventoryService.equip_item(player, item_to_equip)
+    InventoryService.equip_from_inventory(player, item_to_equip)
     
     return {"message": "Item equipped", "equipment": player.equipment, "stats": player.stats, "inventory": player.inventory}
 
@@ -820,9 +927,31 @@ async def upgrade_item_endpoint(player_id: str, item_id: str):
              "catalysts_consumed": result.get("catalysts_consumed", 0)
          }
 
+@router.post("/player/{player_id}/upgrade/batch")
+async def upgrade_item_batch_endpoint(player_id: str, item_id: str, target_level: int = None, max_catalysts: int = None):
+    player = state_manager.get_player(player_id)
+    if not player:
+        raise HTTPException(status_code=404, detail="Player not found")
+
+    state_manager.update_player_activity(player_id)
+
+    # Like the single upgrade, nothing rolled is still a 200 with success=False
+    result = UpgradeService.upgrade_item_batch(player, item_id, target_level=target_level, max_catalysts=max_catalysts)
+
+    return {
+        "success": result["success"],
+        "message": result["message"],
+        "item": result["item"],
+        "new_level": result["new_level"],
+        "rolls": result["rolls"],
+        "catalysts_consumed": result["catalysts_consumed"],
+        "player_stats": player.stats
+    }
 
 @router.get("/map/{map_id}/monsters")
-async def get_map_monsters(map_id: str):
+async def get_map_monsters(map_id: str, fields: str = None, x: float = None, y: float = None, radius: float = None,
+                           min_x: float = None, min_y: float = None, max_x: float = None, max_y: float = None,
+                           limit: int = None, cursor: str = None):
     # Get monster IDs in map
     monster_ids = state_manager.map_monsters.get(map_id, [])
     monsters = []
@@ -830,14 +959,23 @@ async def get_map_monsters(map_id: str):
         m = state_manager.monsters.get(mid)
         if m:
             monsters.append(m)
-    return monsters
+
+    area = parse_area(x, y, radius, min_x, min_y, max_x, max_y)
+    if not fields and not area and limit is None and cursor is None:
+        # Legacy full-model response
+        return monsters
+
+    return list_map_entities(
+        monsters, lambda m: (m.position_x, m.position_y),
+        ListingService.MONSTER_FIELDS, ListingService.MONSTER_DEFAULT_FIELDS, fields, area, limit, cursor
+    )
 
 @router.get("/content/missions")
-async def get_missions():
-    return load_missions()
+async def get_missions(request: Request):
+    return response_cache.respond(request, "missions", content.versions["missions"], load_missions)
 
 @router.get("/map/{map_id}")
-async def get_map_details(map_id: str):
+async def get_map_details(map_id: str, request: Request):
     m = state_manager.get_map(map_id)
     if not m:
         raise HTTPException(404, "Map not found")
@@ -852,15 +990,19 @@ async def get_map_details(map_id: str):
             expiry = state_manager.resource_cooldowns.get(res.id)
             if expiry and expiry > now:
                 active_cooldowns[res.id] = expiry - now
-    
-    # convert to dict
-    if hasattr(m, "model_dump"):
-        result = m.model_dump()
-    else:
-        result = m.dict()
-        
-    result["active_cooldowns"] = active_cooldowns
-    return result
+
+    version = content.versions["world"]
+    if not active_cooldowns:
+        return response_cache.respond(
+            request, f"map:{map_id}", version,
+            lambda: {**m.model_dump(), "active_cooldowns": {}}
+        )
+
+    # Remaining cooldowns change every request: reuse the serialized map, merge them in
+    return response_cache.respond_with(
+        request, f"map_base:{map_id}", version, m.model_dump,
+        {"active_cooldowns": active_cooldowns}
+    )
 
 @router.post("/player/{player_id}/revive")
 async def revive_player(player_id: str):
@@ -988,6 +1130,7 @@ async def gather_resource(player_id: str, resource_id: str):
                 loot.append({"item_id": drop.item_id, "qty": qty})
     
     # Grant Loot
+    from ..data.items import create_item
     inv_service = InventoryService()
     enriched_loot = []
 
@@ -995,34 +1138,22 @@ async def gather_resource(player_id: str, resource_id: str):
         item_id = item_drop['item_id']
         qty = item_drop['qty']
         
-        item_def = ITEMS_DATA.get(item_id)
-        if not item_def:
-            print(f"Warning: Item {item_id} not found in database.")
-            continue
-            
         # Create Item Instance
         try:
-            new_item = Item(
-                id=f"{item_id}_{uuid.uuid4().hex[:8]}",
-                name=item_def['name'],
-                type=item_def['type'],
-                slot=item_def.get('slot', 'none'),
-                rarity=item_def.get('rarity', 'common'),
-                stats=item_def.get('stats', {}),
-                power_score=item_def.get('power_score', 0),
-                icon=item_def.get('icon', '📦'),
-                stackable=item_def.get('stackable', False),
-                quantity=qty
-            )
+            new_item = create_item(item_id, quantity=qty)
+            if not new_item:
+                print(f"Warning: Item {item_id} not found in database.")
+                continue
+
             inv_service.add_item(player, new_item)
             
             # Add to enriched loot for frontend alerts
             enriched_loot.append({
                 "item_id": item_id,
                 "quantity": qty,
-                "name": item_def['name'],
-                "rarity": item_def.get('rarity', 'common'),
-                "icon": item_def.get('icon', '📦')
+                "name": new_item.name,
+                "rarity": new_item.rarity,
+                "icon": new_item.icon
             })
             
         except Exception as e:
@@ -1032,13 +1163,11 @@ async def gather_resource(player_id: str, resource_id: str):
     state_manager.set_resource_cooldown(resource_id, resource.respawn_time)
     
     # Broadcast Resource Update
-    if hasattr(state_manager, 'connection_manager'):
-        await state_manager.connection_manager.broadcast({
-            "type": "resource_update", 
-            "resource_id": resource_id, 
-            "status": "cooldown", 
-            "respawn_time": resource.respawn_time
-        })
+    event_bus.publish("resource_update", {
+        "resource_id": resource_id,
+        "status": "cooldown",
+        "respawn_time": resource.respawn_time
+    })
 
     return {"message": "Gathered successfully", "loot": enriched_loot, "cooldown": resource.respawn_time, "inventory": player.inventory}
 
@@ -1052,17 +1181,11 @@ async def npc_action(player_id: str, npc_id: str, action: str):
         raise HTTPException(status_code=404, detail="Player not found")
         
     if action == "accept_quest":
-        all_npcs = {}
-        try:
-             with open("backend/app/data/npcs.json", "r") as f:
-                 all_npcs = json.load(f)
-        except: pass
-        
-        npc_data = all_npcs.get(npc_id)
-        if not npc_data:
+        npc = state_manager.npcs.get(npc_id)
+        if not npc:
              raise HTTPException(status_code=404, detail="NPC not found")
              
-        quest_id = npc_data.get("quest_id")
+        quest_id = npc.quest_id
         if not quest_id:
              raise HTTPException(status_code=400, detail="This NPC has no quest.")
              
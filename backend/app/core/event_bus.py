@@ -0,0 +1,73 @@
+import asyncio
+import time
+from collections import deque
+from typing import Optional
+
+from .metrics import Metrics
+
+class Event:
+    """One outbound client message: broadcast when player_id is None."""
+    __slots__ = ("type", "data", "player_id", "created")
+
+    def __init__(self, event_type: str, data: dict, player_id: Optional[str] = None):
+        self.type = event_type
+        self.data = data
+        self.player_id = player_id
+        self.created = time.perf_counter()
+
+    def message(self) -> dict:
+        return {"type": self.type, **self.data}
+
+class EventBus:
+    """
+    In-process bus between subsystems (routes, StateManager, world reloads)
+    and the WebSocket layer. publish() never blocks and never creates a
+    task: events go into one bounded queue that a single dispatcher drains
+    in publish order. When the queue is full the oldest event is dropped
+    (and counted), so a burst can't grow memory without bound.
+
+    GameLoop's per-tick frame (see OutboundBuffer) is sent by the loop
+    itself and doesn't go through the bus.
+    """
+    _instance = None
+
+    @staticmethod
+    def get_instance():
+        if EventBus._instance is None:
+            EventBus._instance = EventBus()
+        return EventBus._instance
+
+    def __init__(self, max_size: int = 10000):
+        self.queue = deque(maxlen=max_size)
+        self.wakeup: Optional[asyncio.Event] = None
+        self.metrics = Metrics.get_instance()
+
+    def publish(self, event_type: str, data: dict = None, player_id: str = None):
+        if len(self.queue) == self.queue.maxlen:
+            dropped = self.queue[0]
+            self.metrics.inc("event_bus_dropped", dropped.type)
+        self.queue.append(Event(event_type, data or {}, player_id))
+        self.metrics.inc("event_bus_published", event_type)
+        self.metrics.set_gauge("event_bus_queue_depth", len(self.queue))
+        if self.wakeup:
+            self.wakeup.set()
+
+    async def run(self, connection_manager):
+        """Dispatcher: sends queued events in order (started once at startup)."""
+        self.wakeup = asyncio.Event()
+        while True:
+            if not self.queue:
+                self.wakeup.clear()
+                await self.wakeup.wait()
+                continue
+
+            event = self.queue.popleft()
+            self.metrics.set_gauge("event_bus_queue_depth", len(self.queue))
+            self.metrics.observe("event_bus_delay", time.perf_counter() - event.created)
+            try:
+                if event.player_id:
+                    await connection_manager.send_personal_message(event.player_id, event.message())
+                else:
+                    await connection_manager.broadcast(event.message())
+            except Exception as e:
+                print(f"[EventBus] Failed to dispatch {event.type}: {e}")
@@ -0,0 +1,159 @@
+import sys
+import time
+from collections import deque, Counter
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+class Histogram:
+    """Count/sum since start plus a window of recent samples for percentiles."""
+
+    def __init__(self, window: int = 2048):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def percentiles(self) -> dict:
+        if not self.samples:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        ordered = sorted(self.samples)
+        last = len(ordered) - 1
+        return {
+            "p50": ordered[int(last * 0.50)],
+            "p95": ordered[int(last * 0.95)],
+            "p99": ordered[int(last * 0.99)],
+            "max": ordered[last]
+        }
+
+class Metrics:
+    """
+    In-process instrumentation: timing spans (seconds) and labelled counters.
+    Exposed as JSON on /admin/metrics and as Prometheus text on /metrics.
+    """
+    _instance = None
+
+    @staticmethod
+    def get_instance():
+        if Metrics._instance is None:
+            Metrics._instance = Metrics()
+        return Metrics._instance
+
+    def __init__(self):
+        self.started = time.time()
+        self.histograms: Dict[str, Histogram] = {}
+        # (name, label) -> value
+        self.counters: Dict[Tuple[str, str], float] = {}
+        self.gauges: Dict[str, float] = {}
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def observe(self, name: str, value: float):
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        histogram.observe(value)
+
+    def inc(self, name: str, label: str = "", value: float = 1):
+        key = (name, label)
+        self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float):
+        self.gauges[name] = value
+
+    def record_message(self, message: dict, size: int, recipients: int = 1):
+        msg_type = message.get("type", "unknown")
+        self.inc("ws_messages_sent", msg_type, recipients)
+        self.inc("ws_bytes_sent", msg_type, size * recipients)
+
+    def snapshot(self) -> dict:
+        spans = {}
+        for name, histogram in self.histograms.items():
+            spans[name] = {
+                "count": histogram.count,
+                "avg_ms": histogram.total / histogram.count * 1000 if histogram.count else 0.0,
+                **{k: v * 1000 for k, v in histogram.percentiles().items()}
+            }
+
+        counters: Dict[str, Dict[str, float]] = {}
+        for (name, label), value in self.counters.items():
+            counters.setdefault(name, {})[label or "total"] = value
+
+        return {"uptime": time.time() - self.started, "spans_ms": spans, "counters": counters, "gauges": dict(self.gauges)}
+
+    def prometheus(self) -> str:
+        lines = []
+        lines.append("# TYPE autorpg_span_seconds summary")
+        for name, histogram in sorted(self.histograms.items()):
+            for q, value in histogram.percentiles().items():
+                if q == "max":
+                    continue
+                quantile = {"p50": "0.5", "p95": "0.95", "p99": "0.99"}[q]
+                lines.append(f'autorpg_span_seconds{{span="{name}",quantile="{quantile}"}} {value:.9f}')
+            lines.append(f'autorpg_span_seconds_sum{{span="{name}"}} {histogram.total:.9f}')
+            lines.append(f'autorpg_span_seconds_count{{span="{name}"}} {histogram.count}')
+
+        names = sorted({name for name, _ in self.counters})
+        for name in names:
+            lines.append(f"# TYPE autorpg_{name}_total counter")
+            for (counter, label), value in sorted(self.counters.items()):
+                if counter != name:
+                    continue
+                label_text = f'{{type="{label}"}}' if label else ""
+                lines.append(f"autorpg_{name}_total{label_text} {value:g}")
+
+        for name, value in sorted(self.gauges.items()):
+            lines.append(f"# TYPE autorpg_{name} gauge")
+            lines.append(f"autorpg_{name} {value:g}")
+
+        lines.append("# TYPE autorpg_uptime_seconds gauge")
+        lines.append(f"autorpg_uptime_seconds {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+class SamplingProfiler:
+    """
+    On-demand stack sampler for one thread (the event loop). Runs in its own
+    thread so it can be triggered from an endpoint; costs nothing when idle.
+    """
+
+    @staticmethod
+    def capture(thread_id: int, seconds: float = 5.0, interval: float = 0.005, top: int = 40) -> dict:
+        stacks = Counter()
+        functions = Counter()
+        samples = 0
+        deadline = time.perf_counter() + seconds
+
+        while time.perf_counter() < deadline:
+            frame = sys._current_frames().get(thread_id)
+            if frame is not None:
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_filename.rsplit('/', 1)[-1]}:{code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+                if stack:
+                    functions[stack[0].rsplit(":", 1)[0]] += 1
+                    stacks[";".join(reversed(stack))] += 1
+                    samples += 1
+            time.sleep(interval)
+
+        return {
+            "samples": samples,
+            "interval_ms": interval * 1000,
+            # Leaf function -> share of samples
+            "top_functions": [
+                {"function": name, "samples": count, "percent": round(count * 100 / samples, 2)}
+                for name, count in functions.most_common(top)
+            ] if samples else [],
+            # Flamegraph "collapsed" format: root;...;leaf count
+            "collapsed": "\n".join(f"{stack} {count}" for stack, count in stacks.most_common())
+        }
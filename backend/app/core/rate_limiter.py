@@ -0,0 +1,74 @@
+import time
+from typing import Dict, Optional, Tuple
+
+from .metrics import Metrics
+
+class CommandLimiter:
+    """
+    Per-player token buckets for player commands (POST /player/{id}/...).
+
+    Checked in an HTTP middleware before routing, so rejected requests cost
+    a dict lookup instead of validation + handler work. Each action (first
+    path segment after the player id, e.g. "move", "shop") has its own
+    bucket; actions without an entry in LIMITS use DEFAULT_LIMIT.
+    """
+    _instance = None
+
+    # action -> (tokens per second, burst)
+    LIMITS = {
+        "move": (5.0, 10),
+        "attack": (5.0, 10),
+        "stop": (5.0, 10),
+        "gather": (2.0, 4),
+        "action": (2.0, 4), # action/start_gather
+    }
+    DEFAULT_LIMIT = (10.0, 20)
+    IDLE_SECONDS = 60.0
+
+    @staticmethod
+    def get_instance():
+        if CommandLimiter._instance is None:
+            CommandLimiter._instance = CommandLimiter()
+        return CommandLimiter._instance
+
+    def __init__(self):
+        # (player_id, action) -> [tokens, last_refill]
+        self.buckets: Dict[Tuple[str, str], list] = {}
+        self.last_prune = time.monotonic()
+        self.metrics = Metrics.get_instance()
+
+    @staticmethod
+    def parse_path(path: str) -> Optional[Tuple[str, str]]:
+        """'/player/<id>/<action>/...' -> (id, action), else None."""
+        if not path.startswith("/player/"):
+            return None
+        parts = path[8:].split("/", 2)
+        if len(parts) < 2 or not parts[1]:
+            return None
+        return parts[0], parts[1]
+
+    def allow(self, player_id: str, action: str) -> float:
+        """Returns 0 if allowed, else seconds until a token is available."""
+        now = time.monotonic()
+        rate, burst = self.LIMITS.get(action, self.DEFAULT_LIMIT)
+        key = (player_id, action)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [float(burst), now]
+        else:
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if now - self.last_prune > self.IDLE_SECONDS:
+            self.prune(now)
+
+        if bucket[0] >= 1.0:
+            bucket[0] -= 1.0
+            return 0.0
+        self.metrics.inc("commands_rejected", action)
+        return (1.0 - bucket[0]) / rate
+
+    def prune(self, now: float):
+        # Idle buckets are full again anyway
+        self.last_prune = now
+        self.buckets = {k: b for k, b in self.buckets.items() if now - b[1] < self.IDLE_SECONDS}
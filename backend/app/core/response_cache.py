@@ -0,0 +1,118 @@
+import gzip
+import hashlib
+import json
+from typing import Callable, Dict
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+try:
+    import brotli
+except ImportError:  # Optional: gzip is always available
+    brotli = None
+
+class ResponseCache:
+    """
+    Pre-serialized JSON bodies for mostly static endpoints (maps, NPCs,
+    missions, rewards, world).
+
+    Each entry is keyed by name and tagged with a content version
+    (ContentRegistry.versions); a version change rebuilds the body on the
+    next request. The ETag is a hash of the body, so it stays valid across
+    server restarts and clients revalidate with If-None-Match -> 304.
+    Compressed variants are built lazily, once per body.
+    """
+    _instance = None
+
+    COMPRESS_MIN_BYTES = 1024
+
+    @staticmethod
+    def get_instance():
+        if ResponseCache._instance is None:
+            ResponseCache._instance = ResponseCache()
+        return ResponseCache._instance
+
+    def __init__(self):
+        self._entries: Dict[str, dict] = {}
+
+    @staticmethod
+    def serialize(data) -> bytes:
+        return json.dumps(jsonable_encoder(data), separators=(",", ":")).encode()
+
+    def get_entry(self, key: str, version, build: Callable) -> dict:
+        entry = self._entries.get(key)
+        if entry is None or entry["version"] != version:
+            body = self.serialize(build())
+            entry = {
+                "version": version,
+                "body": body,
+                "etag": f'"{hashlib.md5(body).hexdigest()}"',
+                "encoded": {}
+            }
+            self._entries[key] = entry
+        return entry
+
+    @staticmethod
+    def pick_encoding(request: Request, size: int):
+        if size < ResponseCache.COMPRESS_MIN_BYTES:
+            return None
+        accept = request.headers.get("accept-encoding", "")
+        if brotli and "br" in accept:
+            return "br"
+        if "gzip" in accept:
+            return "gzip"
+        return None
+
+    @staticmethod
+    def compress(body: bytes, encoding: str) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body)
+        return gzip.compress(body, compresslevel=6)
+
+    @staticmethod
+    def etag_matches(request: Request, etag: str) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        # Accept weak validators too (proxies may weaken after re-encoding)
+        tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+        return "*" in tags or etag in tags
+
+    def respond(self, request: Request, key: str, version, build: Callable) -> Response:
+        """Serves a cached body, or 304 if the client already has it."""
+        entry = self.get_entry(key, version, build)
+        headers = {
+            "ETag": entry["etag"],
+            "Cache-Control": "no-cache",
+            "Vary": "Accept-Encoding"
+        }
+
+        if self.etag_matches(request, entry["etag"]):
+            return Response(status_code=304, headers=headers)
+
+        body = entry["body"]
+        encoding = self.pick_encoding(request, len(body))
+        if encoding:
+            if encoding not in entry["encoded"]:
+                entry["encoded"][encoding] = self.compress(body, encoding)
+            body = entry["encoded"][encoding]
+            headers["Content-Encoding"] = encoding
+
+        return Response(content=body, media_type="application/json", headers=headers)
+
+    def respond_with(self, request: Request, key: str, version, build: Callable, extra: dict) -> Response:
+        """
+        Serves a cached JSON object with per-request fields merged in.
+        The cached part is not re-serialized; no ETag since the body changes per request.
+        """
+        entry = self.get_entry(key, version, build)
+        extra_body = self.serialize(extra)
+        body = entry["body"][:-1] + b"," + extra_body[1:] if len(entry["body"]) > 2 else extra_body
+
+        headers = {"Cache-Control": "no-store", "Vary": "Accept-Encoding"}
+        encoding = self.pick_encoding(request, len(body))
+        if encoding:
+            body = self.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+
+        return Response(content=body, media_type="application/json", headers=headers)
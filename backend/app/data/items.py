@@ -2,20 +2,26 @@ from ..models.item import ItemType, ItemSlot, ItemRarity, ItemStats
 
 import json
 import os
-from ..models.item import ItemType, ItemSlot, ItemRarity, ItemStats
+import uuid
+from typing import Optional
+from ..models.item import Item, ItemType, ItemSlot, ItemRarity, ItemStats
+from ..engine.content_registry import ContentRegistry
 
 # Load items from JSON
 ITEMS = {}
+# Template ID -> shared, read-only Item prototype. Instances reference its stats.
+ITEM_PROTOTYPES = {}
 
-def load_items():
-    global ITEMS
+def load_items(data: dict = None):
+    global ITEMS, ITEM_PROTOTYPES
     base_dir = os.path.dirname(os.path.abspath(__file__))
     json_path = os.path.join(base_dir, "items.json")
     
-    if os.path.exists(json_path):
+    if data is None and os.path.exists(json_path):
         with open(json_path, "r") as f:
             data = json.load(f)
-            
+
+    if data is not None:
         ITEMS.clear()
         for key, val in data.items():
             stats_data = val.get("stats", {})
@@ -31,4 +37,36 @@ def load_items():
                 "stackable": val.get("stackable", False)
             }
 
-load_items()
+        # Build into a fresh dict and swap, so lookups never see a half-built registry
+        prototypes = {}
+        for key, tpl in ITEMS.items():
+            prototypes[key] = Item(id=key, template_id=key, **tpl)
+        ITEM_PROTOTYPES = prototypes
+
+def get_prototype(template_id: Optional[str]) -> Optional[Item]:
+    if not template_id:
+        return None
+    return ITEM_PROTOTYPES.get(template_id)
+
+def create_item(template_id: str, quantity: int = 1, **overrides) -> Optional[Item]:
+    """
+    Creates a new item instance from a template.
+    The instance shares the prototype's stats; only per-instance state is its own.
+    Returns None if the template does not exist.
+    """
+    proto = ITEM_PROTOTYPES.get(template_id)
+    if not proto:
+        return None
+
+    update = {
+        "id": f"{template_id}_{uuid.uuid4().hex[:8]}",
+        "quantity": quantity,
+        "awakenings": []
+    }
+    update.update(overrides)
+    return proto.model_copy(update=update)
+
+# Parsed once by the content registry; reloaded when the editor saves items.json
+_content = ContentRegistry.get_instance()
+_content.on_reload("items", load_items)
+_content.reload("items")
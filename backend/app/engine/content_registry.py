@@ -0,0 +1,146 @@
+import asyncio
+import json
+import os
+from typing import Callable, Dict, List
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+
+class ContentRegistry:
+    """
+    Holds every game data file in memory, parsed once.
+    Routes read from here instead of opening JSON files per request.
+
+    Each reload swaps in the newly parsed object (readers never see a
+    half-loaded file) and bumps `version` (global) and `versions[name]`.
+    Subscribers registered with on_reload() rebuild derived state
+    (e.g. StateManager.npcs) from the new data. A subscriber may split its
+    work into prepare(data) -> prepared, which must not touch live state and
+    runs in a worker thread under reload_async(), and apply(prepared), which
+    always runs on the caller's (event loop) thread.
+    """
+    _instance = None
+
+    FILES = {
+        "world": "world.json",
+        "missions": "missions.json",
+        "npcs": "npcs.json",
+        "items": "items.json",
+        "rewards": "rewards.json",
+    }
+
+    DEFAULTS = {
+        "world": {},
+        "missions": {},
+        "npcs": {},
+        "items": {},
+        "rewards": {"rewards": []},
+    }
+
+    @staticmethod
+    def get_instance():
+        if ContentRegistry._instance is None:
+            ContentRegistry._instance = ContentRegistry()
+        return ContentRegistry._instance
+
+    def __init__(self):
+        self.version = 0
+        self.versions: Dict[str, int] = {name: 0 for name in self.FILES}
+        self._content: Dict[str, object] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._listeners: Dict[str, List[tuple]] = {}
+
+    def path(self, name: str) -> str:
+        return os.path.join(DATA_DIR, self.FILES[name])
+
+    def on_reload(self, name: str, apply: Callable, prepare: Callable = None):
+        self._listeners.setdefault(name, []).append((prepare, apply))
+
+    def get(self, name: str):
+        if name not in self._content:
+            self.reload(name)
+        return self._content.get(name, self.DEFAULTS[name])
+
+    def read(self, name: str):
+        """Parses one file. Returns (data, mtime); raises on a parse error."""
+        path = self.path(name)
+        if not os.path.exists(path):
+            print(f"Content file not found at {path}")
+            return self.DEFAULTS[name], 0.0
+
+        mtime = os.path.getmtime(path)
+        with open(path, "r") as f:
+            return json.load(f), mtime
+
+    def reload(self, name: str):
+        """
+        Re-reads one file from disk. On a parse error the previous content stays live.
+        Returns the current content.
+        """
+        try:
+            data, mtime = self.read(name)
+        except Exception as e:
+            print(f"Failed to load {name} content: {e}")
+            return self._content.get(name, self.DEFAULTS[name])
+
+        prepared = []
+        for prepare, apply in self._listeners.get(name, []):
+            prepared.append((apply, self._prepare(name, prepare, data)))
+        return self._store(name, data, mtime, prepared)
+
+    async def reload_async(self, name: str):
+        """Like reload(), but parsing and prepare steps run in a worker thread."""
+        try:
+            data, mtime = await asyncio.to_thread(self.read, name)
+        except Exception as e:
+            print(f"Failed to load {name} content: {e}")
+            return self._content.get(name, self.DEFAULTS[name])
+
+        prepared = []
+        for prepare, apply in self._listeners.get(name, []):
+            prepared.append((apply, await asyncio.to_thread(self._prepare, name, prepare, data)))
+        return self._store(name, data, mtime, prepared)
+
+    def _prepare(self, name: str, prepare: Callable, data):
+        if prepare is None:
+            return data
+        try:
+            return prepare(data)
+        except Exception as e:
+            print(f"Failed to prepare {name} content: {e}")
+            return None
+
+    def _store(self, name: str, data, mtime: float, prepared: list):
+        self._content[name] = data
+        self._mtimes[name] = mtime
+        self.versions[name] += 1
+        self.version += 1
+
+        for apply, value in prepared:
+            if value is None:
+                continue
+            try:
+                apply(value)
+            except Exception as e:
+                print(f"Failed to apply {name} content: {e}")
+
+        return data
+
+    def changed_files(self) -> List[str]:
+        changed = []
+        for name in self.FILES:
+            path = self.path(name)
+            mtime = os.path.getmtime(path) if os.path.exists(path) else 0.0
+            if mtime != self._mtimes.get(name):
+                changed.append(name)
+        return changed
+
+    async def watch(self, interval: float = 2.0):
+        """Polls file mtimes and reloads anything edited outside the editor endpoints."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                for name in self.changed_files():
+                    print(f"[Content] {self.FILES[name]} changed on disk, reloading.")
+                    await self.reload_async(name)
+            except Exception as e:
+                print(f"[Content] Watch error: {e}")
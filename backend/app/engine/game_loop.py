@@ -1,13 +1,24 @@
 import asyncio
+import os
 from ..engine.state_manager import StateManager
 from ..models.player import PlayerState
 from ..services.combat_service import CombatService
 from ..services.movement_service import MovementService
+from ..services.auto_farm_service import AutoFarmService
+from ..services.leaderboard_service import LeaderboardService
+from .monster_ai import MonsterAI
+from .shard_manager import ShardManager
+from .position_buffer import PositionBuffer
+from .outbound_buffer import OutboundBuffer
+from ..core.metrics import Metrics
 
 class GameLoop:
     def __init__(self):
         self.state_manager = StateManager.get_instance()
         self.running = False
+        self.shards = None
+        self.positions = None
+        self.metrics = Metrics.get_instance()
 
     def set_connection_manager(self, manager):
         self.connection_manager = manager
@@ -16,15 +27,29 @@ class GameLoop:
         import time
         self.running = True
         self.last_tick_time = time.time()
+
+        # Optional: simulate monster AI in worker processes (SHARD_WORKERS=n)
+        shard_workers = int(os.environ.get("SHARD_WORKERS", "0"))
+        if shard_workers > 0 and not self.shards:
+            self.shards = ShardManager(shard_workers)
+            self.shards.start()
+
+        # Optional: publish positions to shared memory for other processes (POSITION_SHM=name)
+        if os.environ.get("POSITION_SHM") and not self.positions:
+            import atexit
+            self.positions = PositionBuffer(os.environ["POSITION_SHM"])
+            atexit.register(self.positions.close)
+
         while self.running:
             # 1. Server Hibernation (Optimization)
-            online_count = sum(1 for p in self.state_manager.players.values() if p.is_online)
+            online_count = len(self.state_manager.presence)
             if online_count == 0:
                 await asyncio.sleep(1.0) # Hibernation mode
                 self.last_tick_time = time.time() # Reset tick time to avoid huge dt on wake up
                 continue
 
-            await self.tick()
+            with self.metrics.span("tick"):
+                await self.tick()
             await asyncio.sleep(0.05) 
 
     async def tick(self):
@@ -32,6 +57,7 @@ class GameLoop:
         current_time = time.time()
         dt = current_time - self.last_tick_time
         self.last_tick_time = current_time
+        self.metrics.observe("tick_interval", dt)
         
         if dt > 0.5: dt = 0.5
         
@@ -43,20 +69,36 @@ class GameLoop:
             player_count = len(self.state_manager.players)
             monster_count = len(self.state_manager.monsters)
             respawn_count = len(getattr(self.state_manager, 'respawn_queue', []))
-            print(f"[PERF] Tick: {self.tick_count} | FPS: {1/dt:.2f} | Players: {player_count} | Monsters: {monster_count} | RespawnQueue: {respawn_count}")
+            # FPS over the last 100 ticks, tick cost from the "tick" span (see /admin/metrics)
+            last_perf = getattr(self, 'last_perf_time', None)
+            fps = 100 / (current_time - last_perf) if last_perf else 1 / max(dt, 1e-6)
+            self.last_perf_time = current_time
+            tick_p95 = self.metrics.histograms["tick"].percentiles()["p95"] * 1000 if "tick" in self.metrics.histograms else 0.0
+            print(f"[PERF] Tick: {self.tick_count} | FPS: {fps:.2f} | Tick p95: {tick_p95:.2f}ms | Players: {player_count} | Monsters: {monster_count} | RespawnQueue: {respawn_count}")
+
+        # Presence: mark timed-out players offline (heap top check, O(expired))
+        self.state_manager.expire_inactive_players()
+
+        self.state_manager.index_players_by_map()
 
-        # Cleanup Inactive Players (Every 2s)
-        if self.tick_count % 40 == 0:
-            asyncio.create_task(self.state_manager.cleanup_inactive_players(timeout_seconds=5))
+        # Leaderboard reconcile for online players (Every 1s)
+        if self.tick_count % 20 == 0:
+            online = [p for players in self.state_manager.map_players.values() for p in players]
+            LeaderboardService.get_instance().sync(self.state_manager.players, online)
 
         movement_updates = []
+        outbound = self.state_manager.outbound
+        players_start = time.perf_counter()
+
+        # Combat phase 1: collect attackers whose cooldown elapsed (resolved after the loop)
+        attacks = []
+        combat_players = []
 
         # Iterate over all players
         for player_id, player in self.state_manager.players.items():
             if not player.is_online: continue
             
             if player.state == PlayerState.COMBAT:
-                # Combat Logic (Keep immediate broadcast for responsiveness)
                 attack_cooldown = getattr(player.stats, 'attack_cooldown', 1.0)
                 if not hasattr(player, 'last_attack_time'): player.last_attack_time = 0
                 
@@ -65,70 +107,23 @@ class GameLoop:
                     if player.target_monster_id:
                         monster = self.state_manager.monsters.get(player.target_monster_id)
                         if monster:
-                            import math
-                            dist = math.sqrt((player.position.x - monster.position_x)**2 + (player.position.y - monster.position_y)**2)
-                            if dist > 2.5:
+                            dx = player.position.x - monster.position_x
+                            dy = player.position.y - monster.position_y
+                            if dx * dx + dy * dy > 2.5 * 2.5:
                                 player.state = PlayerState.IDLE
                                 player.target_monster_id = None
                                 continue
-
-                            log = CombatService.process_combat_round(player, monster)
-                            if not log:
-                                player.state = PlayerState.IDLE
-                                player.target_monster_id = None
-                                continue
-                            
-                            if hasattr(self, 'connection_manager'):
-                                # 1. Public Update (Animations, Damage, HP) - Remove drops/secrets
-                                public_log = log.copy()
-                                if 'drops' in public_log: del public_log['drops']
-                                
-                                await self.connection_manager.broadcast({
-                                    "type": "combat_update",
-                                    "player_id": player_id,
-                                    "monster_id": monster.id,
-                                    "log": public_log,
-                                    "player_hp": player.stats.hp,
-                                    "monster_hp": monster.stats.hp,
-                                    "monster_max_hp": monster.stats.max_hp,
-                                    "monster_name": monster.name
-                                })
-                                
-                                # 2. Private Update (Drops) - Only for the killer
-                                drops = log.get('drops', [])
-                                if drops:
-                                    await self.connection_manager.send_personal_message(player_id, {
-                                        "type": "combat_drops",
-                                        "monster_name": monster.name,
-                                        "drops": drops
-                                    })
-
-                            if log.get('monster_died'):
-                                player.state = PlayerState.IDLE
-                                player.target_monster_id = None
-                                self.state_manager.remove_monster(monster.id)
-                            
-                            if log.get('player_died'):
-                                player.state = PlayerState.IDLE
-                                player.target_monster_id = None
-                                player.death_time = current_time
+                            attacks.append((player, monster))
                         else:
                             player.state = PlayerState.IDLE
                             player.target_monster_id = None
                 
-                # Broadcast state (Combat or potentially Idle now)
-                movement_updates.append({
-                    "id": player.id,
-                    "type": "player",
-                    "x": player.position.x,
-                    "y": player.position.y,
-                    "state": player.state,
-                    "target_id": player.target_monster_id,
-                    "map_id": player.current_map_id
-                })
+                # Broadcast state once combat is resolved (Combat or potentially Idle)
+                combat_players.append(player)
             
             elif player.state == PlayerState.MOVING and player.target_position:
-                reached = MovementService.move_towards_target(player, player.target_position.x, player.target_position.y, dt)
+                game_map = self.state_manager.get_map(player.current_map_id)
+                reached = MovementService.update_player_position(player, game_map, dt)
                 
                 if reached:
                     player.state = PlayerState.IDLE
@@ -144,22 +139,67 @@ class GameLoop:
                     "target_id": player.target_monster_id,
                     "map_id": player.current_map_id
                 })
+
+            elif player.state == PlayerState.IDLE and player.auto_farm and self.tick_count % 5 == 0:
+                # Server-side Auto-Farm: pick next portal/monster (4x per second)
+                event = AutoFarmService.update(player)
+                if event:
+                    if event["type"] == "auto_farm_stopped":
+                        outbound.send(player_id, event)
+                    else:
+                        outbound.broadcast(event)
+
+                if event or player.state != PlayerState.IDLE:
+                    movement_updates.append({
+                        "id": player.id,
+                        "type": "player",
+                        "x": player.position.x,
+                        "y": player.position.y,
+                        "state": player.state,
+                        "target_id": player.target_monster_id,
+                        "map_id": player.current_map_id
+                    })
         
+        # Combat phase 2: resolve damage, deaths, XP and loot in one pass (no awaits)
+        if attacks:
+            with self.metrics.span("combat"):
+                results = CombatService.resolve_attacks(attacks, self.state_manager)
+            self.emit_combat_results(results, current_time)
+
+        for player in combat_players:
+            movement_updates.append({
+                "id": player.id,
+                "type": "player",
+                "x": player.position.x,
+                "y": player.position.y,
+                "state": player.state,
+                "target_id": player.target_monster_id,
+                "map_id": player.current_map_id
+            })
+
+        self.metrics.observe("players", time.perf_counter() - players_start)
+
         # Process Monsters (AI)
-        monster_updates = await self.process_monsters(dt)
+        with self.metrics.span("monsters"):
+            if self.shards:
+                monster_updates = await self.process_shards(dt)
+            else:
+                monster_updates = await self.process_monsters(dt)
         movement_updates.extend(monster_updates)
 
-        # Broadcast Batch Updates
-        if movement_updates and hasattr(self, 'connection_manager'):
-            # Throttle updates? No, batching is already throttling frequency by tick rate.
-            # But we can limit to 20 FPS updates if tick is 60 FPS.
-            # For now, send every tick (20 FPS target in start loop).
-            await self.connection_manager.broadcast({
+        # Batch Updates (sent with the other events of this tick)
+        if movement_updates:
+            outbound.broadcast({
                 "type": "batch_update",
                 "entities": movement_updates
             })
 
+        if self.positions:
+            with self.metrics.span("positions"):
+                self.positions.publish(self.state_manager, self.tick_count)
+
         # Check Respawns
+        respawn_start = time.perf_counter()
         to_respawn = self.state_manager.check_respawns()
         for data in to_respawn:
             import uuid
@@ -178,151 +218,102 @@ class GameLoop:
                     position_y=data['y'],
                     spawn_x=data['x'],
                     spawn_y=data['y'],
-                    xp_reward=template['xp_reward']
+                    xp_reward=template['xp_reward'],
+                    spawn_key=data.get('spawn_key')
                 )
                 self.state_manager.add_monster(new_monster)
-                if hasattr(self, 'connection_manager'):
-                    asyncio.create_task(self.connection_manager.broadcast({
-                        "type": "monster_respawn",
-                        "monster": new_monster.dict()
-                    }))
+                outbound.broadcast({
+                    "type": "monster_respawn",
+                    "monster": new_monster.dict()
+                })
+        self.metrics.observe("respawns", time.perf_counter() - respawn_start)
+
+        # One frame per client for everything queued this tick
+        with self.metrics.span("broadcast"):
+            await self.flush_events()
+
+    async def flush_events(self):
+        buffer = self.state_manager.outbound
+        if not buffer:
+            return
+        # Events queued while we send go out next tick
+        self.state_manager.outbound = OutboundBuffer()
+        if not hasattr(self, 'connection_manager'):
+            return
+
+        frames = buffer.build_frames(list(self.connection_manager.active_connections))
+
+        # Per event type counters (the frames themselves are counted as "events")
+        for event in buffer.shared:
+            self.metrics.inc("ws_events_sent", event.get("type", "unknown"), len(frames))
+        for events in buffer.personal.values():
+            for event in events:
+                self.metrics.inc("ws_events_sent", event.get("type", "unknown"))
+
+        await self.connection_manager.send_frames(frames)
+
+    def emit_combat_results(self, results: list, current_time: float):
+        # Combat phase 3: apply outcomes and queue events (sent with the tick's flush)
+        outbound = self.state_manager.outbound
+        for player, monster, log in results:
+            if not log:
+                player.state = PlayerState.IDLE
+                player.target_monster_id = None
+                continue
+
+            # 1. Public Update (Animations, Damage, HP) - Remove drops/secrets
+            public_log = log.copy()
+            if 'drops' in public_log: del public_log['drops']
+            
+            outbound.broadcast({
+                "type": "combat_update",
+                "player_id": player.id,
+                "monster_id": monster.id,
+                "log": public_log,
+                "player_hp": player.stats.hp,
+                "monster_hp": monster.stats.hp,
+                "monster_max_hp": monster.stats.max_hp,
+                "monster_name": monster.name
+            })
+            
+            # 2. Private Update (Drops) - Only for the killer
+            drops = log.get('drops', [])
+            if drops:
+                outbound.send(player.id, {
+                    "type": "combat_drops",
+                    "monster_name": monster.name,
+                    "drops": drops
+                })
+
+            if log.get('monster_died'):
+                player.state = PlayerState.IDLE
+                player.target_monster_id = None
+                self.state_manager.remove_monster(monster.id)
+            
+            if log.get('player_died'):
+                player.state = PlayerState.IDLE
+                player.target_monster_id = None
+                player.death_time = current_time
 
     async def process_monsters(self, dt: float):
-        import math
-        import random
         import time
         current_time = time.time()
         
         updates = []
         
         # 3. Active Map Logic (Optimization)
-        active_maps = set(p.current_map_id for p in self.state_manager.players.values() if p.is_online)
+        active_maps = self.state_manager.map_players
 
         for monster_id, monster in self.state_manager.monsters.items():
             if monster.stats.hp <= 0: continue
             if monster.map_id not in active_maps: continue # Skip empty maps
             
-            moved = False
             initial_state = monster.state
-            
-            # AI Logic
-            target = None
-            if monster.target_id:
-                target = self.state_manager.get_player(monster.target_id)
-                if not target or str(target.current_map_id) != str(monster.map_id) or target.stats.hp <= 0:
-                    monster.target_id = None
-                    monster.state = "RETURNING"
-                    target = None
-            
-            if monster.m_type == "aggressive" and not target and monster.state in ["IDLE", "WANDERING"]:
-                closest_dist = monster.aggro_range
-                closest_p = None
-                for p in self.state_manager.players.values():
-                    if not p.is_online: continue # 2. Filter Offline Players
-                    if str(p.current_map_id) == str(monster.map_id) and p.stats.hp > 0:
-                        dist = math.sqrt((p.position.x - monster.position_x)**2 + (p.position.y - monster.position_y)**2)
-                        if dist < closest_dist:
-                            closest_dist = dist
-                            closest_p = p
-                if closest_p:
-                    monster.target_id = closest_p.id
-                    monster.state = "CHASING"
-                    target = closest_p
-
-            # State Machine
-            if monster.state == "IDLE":
-                if random.random() < 0.02:
-                    angle = random.random() * 2 * math.pi
-                    r = random.random() * 4.0
-                    wx = monster.spawn_x + r * math.cos(angle)
-                    wy = monster.spawn_y + r * math.sin(angle)
-                    wx = max(1, min(99, wx))
-                    wy = max(1, min(99, wy))
-                    monster.wander_target_x = wx
-                    monster.wander_target_y = wy
-                    monster.state = "WANDERING"
-            
-            elif monster.state == "WANDERING":
-                if monster.wander_target_x is not None:
-                    dx = monster.wander_target_x - monster.position_x
-                    dy = monster.wander_target_y - monster.position_y
-                    dist = math.sqrt(dx*dx + dy*dy)
-                    if dist < 0.5:
-                        monster.state = "IDLE"
-                        monster.wander_target_x = None
-                        monster.wander_target_y = None
-                    else:
-                        speed = getattr(monster.stats, 'speed', 10.0) * dt * 0.3
-                        monster.position_x += (dx/dist) * speed
-                        monster.position_y += (dy/dist) * speed
-                        moved = True
-            
-            elif monster.state == "CHASING":
-                if target:
-                    dist_from_spawn = math.sqrt((monster.position_x - monster.spawn_x)**2 + (monster.position_y - monster.spawn_y)**2)
-                    if dist_from_spawn > monster.leash_range:
-                        monster.target_id = None
-                        monster.state = "RETURNING"
-                    else:
-                        dx = target.position.x - monster.position_x
-                        dy = target.position.y - monster.position_y
-                        dist = math.sqrt(dx*dx + dy*dy)
-                        if dist <= 1.5:
-                            monster.state = "ATTACKING"
-                        else:
-                            speed = getattr(monster.stats, 'speed', 10.0) * dt
-                            if dist > 0:
-                                monster.position_x += (dx/dist) * speed
-                                monster.position_y += (dy/dist) * speed
-                                moved = True
-
-            elif monster.state == "ATTACKING":
-                if target:
-                    dist = math.sqrt((target.position.x - monster.position_x)**2 + (target.position.y - monster.position_y)**2)
-                    if dist > 2.0:
-                        monster.state = "CHASING"
-                    else:
-                        if target.state != PlayerState.COMBAT:
-                            target.state = PlayerState.COMBAT
-                        
-                        # Auto-target if none (Self Defense)
-                        if not target.target_monster_id:
-                            target.target_monster_id = monster.id
-
-                        # Monster Attack (Damage)
-                        if current_time - monster.last_attack_time >= 2.0:
-                            monster.last_attack_time = current_time
-                            from ..services.combat_service import CombatService
-                            log = CombatService.monster_attack(monster, target)
-                            
-                            if log and hasattr(self, 'connection_manager'):
-                                await self.connection_manager.broadcast({
-                                    "type": "combat_update",
-                                    "player_id": target.id,
-                                    "monster_id": monster.id,
-                                    "log": log,
-                                    "player_hp": target.stats.hp,
-                                    "monster_hp": monster.stats.hp,
-                                    "monster_max_hp": monster.stats.max_hp,
-                                    "monster_name": monster.name
-                                })
-                else:
-                    monster.state = "IDLE"
-
-            elif monster.state == "RETURNING":
-                dx = monster.spawn_x - monster.position_x
-                dy = monster.spawn_y - monster.position_y
-                dist = math.sqrt(dx*dx + dy*dy)
-                if dist < 0.5:
-                    monster.position_x = monster.spawn_x
-                    monster.position_y = monster.spawn_y
-                    monster.state = "IDLE"
-                else:
-                    speed = getattr(monster.stats, 'speed', 10.0) * dt * 1.5
-                    if dist > 0:
-                        monster.position_x += (dx/dist) * speed
-                        monster.position_y += (dy/dist) * speed
-                        moved = True
+            moved, target, strike = MonsterAI.step(
+                monster, self.state_manager.get_player, active_maps[monster.map_id], dt, current_time
+            )
+            if target:
+                self.monster_engage(monster, target, strike)
             
             # Send update if moved OR state changed
             if moved or monster.state != initial_state:
@@ -336,5 +327,51 @@ class GameLoop:
                 })
                 
         return updates
-            
 
+    async def process_shards(self, dt: float):
+        try:
+            updates, events = self.shards.step(self.state_manager, dt)
+        except (EOFError, OSError) as e:
+            # A worker died: fall back to in-process simulation
+            print(f"[Shards] Worker lost ({e}), simulating monsters in-process.")
+            self.shards.stop()
+            self.shards = None
+            return await self.process_monsters(dt)
+
+        # Melee events were computed on a snapshot: re-validate against live state
+        for monster_id, player_id, strike in events:
+            monster = self.state_manager.monsters.get(monster_id)
+            target = self.state_manager.get_player(player_id)
+            if not monster or monster.stats.hp <= 0 or not target or not target.is_online:
+                continue
+            if target.current_map_id != monster.map_id or target.stats.hp <= 0:
+                continue
+            self.monster_engage(monster, target, strike)
+
+        return updates
+
+    def monster_engage(self, monster, target, strike: bool):
+        # Monster is in melee range: pull the player into combat
+        if target.state != PlayerState.COMBAT:
+            target.state = PlayerState.COMBAT
+        
+        # Auto-target if none (Self Defense)
+        if not target.target_monster_id:
+            target.target_monster_id = monster.id
+
+        if not strike:
+            return
+
+        log = CombatService.monster_attack(monster, target)
+        
+        if log:
+            self.state_manager.outbound.broadcast({
+                "type": "combat_update",
+                "player_id": target.id,
+                "monster_id": monster.id,
+                "log": log,
+                "player_hp": target.stats.hp,
+                "monster_hp": monster.stats.hp,
+                "monster_max_hp": monster.stats.max_hp,
+                "monster_name": monster.name
+            })
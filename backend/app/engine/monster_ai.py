@@ -0,0 +1,126 @@
+import math
+import random
+from typing import Callable, List
+
+class MonsterAI:
+    """
+    Per-monster AI state machine (IDLE / WANDERING / CHASING / ATTACKING / RETURNING).
+
+    Only mutates the monster. Effects on players are returned to the caller,
+    so the same step runs in GameLoop and in shard worker processes (where
+    players are lightweight snapshots).
+    """
+
+    @staticmethod
+    def step(monster, get_player: Callable, map_players: List, dt: float, current_time: float):
+        """
+        Advances one monster by dt.
+        Returns (moved, attack_target, strike): attack_target is the player the
+        monster is in melee with (or None); strike is True when its attack
+        cooldown elapsed this tick.
+        """
+        moved = False
+        attack_target = None
+        strike = False
+
+        # AI Logic
+        target = None
+        if monster.target_id:
+            target = get_player(monster.target_id)
+            if not target or str(target.current_map_id) != str(monster.map_id) or target.stats.hp <= 0:
+                monster.target_id = None
+                monster.state = "RETURNING"
+                target = None
+
+        if monster.m_type == "aggressive" and not target and monster.state in ["IDLE", "WANDERING"]:
+            closest_dist = monster.aggro_range
+            closest_p = None
+            for p in map_players:
+                if not p.is_online: continue # 2. Filter Offline Players
+                if str(p.current_map_id) == str(monster.map_id) and p.stats.hp > 0:
+                    dist = math.sqrt((p.position.x - monster.position_x)**2 + (p.position.y - monster.position_y)**2)
+                    if dist < closest_dist:
+                        closest_dist = dist
+                        closest_p = p
+            if closest_p:
+                monster.target_id = closest_p.id
+                monster.state = "CHASING"
+                target = closest_p
+
+        # State Machine
+        if monster.state == "IDLE":
+            if random.random() < 0.02:
+                angle = random.random() * 2 * math.pi
+                r = random.random() * 4.0
+                wx = monster.spawn_x + r * math.cos(angle)
+                wy = monster.spawn_y + r * math.sin(angle)
+                wx = max(1, min(99, wx))
+                wy = max(1, min(99, wy))
+                monster.wander_target_x = wx
+                monster.wander_target_y = wy
+                monster.state = "WANDERING"
+
+        elif monster.state == "WANDERING":
+            if monster.wander_target_x is not None:
+                dx = monster.wander_target_x - monster.position_x
+                dy = monster.wander_target_y - monster.position_y
+                dist = math.sqrt(dx*dx + dy*dy)
+                if dist < 0.5:
+                    monster.state = "IDLE"
+                    monster.wander_target_x = None
+                    monster.wander_target_y = None
+                else:
+                    speed = getattr(monster.stats, 'speed', 10.0) * dt * 0.3
+                    monster.position_x += (dx/dist) * speed
+                    monster.position_y += (dy/dist) * speed
+                    moved = True
+
+        elif monster.state == "CHASING":
+            if target:
+                dist_from_spawn = math.sqrt((monster.position_x - monster.spawn_x)**2 + (monster.position_y - monster.spawn_y)**2)
+                if dist_from_spawn > monster.leash_range:
+                    monster.target_id = None
+                    monster.state = "RETURNING"
+                else:
+                    dx = target.position.x - monster.position_x
+                    dy = target.position.y - monster.position_y
+                    dist = math.sqrt(dx*dx + dy*dy)
+                    if dist <= 1.5:
+                        monster.state = "ATTACKING"
+                    else:
+                        speed = getattr(monster.stats, 'speed', 10.0) * dt
+                        if dist > 0:
+                            monster.position_x += (dx/dist) * speed
+                            monster.position_y += (dy/dist) * speed
+                            moved = True
+
+        elif monster.state == "ATTACKING":
+            if target:
+                dist = math.sqrt((target.position.x - monster.position_x)**2 + (target.position.y - monster.position_y)**2)
+                if dist > 2.0:
+                    monster.state = "CHASING"
+                else:
+                    attack_target = target
+                    # Monster Attack (Damage)
+                    if current_time - monster.last_attack_time >= 2.0:
+                        monster.last_attack_time = current_time
+                        strike = True
+            else:
+                monster.state = "IDLE"
+
+        elif monster.state == "RETURNING":
+            dx = monster.spawn_x - monster.position_x
+            dy = monster.spawn_y - monster.position_y
+            dist = math.sqrt(dx*dx + dy*dy)
+            if dist < 0.5:
+                monster.position_x = monster.spawn_x
+                monster.position_y = monster.spawn_y
+                monster.state = "IDLE"
+            else:
+                speed = getattr(monster.stats, 'speed', 10.0) * dt * 1.5
+                if dist > 0:
+                    monster.position_x += (dx/dist) * speed
+                    monster.position_y += (dy/dist) * speed
+                    moved = True
+
+        return moved, attack_target, strike
@@ -0,0 +1,227 @@
+import heapq
+import math
+from collections import OrderedDict
+from typing import Generator, List, Optional, Tuple
+
+class NavGrid:
+    """
+    Walkability grid for one map: cells covered by resource footprints
+    (centered width x height boxes, padded by the player radius) are blocked.
+
+    find_path() returns waypoints in map coordinates. Straight lines are
+    checked first; otherwise A* (8-connected, no corner cutting) runs on the
+    grid and the result is smoothed with line-of-sight checks. Paths are
+    cached per (start cell, goal cell) in an LRU, so repeated trips to the
+    same portal / NPC / spawn cost a dict lookup plus one string-pulling
+    pass from the exact start to the exact target.
+
+    plan() is the same search as a generator that yields every
+    EXPANSIONS_PER_STEP A* expansions, so GameLoop can spread an uncached
+    search over several ticks instead of stalling one.
+    """
+
+    PLAYER_RADIUS = 0.4
+    CACHE_SIZE = 512
+    EXPANSIONS_PER_STEP = 400
+    SQRT2 = math.sqrt(2)
+
+    def __init__(self, game_map, cell_size: float = 1.0):
+        self.cell_size = cell_size
+        self.cols = max(1, int(math.ceil(game_map.width / cell_size)))
+        self.rows = max(1, int(math.ceil(game_map.height / cell_size)))
+        self.blocked = bytearray(self.cols * self.rows)
+        self.cache: OrderedDict = OrderedDict()
+
+        for res in game_map.resources:
+            half_w = res.width / 2 + self.PLAYER_RADIUS
+            half_h = res.height / 2 + self.PLAYER_RADIUS
+            c0, r0 = self.to_cell(res.x - half_w, res.y - half_h)
+            c1, r1 = self.to_cell(res.x + half_w, res.y + half_h)
+            for r in range(r0, r1 + 1):
+                for c in range(c0, c1 + 1):
+                    self.blocked[r * self.cols + c] = 1
+
+    def to_cell(self, x: float, y: float) -> Tuple[int, int]:
+        c = min(self.cols - 1, max(0, int(x / self.cell_size)))
+        r = min(self.rows - 1, max(0, int(y / self.cell_size)))
+        return c, r
+
+    def to_point(self, cell: Tuple[int, int]) -> Tuple[float, float]:
+        return (cell[0] + 0.5) * self.cell_size, (cell[1] + 0.5) * self.cell_size
+
+    def is_free(self, c: int, r: int) -> bool:
+        return 0 <= c < self.cols and 0 <= r < self.rows and not self.blocked[r * self.cols + c]
+
+    def line_of_sight(self, x0: float, y0: float, x1: float, y1: float) -> bool:
+        # Grid traversal (Amanatides & Woo): visits every cell the segment crosses once
+        size = self.cell_size
+        cols, blocked = self.cols, self.blocked
+        c, r = self.to_cell(x0, y0)
+        end_c, end_r = self.to_cell(x1, y1)
+        dx, dy = x1 - x0, y1 - y0
+        step_c = 1 if dx > 0 else -1
+        step_r = 1 if dy > 0 else -1
+        inf = float("inf")
+        delta_c = abs(size / dx) if dx else inf
+        delta_r = abs(size / dy) if dy else inf
+        next_c = ((c + (step_c > 0)) * size - x0) / dx if dx else inf
+        next_r = ((r + (step_r > 0)) * size - y0) / dy if dy else inf
+
+        for _ in range(abs(end_c - c) + abs(end_r - r) + 1):
+            if blocked[r * cols + c]:
+                return False
+            if c == end_c and r == end_r:
+                return True
+            if next_c < next_r:
+                c += step_c
+                next_c += delta_c
+            else:
+                r += step_r
+                next_r += delta_r
+            if not (0 <= c < cols and 0 <= r < self.rows):
+                return True # Clamped end point lies on the map edge
+        return True
+
+    def nearest_free(self, cell: Tuple[int, int], max_radius: int = 10) -> Optional[Tuple[int, int]]:
+        if self.is_free(*cell):
+            return cell
+        c0, r0 = cell
+        for radius in range(1, max_radius + 1):
+            best = None
+            for r in range(r0 - radius, r0 + radius + 1):
+                for c in range(c0 - radius, c0 + radius + 1):
+                    if max(abs(c - c0), abs(r - r0)) != radius or not self.is_free(c, r):
+                        continue
+                    d = (c - c0) ** 2 + (r - r0) ** 2
+                    if best is None or d < best[0]:
+                        best = (d, (c, r))
+            if best:
+                return best[1]
+        return None
+
+    def find_path(self, x0: float, y0: float, x1: float, y1: float) -> Optional[List[Tuple[float, float]]]:
+        """Waypoints from (x0, y0) to (x1, y1), or None if unreachable."""
+        planner = self.plan(x0, y0, x1, y1)
+        while True:
+            try:
+                next(planner)
+            except StopIteration as done:
+                return done.value
+
+    def plan(self, x0: float, y0: float, x1: float, y1: float) -> Generator[None, None, Optional[List[Tuple[float, float]]]]:
+        """find_path() in slices: yields while A* runs, returns the waypoints (StopIteration.value)."""
+        start_free = self.is_free(*self.to_cell(x0, y0))
+        if start_free and self.line_of_sight(x0, y0, x1, y1):
+            return [(x1, y1)]
+
+        start = self.nearest_free(self.to_cell(x0, y0))
+        goal_cell = self.to_cell(x1, y1)
+        goal = self.nearest_free(goal_cell)
+        if start is None or goal is None:
+            return None
+
+        key = (start, goal)
+        points = self.cache.get(key)
+        if points is None:
+            cells = yield from self.astar(start, goal)
+            # Turning points after the start cell, smoothed from the start cell center
+            points = self.smooth(self.to_point(start), [self.to_point(c) for c in self.corners(cells)[1:]]) if cells else []
+            self.cache[key] = points
+            if len(self.cache) > self.CACHE_SIZE:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        if not points and start != goal:
+            return None
+
+        # Route from the start cell center to the exact target (when walkable and A* got there)
+        route = [self.to_point(start)] + points
+        if goal == goal_cell and route[-1] == self.to_point(goal):
+            route.append((x1, y1))
+        # Pull from the real position: every leg after the start cell is line-of-sight checked
+        return self.smooth((x0, y0), route)
+
+    def astar(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Generator[None, None, Optional[List[Tuple[int, int]]]]:
+        cols, rows, blocked = self.cols, self.rows, self.blocked
+        start_i = start[1] * cols + start[0]
+        goal_i = goal[1] * cols + goal[0]
+        if start_i == goal_i:
+            return [start]
+
+        gx, gy = goal
+        inf = float("inf")
+        g_score = [inf] * (cols * rows)
+        came_from = [-1] * (cols * rows)
+        closed = bytearray(cols * rows)
+        g_score[start_i] = 0.0
+        open_heap = [(0.0, 0.0, start_i)]
+        sqrt2 = self.SQRT2
+        octile = sqrt2 - 2
+        step = self.EXPANSIONS_PER_STEP
+        expansions = 0
+
+        while open_heap:
+            _, g, i = heapq.heappop(open_heap)
+            if i == goal_i:
+                return self.trace(came_from, i)
+            if closed[i]:
+                continue
+            closed[i] = 1
+
+            expansions += 1
+            if expansions % step == 0:
+                yield # Resume on a later tick
+
+            c, r = i % cols, i // cols
+            for dc, dr, cost in ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+                                 (1, 1, sqrt2), (1, -1, sqrt2), (-1, 1, sqrt2), (-1, -1, sqrt2)):
+                nc, nr = c + dc, r + dr
+                if nc < 0 or nr < 0 or nc >= cols or nr >= rows:
+                    continue
+                n = nr * cols + nc
+                if blocked[n] or closed[n]:
+                    continue
+                # No corner cutting
+                if dc and dr and (blocked[r * cols + nc] or blocked[nr * cols + c]):
+                    continue
+                ng = g + cost
+                if ng < g_score[n]:
+                    g_score[n] = ng
+                    came_from[n] = i
+                    # Octile distance
+                    dx, dy = abs(nc - gx), abs(nr - gy)
+                    heapq.heappush(open_heap, (ng + dx + dy + octile * min(dx, dy), ng, n))
+        return None
+
+    @staticmethod
+    def corners(cells: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        # Drops cells inside straight runs (those segments are the grid path itself)
+        if len(cells) < 3:
+            return cells
+        result = [cells[0]]
+        for prev, cell, nxt in zip(cells, cells[1:], cells[2:]):
+            if (cell[0] - prev[0], cell[1] - prev[1]) != (nxt[0] - cell[0], nxt[1] - cell[1]):
+                result.append(cell)
+        result.append(cells[-1])
+        return result
+
+    def trace(self, came_from: list, i: int) -> List[Tuple[int, int]]:
+        cols = self.cols
+        path = []
+        while i != -1:
+            path.append((i % cols, i // cols))
+            i = came_from[i]
+        path.reverse()
+        return path
+
+    def smooth(self, anchor: Tuple[float, float], points: List[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        # Greedy string pulling: keep a waypoint only where the next one isn't visible
+        if not points:
+            return []
+        result = []
+        for i in range(len(points) - 1):
+            if not self.line_of_sight(anchor[0], anchor[1], *points[i + 1]):
+                result.append(points[i])
+                anchor = points[i]
+        result.append(points[-1])
+        return result
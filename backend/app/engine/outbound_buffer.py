@@ -0,0 +1,50 @@
+import json
+from typing import Dict, List
+
+class OutboundBuffer:
+    """
+    Per-tick outbound event buffer.
+
+    Anything the game loop (or a service it calls) wants to tell clients is
+    queued here instead of being sent (or spawned as a task) on the spot.
+    GameLoop.tick flushes once at the end: every connected client receives
+    a single frame
+
+        {"type": "events", "events": [...]}
+
+    holding the tick's broadcast events followed by its personal ones. The
+    broadcast part is encoded once per tick and shared by all frames.
+    """
+
+    def __init__(self):
+        self.shared: List[dict] = []
+        self.personal: Dict[str, List[dict]] = {}
+
+    def broadcast(self, event: dict):
+        self.shared.append(event)
+
+    def send(self, player_id: str, event: dict):
+        self.personal.setdefault(player_id, []).append(event)
+
+    def __bool__(self):
+        return bool(self.shared or self.personal)
+
+    @staticmethod
+    def encode(events: List[dict]) -> str:
+        # Inner part of a JSON array (no brackets) so parts can be joined
+        return ",".join(json.dumps(e, separators=(",", ":"), ensure_ascii=False) for e in events)
+
+    def build_frames(self, client_ids) -> Dict[str, str]:
+        """client_id -> frame text (clients with nothing to receive are skipped)."""
+        shared = self.encode(self.shared)
+        frames = {}
+        for client_id in client_ids:
+            personal = self.personal.get(client_id)
+            if personal:
+                body = f"{shared},{self.encode(personal)}" if shared else self.encode(personal)
+            elif shared:
+                body = shared
+            else:
+                continue
+            frames[client_id] = f'{{"type":"events","events":[{body}]}}'
+        return frames
@@ -0,0 +1,128 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Set, Tuple
+
+class PlayerDirectory:
+    """
+    Sorted indexes over all accounts for the admin users list, so a page
+    costs O(page size) instead of sorting every player per request.
+
+    Entries are (name_lower, id) or (-level, name_lower, id) tuples kept in
+    sorted lists. Names never change; levels and online status only change
+    while a player is online, so GameLoop's per-tick map index feeds
+    sync_online() and only online players (plus those who just left) are
+    re-checked. Admin edits and deletions call touch()/remove() directly.
+    """
+
+    SORTS = ("online", "name", "level")
+
+    def __init__(self):
+        self.names: List[Tuple[str, str]] = []
+        self.levels: List[Tuple[int, str, str]] = []
+        self.online_names: List[Tuple[str, str]] = []
+        self.offline_names: List[Tuple[str, str]] = []
+        self.online_ids: Set[str] = set()
+        # id -> (name_lower, level) as currently indexed
+        self.indexed: Dict[str, Tuple[str, int]] = {}
+
+    @staticmethod
+    def _remove(entries: list, entry: tuple):
+        i = bisect_left(entries, entry)
+        if i < len(entries) and entries[i] == entry:
+            del entries[i]
+
+    def rebuild(self, players: dict):
+        self.indexed = {pid: (p.name.lower(), p.level) for pid, p in players.items()}
+        self.online_ids = {pid for pid, p in players.items() if p.is_online}
+        self.names = sorted((name, pid) for pid, (name, _) in self.indexed.items())
+        self.levels = sorted((-level, name, pid) for pid, (name, level) in self.indexed.items())
+        self.online_names = [e for e in self.names if e[1] in self.online_ids]
+        self.offline_names = [e for e in self.names if e[1] not in self.online_ids]
+
+    def add(self, player):
+        if player.id in self.indexed:
+            self.touch(player)
+            return
+        name = player.name.lower()
+        self.indexed[player.id] = (name, player.level)
+        insort(self.names, (name, player.id))
+        insort(self.levels, (-player.level, name, player.id))
+        if player.is_online:
+            self.online_ids.add(player.id)
+            insort(self.online_names, (name, player.id))
+        else:
+            insort(self.offline_names, (name, player.id))
+
+    def remove(self, player_id: str):
+        entry = self.indexed.pop(player_id, None)
+        if entry is None:
+            return
+        name, level = entry
+        self._remove(self.names, (name, player_id))
+        self._remove(self.levels, (-level, name, player_id))
+        if player_id in self.online_ids:
+            self.online_ids.discard(player_id)
+            self._remove(self.online_names, (name, player_id))
+        else:
+            self._remove(self.offline_names, (name, player_id))
+
+    def touch(self, player):
+        """Re-indexes one player if its level or online status changed."""
+        entry = self.indexed.get(player.id)
+        if entry is None:
+            self.add(player)
+            return
+        name, level = entry
+        if level != player.level:
+            self._remove(self.levels, (-level, name, player.id))
+            insort(self.levels, (-player.level, name, player.id))
+            self.indexed[player.id] = (name, player.level)
+
+        was_online = player.id in self.online_ids
+        if player.is_online and not was_online:
+            self.online_ids.add(player.id)
+            self._remove(self.offline_names, (name, player.id))
+            insort(self.online_names, (name, player.id))
+        elif was_online and not player.is_online:
+            self.online_ids.discard(player.id)
+            self._remove(self.online_names, (name, player.id))
+            insort(self.offline_names, (name, player.id))
+
+    def sync_online(self, players: dict, online: List):
+        """Called once per tick with the online players (O(online))."""
+        if len(self.indexed) != len(players):
+            # Players were added/removed behind our back (e.g. bulk load)
+            self.rebuild(players)
+            return
+
+        current = set()
+        for p in online:
+            current.add(p.id)
+            self.touch(p)
+        for player_id in self.online_ids - current:
+            p = players.get(player_id)
+            if p:
+                self.touch(p)
+            else:
+                self.remove(player_id)
+
+    def page(self, sort: str = "online", query: str = "", offset: int = 0, limit: int = 50) -> Tuple[List[str], int]:
+        """Returns (player ids for the page, total matches)."""
+        if query:
+            # Prefix search over the name index (results ordered by name)
+            prefix = query.lower()
+            lo = bisect_left(self.names, (prefix,))
+            hi = bisect_left(self.names, (prefix + "\uffff",))
+            return [pid for _, pid in self.names[lo + offset:min(hi, lo + offset + limit)]], hi - lo
+
+        if sort == "name":
+            return [e[-1] for e in self.names[offset:offset + limit]], len(self.names)
+        if sort == "level":
+            return [e[-1] for e in self.levels[offset:offset + limit]], len(self.levels)
+
+        # Online first, then offline, each by name
+        online_count = len(self.online_names)
+        ids = [pid for _, pid in self.online_names[offset:offset + limit]]
+        if len(ids) < limit:
+            start = max(0, offset - online_count)
+            ids.extend(pid for _, pid in self.offline_names[start:start + limit - len(ids)])
+        return ids, online_count + len(self.offline_names)
@@ -0,0 +1,156 @@
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Dict, List, Optional
+
+# Layout (little endian), guarded by a seqlock:
+#   header    : seq u64 | tick u64 | time f64 | map_count u32 | entity_count u32 | capacity u32 | max_maps u32
+#   map table : max_maps x (map_id 32s | start u32 | count u32)   entities of one map are contiguous
+#   entities  : capacity x (kind u8 | state u8 | pad 2 | hp i32 | max_hp i32 | x f64 | y f64 | id 40s)
+HEADER = struct.Struct("<QQdIIII")
+SEQ = struct.Struct("<Q")
+# Header without seq (offset 8): written while seq is still odd
+HEADER_BODY = struct.Struct("<QdIIII")
+MAP_ENTRY = struct.Struct("<32sII")
+RECORD = struct.Struct("<BBxxiidd40s")
+
+KIND_PLAYER = 0
+KIND_MONSTER = 1
+
+STATES = ["idle", "moving", "combat", "IDLE", "WANDERING", "CHASING", "ATTACKING", "RETURNING"]
+STATE_CODES = {s: i for i, s in enumerate(STATES)}
+
+class PositionBuffer:
+    """
+    Publishes per-map entity positions into shared memory after each tick
+    (POSITION_SHM=<name>). Readers in other processes use
+    PositionBufferReader and never touch StateManager or the game loop.
+
+    Writes follow a seqlock: seq is odd while a tick is being written, and
+    readers retry if seq was odd or changed while they copied.
+    """
+
+    def __init__(self, name: str, capacity: int = 16384, max_maps: int = 256):
+        self.capacity = capacity
+        self.max_maps = max_maps
+        self.entities_offset = HEADER.size + MAP_ENTRY.size * max_maps
+        size = self.entities_offset + RECORD.size * capacity
+
+        try:
+            # Left over from a crashed run
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+        except FileNotFoundError:
+            pass
+
+        self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.buf = self.shm.buf
+        self.seq = 0
+        HEADER.pack_into(self.buf, 0, 0, 0, 0.0, 0, 0, capacity, max_maps)
+        print(f"[PositionBuffer] Publishing positions in shared memory '{name}' ({size} bytes)")
+
+    def publish(self, state_manager, tick: int):
+        by_map: Dict[str, list] = {}
+        for map_id, players in (state_manager.map_players or {}).items():
+            rows = by_map.setdefault(map_id, [])
+            for p in players:
+                rows.append((KIND_PLAYER, STATE_CODES.get(p.state.value, 0), p.stats.hp, p.stats.max_hp,
+                             p.position.x, p.position.y, p.id.encode()[:40]))
+        for map_id, monster_ids in state_manager.map_monsters.items():
+            rows = by_map.setdefault(map_id, [])
+            for monster_id in monster_ids:
+                m = state_manager.monsters.get(monster_id)
+                if m and m.stats.hp > 0:
+                    rows.append((KIND_MONSTER, STATE_CODES.get(m.state, 0), m.stats.hp, m.stats.max_hp,
+                                 m.position_x, m.position_y, m.id.encode()[:40]))
+
+        buf = self.buf
+        self.seq += 1 # Odd: write in progress
+        SEQ.pack_into(buf, 0, self.seq)
+
+        index = 0
+        map_count = 0
+        for map_id, rows in by_map.items():
+            if map_count >= self.max_maps:
+                break
+            start = index
+            for row in rows:
+                if index >= self.capacity:
+                    break
+                RECORD.pack_into(buf, self.entities_offset + index * RECORD.size, *row)
+                index += 1
+            MAP_ENTRY.pack_into(buf, HEADER.size + map_count * MAP_ENTRY.size, map_id.encode()[:32], start, index - start)
+            map_count += 1
+
+        HEADER_BODY.pack_into(buf, SEQ.size, tick, time.time(), map_count, index, self.capacity, self.max_maps)
+        # Even seq last, on its own: readers never see it before the counts it covers
+        self.seq += 1 # Even: consistent
+        SEQ.pack_into(buf, 0, self.seq)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        self.shm.unlink()
+
+class PositionBufferReader:
+    """Lock-free reader for a PositionBuffer published by another process."""
+
+    def __init__(self, name: str):
+        self.shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Readers must not unlink the segment when they exit (Python < 3.13)
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, "shared_memory")
+        except Exception:
+            pass
+        _, _, _, _, _, self.capacity, self.max_maps = HEADER.unpack_from(self.shm.buf, 0)
+        self.entities_offset = HEADER.size + MAP_ENTRY.size * self.max_maps
+
+    def snapshot(self, retries: int = 100) -> Optional[bytes]:
+        """Consistent copy of the published part of the segment, or None if the writer kept it busy."""
+        buf = self.shm.buf
+        for _ in range(retries):
+            seq, _, _, _, entity_count, _, _ = HEADER.unpack_from(buf, 0)
+            if seq % 2:
+                time.sleep(0)
+                continue
+            # Only the used part of the segment is copied
+            data = bytes(buf[:self.entities_offset + min(entity_count, self.capacity) * RECORD.size])
+            if SEQ.unpack_from(buf, 0)[0] == seq:
+                return data
+        return None
+
+    def read(self, map_id: str = None) -> Optional[dict]:
+        """
+        Returns {"tick", "time", "maps": {map_id: [entity dicts]}}, optionally
+        for one map only, or None if no consistent copy could be taken.
+        """
+        data = self.snapshot()
+        if data is None:
+            return None
+
+        _, tick, published, map_count, _, _, _ = HEADER.unpack_from(data, 0)
+        maps: Dict[str, List[dict]] = {}
+        for i in range(map_count):
+            raw_id, start, count = MAP_ENTRY.unpack_from(data, HEADER.size + i * MAP_ENTRY.size)
+            name = raw_id.rstrip(b"\0").decode()
+            if map_id and name != map_id:
+                continue
+            rows = []
+            for j in range(start, start + count):
+                kind, state, hp, max_hp, x, y, raw = RECORD.unpack_from(data, self.entities_offset + j * RECORD.size)
+                rows.append({
+                    "id": raw.rstrip(b"\0").decode(),
+                    "type": "player" if kind == KIND_PLAYER else "monster",
+                    "state": STATES[state],
+                    "x": x,
+                    "y": y,
+                    "hp": hp,
+                    "max_hp": max_hp
+                })
+            maps[name] = rows
+        return {"tick": tick, "time": published, "maps": maps}
+
+    def close(self):
+        self.shm.close()
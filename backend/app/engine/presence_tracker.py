@@ -0,0 +1,61 @@
+import heapq
+from typing import Dict, List, Set
+
+class PresenceTracker:
+    """
+    Last-seen deadlines for online players, kept in a min-heap.
+
+    touch() only moves the player's deadline forward in a dict; the heap
+    holds at most one entry per player (queued), also across discard() and
+    a later touch() on reconnect. pop_expired() looks at the heap top:
+    an entry whose deadline was extended since it was pushed is re-pushed
+    with the new deadline, a stale one (player discarded) is dropped. So a
+    check costs O(1) when nobody expired and O(expired * log n) otherwise,
+    instead of a scan over every player.
+    """
+
+    def __init__(self, timeout: float = 5.0):
+        self.timeout = timeout
+        self.deadlines: Dict[str, float] = {}
+        self.heap: List[tuple] = []
+        # Ids with an entry in the heap (live or not yet popped after discard)
+        self.queued: Set[str] = set()
+
+    def touch(self, player_id: str, last_seen: float):
+        deadline = last_seen + self.timeout
+        current = self.deadlines.get(player_id)
+        if current is None:
+            self.deadlines[player_id] = deadline
+            if player_id not in self.queued:
+                self.queued.add(player_id)
+                heapq.heappush(self.heap, (deadline, player_id))
+        elif deadline > current:
+            self.deadlines[player_id] = deadline
+
+    def discard(self, player_id: str):
+        # The heap entry stays queued; pop_expired drops it or reuses it after a new touch()
+        self.deadlines.pop(player_id, None)
+
+    def __len__(self) -> int:
+        # Number of online players
+        return len(self.deadlines)
+
+    def __contains__(self, player_id: str) -> bool:
+        return player_id in self.deadlines
+
+    def pop_expired(self, now: float) -> List[str]:
+        expired = []
+        heap, deadlines = self.heap, self.deadlines
+        while heap and heap[0][0] <= now:
+            pushed, player_id = heapq.heappop(heap)
+            deadline = deadlines.get(player_id)
+            if deadline is None:
+                self.queued.discard(player_id)
+                continue
+            if deadline > pushed:
+                heapq.heappush(heap, (deadline, player_id))
+                continue
+            del deadlines[player_id]
+            self.queued.discard(player_id)
+            expired.append(player_id)
+        return expired
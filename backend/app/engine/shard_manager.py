@@ -0,0 +1,199 @@
+import multiprocessing
+import time
+import zlib
+from types import SimpleNamespace
+from typing import Dict, List
+
+from .monster_ai import MonsterAI
+
+class PlayerSnapshot:
+    """Read-only view of a player sent to shard workers (what MonsterAI reads)."""
+    __slots__ = ("id", "current_map_id", "is_online", "position", "stats")
+
+    def __init__(self, player_id: str, map_id: str, x: float, y: float, hp: int):
+        self.id = player_id
+        self.current_map_id = map_id
+        self.is_online = True
+        self.position = SimpleNamespace(x=x, y=y)
+        self.stats = SimpleNamespace(hp=hp)
+
+def run_shard(conn, shard_id: int):
+    """
+    Shard worker process: owns the AI simulation of the monsters on its maps.
+
+    Each message from the gateway carries monsters added/removed since the
+    last tick, AI overrides made by the gateway (aggro from player attacks)
+    and a snapshot of the players on the shard's maps. The reply holds the
+    monster updates and melee events for the gateway to apply.
+    """
+    from ..models.monster import Monster
+
+    monsters: Dict[str, Monster] = {}
+    print(f"[Shard {shard_id}] Worker started.")
+
+    while True:
+        msg = conn.recv()
+        if msg is None:
+            break
+
+        for data in msg["added"]:
+            monster = Monster.model_validate(data)
+            monsters[monster.id] = monster
+        for monster_id in msg["removed"]:
+            monsters.pop(monster_id, None)
+        for monster_id, (state, target_id) in msg["overrides"].items():
+            monster = monsters.get(monster_id)
+            if monster:
+                monster.state = state
+                monster.target_id = target_id
+
+        players = {}
+        map_players: Dict[str, List[PlayerSnapshot]] = {}
+        for row in msg["players"]:
+            snapshot = PlayerSnapshot(*row)
+            players[snapshot.id] = snapshot
+            map_players.setdefault(snapshot.current_map_id, []).append(snapshot)
+
+        updates = []
+        events = []
+        for monster in monsters.values():
+            if monster.map_id not in map_players: continue # Skip empty maps
+
+            initial_state = monster.state
+            moved, target, strike = MonsterAI.step(monster, players.get, map_players[monster.map_id], msg["dt"], msg["time"])
+            if target:
+                events.append((monster.id, target.id, strike))
+            if moved or monster.state != initial_state:
+                updates.append((monster.id, monster.position_x, monster.position_y, monster.state, monster.target_id))
+
+        conn.send({"updates": updates, "events": events})
+
+class ShardManager:
+    """
+    Gateway side of sharded mode (SHARD_WORKERS=n).
+
+    Maps are assigned to n worker processes by a stable hash of the map id.
+    The gateway keeps players, combat, HTTP and WebSocket; workers run the
+    monster AI. Every tick the gateway collects the previous reply of each
+    shard and sends it the next snapshot, so a slow shard never blocks the
+    loop (its monsters just skip a tick). Players crossing a portal simply
+    start appearing in the other shard's snapshot.
+    """
+
+    def __init__(self, worker_count: int):
+        self.worker_count = worker_count
+        self.workers = []
+        self.conns = []
+        self.in_flight: List[bool] = []
+        # monster_id -> (state, target_id) as last reported by its shard
+        self.reported: Dict[str, tuple] = {}
+        self.known: List[set] = []
+
+    def start(self):
+        ctx = multiprocessing.get_context("spawn")
+        for shard_id in range(self.worker_count):
+            parent_conn, child_conn = ctx.Pipe()
+            worker = ctx.Process(target=run_shard, args=(child_conn, shard_id), daemon=True)
+            worker.start()
+            self.workers.append(worker)
+            self.conns.append(parent_conn)
+            self.in_flight.append(False)
+            self.known.append(set())
+        print(f"[Shards] Started {self.worker_count} monster simulation workers.")
+
+    def stop(self):
+        for conn in self.conns:
+            try:
+                conn.send(None)
+            except Exception:
+                pass
+        for worker in self.workers:
+            worker.join(timeout=1.0)
+
+    def shard_for(self, map_id: str) -> int:
+        return zlib.crc32(map_id.encode()) % self.worker_count
+
+    def step(self, state_manager, dt: float):
+        """
+        Applies finished shard replies and dispatches the next tick.
+        Returns (updates, events) for GameLoop to broadcast/apply.
+        """
+        updates = []
+        events = []
+
+        for shard_id, conn in enumerate(self.conns):
+            if self.in_flight[shard_id] and conn.poll():
+                reply = conn.recv()
+                self.in_flight[shard_id] = False
+                updates.extend(self.apply_updates(state_manager, reply["updates"]))
+                events.extend(reply["events"])
+
+        # Group live monsters and online players by shard
+        shard_monsters = [dict() for _ in self.conns]
+        for monster in state_manager.monsters.values():
+            if monster.stats.hp > 0:
+                shard_monsters[self.shard_for(monster.map_id)][monster.id] = monster
+
+        shard_players = [[] for _ in self.conns]
+        for map_id, players in state_manager.map_players.items():
+            rows = shard_players[self.shard_for(map_id)]
+            for p in players:
+                rows.append((p.id, map_id, p.position.x, p.position.y, p.stats.hp))
+
+        now = time.time()
+        for shard_id, conn in enumerate(self.conns):
+            if self.in_flight[shard_id]:
+                continue # Shard still busy: skip a tick rather than queueing
+
+            monsters = shard_monsters[shard_id]
+            known = self.known[shard_id]
+            added = [m.model_dump() for mid, m in monsters.items() if mid not in known]
+            removed = [mid for mid in known if mid not in monsters]
+
+            # Gateway-side AI changes (e.g. CombatService aggro) the shard hasn't seen
+            overrides = {}
+            for mid, m in monsters.items():
+                if mid in known and self.reported.get(mid) != (m.state, m.target_id):
+                    overrides[mid] = (m.state, m.target_id)
+                    self.reported[mid] = (m.state, m.target_id)
+
+            for mid in removed:
+                self.reported.pop(mid, None)
+            for data in added:
+                self.reported[data["id"]] = (data["state"], data["target_id"])
+            self.known[shard_id] = set(monsters)
+
+            conn.send({
+                "dt": dt,
+                "time": now,
+                "added": added,
+                "removed": removed,
+                "overrides": overrides,
+                "players": shard_players[shard_id]
+            })
+            self.in_flight[shard_id] = True
+
+        return updates, events
+
+    def apply_updates(self, state_manager, rows: list) -> List[dict]:
+        updates = []
+        for monster_id, x, y, state, target_id in rows:
+            monster = state_manager.monsters.get(monster_id)
+            if not monster or monster.stats.hp <= 0:
+                continue
+            monster.position_x = x
+            monster.position_y = y
+            # Keep gateway-side AI changes made since the shard computed this (sent as override next tick)
+            if self.reported.get(monster_id) == (monster.state, monster.target_id):
+                monster.state = state
+                monster.target_id = target_id
+                self.reported[monster_id] = (state, target_id)
+            updates.append({
+                "id": monster.id,
+                "type": "monster",
+                "x": monster.position_x,
+                "y": monster.position_y,
+                "state": monster.state,
+                "map_id": monster.map_id
+            })
+        return updates
@@ -2,6 +2,13 @@ from typing import Dict, List
 from ..models.player import Player, PlayerState
 from ..models.map import GameMap
 from ..models.monster import Monster
+from .content_registry import ContentRegistry
+from .world_graph import WorldGraph
+from .nav_grid import NavGrid
+from .player_directory import PlayerDirectory
+from .outbound_buffer import OutboundBuffer
+from .presence_tracker import PresenceTracker
+from ..core.event_bus import EventBus
 
 class StateManager:
     _instance = None
@@ -18,6 +25,17 @@ class StateManager:
             cls._instance.npcs: Dict[str, NPC] = {} # Added NPC dictionary
             cls._instance.respawn_queue: List[dict] = [] # Initialize respawn_queue here
             cls._instance.resource_cooldowns: Dict[str, float] = {}
+            cls._instance.world_graph = WorldGraph({})
+            # Map ID -> (GameMap, NavGrid); rebuilt when the map object is replaced
+            cls._instance.nav_grids: Dict[str, tuple] = {}
+            # Map ID -> online Players, rebuilt every tick (see index_players_by_map)
+            cls._instance.map_players: Dict[str, List[Player]] = None
+            # Sorted account indexes for the admin users list
+            cls._instance.player_directory = PlayerDirectory()
+            # Client events queued during a tick, flushed by GameLoop
+            cls._instance.outbound = OutboundBuffer()
+            # Last-seen deadlines of online players (see expire_inactive_players)
+            cls._instance.presence = PresenceTracker(timeout=5.0)
         return cls._instance
 
     def is_resource_ready(self, resource_id: str) -> bool:
@@ -28,39 +46,33 @@ class StateManager:
         import time
         self.resource_cooldowns[resource_id] = time.time() + duration
 
+    def subscribe_content(self):
+        # Derived state is rebuilt whenever the registry reloads a file
+        content = ContentRegistry.get_instance()
+        content.on_reload("world", self.apply_world_plan, prepare=self.plan_world_update)
+        content.on_reload("missions", self.apply_missions)
+        content.on_reload("npcs", self.apply_npcs)
+
     def load_missions(self):
-        import json
-        import os
-        
-        try:
-            path = "backend/app/data/missions.json"
-            if not os.path.exists(path):
-                print(f"Missions data not found at {path}")
-                self.missions = {}
-                return
-
-            with open(path, "r") as f:
-                self.missions = json.load(f)
-            print(f"Loaded {len(self.missions)} missions.")
-        except Exception as e:
-            print(f"Failed to load missions: {e}")
-            self.missions = {}
+        ContentRegistry.get_instance().reload("missions")
+
+    def apply_missions(self, data: dict):
+        self.missions = data
+        print(f"Loaded {len(self.missions)} missions.")
 
     def load_world_data(self):
-        import json
-        import os
-        from ..models.map import GameMap
-        
+        ContentRegistry.get_instance().reload("world")
+
+    async def reload_world_data(self):
+        # Diff and build in a worker thread, swap on the loop (see plan_world_update)
+        await ContentRegistry.get_instance().reload_async("world")
+
+    def apply_world_data(self, data: dict):
+        self.apply_world_plan(self.plan_world_update(data))
+
+    def rebuild_world(self, data: dict):
+        """Full rebuild: drops every map, monster and pending respawn."""
         try:
-            # Adjust path relative to execution or use absolute
-            path = "backend/app/data/world.json"
-            if not os.path.exists(path):
-                print(f"World data not found at {path}")
-                return
-
-            with open(path, "r") as f:
-                data = json.load(f)
-                
             self.world_data = data
             self.monster_templates = data.get("monster_templates", {})
             
@@ -72,73 +84,236 @@ class StateManager:
 
             # Resource Templates
             self.resource_templates = data.get("resource_templates", {})
+            self.world_graph = WorldGraph(data.get("maps", {}))
             
             # Load Maps
             for map_id, map_data in data.get("maps", {}).items():
-                
-                # Expand Resources with Templates
-                resources_data = map_data.get("resources", [])
-                expanded_resources = []
-                for res in resources_data:
-                    if 'template_id' in res and res['template_id']:
-                        template = self.resource_templates.get(res['template_id'])
-                        if template:
-                            # Merge template into res, but res overrides
-                            merged = template.copy()
-                            merged.update(res)
-                            expanded_resources.append(merged)
-                        else:
-                            expanded_resources.append(res)
-                    else:
-                        expanded_resources.append(res)
-
-                # Create GameMap object
-                gm = GameMap(
-                    id=map_id,
-                    name=map_data["name"],
-                    type=map_data.get("type", "field"),
-                    level_requirement=map_data.get("level_requirement", 0),
-                    width=map_data["width"],
-                    height=map_data["height"],
-                    respawn_x=map_data.get("respawn_x", 50.0),
-                    respawn_y=map_data.get("respawn_y", 50.0),
-                    portals=map_data.get("portals", []),
-                    spawns=map_data.get("spawns", []),
-                    texture=map_data.get("texture"),
-                    resources=expanded_resources
-                )
-                self.maps[map_id] = gm
+                self.maps[map_id] = self.build_map(map_id, map_data, self.resource_templates)
                 
                 # Initial Spawns
-                for spawn in map_data.get("spawns", []):
-                    self.spawn_monsters_from_template(spawn, map_id)
+                spawns = map_data.get("spawns", [])
+                for spawn, key in zip(spawns, self.make_spawn_keys(spawns, self.monster_templates)):
+                    self.spawn_monsters_from_template(spawn, map_id, spawn_key=key)
             
+            self.nav_grids = {map_id: (game_map, NavGrid(game_map)) for map_id, game_map in self.maps.items()}
             self.load_npcs()
                     
         except Exception as e:
             print(f"Failed to load world data: {e}")
 
-    def load_npcs(self):
+    @staticmethod
+    def build_map(map_id: str, map_data: dict, resource_templates: dict) -> GameMap:
+        # Expand Resources with Templates
+        resources_data = map_data.get("resources", [])
+        expanded_resources = []
+        for res in resources_data:
+            if 'template_id' in res and res['template_id']:
+                template = resource_templates.get(res['template_id'])
+                if template:
+                    # Merge template into res, but res overrides
+                    merged = template.copy()
+                    merged.update(res)
+                    expanded_resources.append(merged)
+                else:
+                    expanded_resources.append(res)
+            else:
+                expanded_resources.append(res)
+
+        # Create GameMap object
+        return GameMap(
+            id=map_id,
+            name=map_data["name"],
+            type=map_data.get("type", "field"),
+            level_requirement=map_data.get("level_requirement", 0),
+            width=map_data["width"],
+            height=map_data["height"],
+            respawn_x=map_data.get("respawn_x", 50.0),
+            respawn_y=map_data.get("respawn_y", 50.0),
+            portals=map_data.get("portals", []),
+            spawns=map_data.get("spawns", []),
+            texture=map_data.get("texture"),
+            resources=expanded_resources
+        )
+
+    @staticmethod
+    def make_spawn_keys(spawns: list, monster_templates: dict) -> List[str]:
+        """
+        Stable identity per spawn entry: hash of the spawn config plus its
+        monster template, so editing either one changes the key.
+        Identical entries are told apart by an occurrence counter.
+        """
+        import json
+        import hashlib
+
+        keys = []
+        seen = {}
+        for spawn in spawns:
+            raw = json.dumps([spawn, monster_templates.get(spawn.get("template_id"))], sort_keys=True)
+            digest = hashlib.md5(raw.encode()).hexdigest()[:12]
+            n = seen.get(digest, 0)
+            seen[digest] = n + 1
+            keys.append(f"{digest}#{n}")
+        return keys
+
+    @staticmethod
+    def map_signature(map_data: dict, resource_templates: dict) -> str:
         import json
-        import os
+        if map_data is None:
+            return ""
+        # Spawns are diffed separately by key; a spawn-only edit still rebuilds the (cheap) GameMap
+        used = {r.get("template_id") for r in map_data.get("resources", []) if r.get("template_id")}
+        return json.dumps([map_data, {t: resource_templates.get(t) for t in sorted(used)}], sort_keys=True)
+
+    def plan_world_update(self, data: dict) -> dict:
+        """
+        Computes what changed between the live world and `data`.
+        Pure with respect to live state (safe to run in a worker thread):
+        it only reads the previous world_data snapshot and builds new objects.
+        """
+        if not data:
+            return None
+
+        old = getattr(self, "world_data", None)
+        if not old or not self.maps:
+            return {"full": True, "data": data}
+
+        templates = data.get("monster_templates", {})
+        res_templates = data.get("resource_templates", {})
+        old_templates = old.get("monster_templates", {})
+        old_res_templates = old.get("resource_templates", {})
+        old_maps = old.get("maps", {})
+        new_maps = data.get("maps", {})
+
+        plan = {
+            "full": False,
+            "data": data,
+            "maps": {},          # map_id -> rebuilt GameMap
+            "spawn_keys": {},    # map_id -> live spawn keys
+            "new_monsters": [],
+            "removed_maps": [m for m in old_maps if m not in new_maps],
+            "portals_changed": False,
+            "world_graph": WorldGraph(new_maps)
+        }
+
+        for map_id, map_data in new_maps.items():
+            old_data = old_maps.get(map_id)
+            if self.map_signature(map_data, res_templates) != self.map_signature(old_data, old_res_templates):
+                plan["maps"][map_id] = self.build_map(map_id, map_data, res_templates)
+                if not old_data or old_data.get("portals") != map_data.get("portals"):
+                    plan["portals_changed"] = True
+
+            spawns = map_data.get("spawns", [])
+            keys = self.make_spawn_keys(spawns, templates)
+            old_keys = set(self.make_spawn_keys(old_data.get("spawns", []), old_templates)) if old_data else set()
+            plan["spawn_keys"][map_id] = set(keys)
+
+            for spawn, key in zip(spawns, keys):
+                if key not in old_keys:
+                    plan["new_monsters"].extend(self.build_spawn_monsters(spawn, map_id, templates, key))
+
+        if plan["removed_maps"]:
+            plan["portals_changed"] = True
+        return plan
+
+    def apply_world_plan(self, plan: dict):
+        """
+        Swaps a planned world update into live state (event loop thread).
+        Monsters of unchanged spawns stay alive; changed spawns are respawned.
+        """
+        if not plan:
+            return
+        if plan["full"]:
+            self.rebuild_world(plan["data"])
+            EventBus.get_instance().publish("server_update")
+            return
+
+        data = plan["data"]
+        self.world_data = data
+        self.monster_templates = data.get("monster_templates", {})
+        self.resource_templates = data.get("resource_templates", {})
+        self.world_graph = plan["world_graph"]
+
+        changes = {}
+        def change(map_id):
+            return changes.setdefault(map_id, {"map_changed": False, "removed_monsters": [], "added_monsters": []})
+
+        for map_id in plan["removed_maps"]:
+            for mid in list(self.map_monsters.get(map_id, [])):
+                self.remove_monster(mid)
+            self.map_monsters.pop(map_id, None)
+            self.maps.pop(map_id, None)
+            change(map_id)["map_changed"] = True
+
+        for map_id, game_map in plan["maps"].items():
+            self.maps[map_id] = game_map
+            change(map_id)["map_changed"] = True
+
+        # Drop monsters and pending respawns whose spawn entry no longer exists
+        live_keys = plan["spawn_keys"]
+        for map_id, keys in live_keys.items():
+            for mid in list(self.map_monsters.get(map_id, [])):
+                monster = self.monsters.get(mid)
+                if monster and monster.spawn_key is not None and monster.spawn_key not in keys:
+                    self.remove_monster(mid)
+                    change(map_id)["removed_monsters"].append(mid)
+
+        self.respawn_queue = [
+            entry for entry in self.respawn_queue
+            if entry["map_id"] in live_keys
+            and (entry.get("spawn_key") is None or entry["spawn_key"] in live_keys[entry["map_id"]])
+        ]
+
+        for monster in plan["new_monsters"]:
+            self.add_monster(monster)
+            change(monster.map_id)["added_monsters"].append(monster)
+
+        print(f"[World] Hot reload: {len(changes)} maps affected, {len(plan['new_monsters'])} monsters spawned.")
+        self.notify_world_changes(changes, plan["portals_changed"])
+
+    def notify_world_changes(self, changes: dict, portals_changed: bool):
+        if not hasattr(self, 'connection_manager'):
+            return
+
+        messages = []
+        for player in self.players.values():
+            if not player.is_online:
+                continue
+            map_change = changes.get(player.current_map_id)
+            if map_change:
+                messages.append((player.id, {
+                    "type": "map_update",
+                    "map_id": player.current_map_id,
+                    "map_changed": map_change["map_changed"],
+                    "removed_monsters": map_change["removed_monsters"],
+                    "added_monsters": [m.dict() for m in map_change["added_monsters"]],
+                    "portals_changed": portals_changed
+                }))
+            elif portals_changed:
+                messages.append((player.id, {"type": "world_update", "portals_changed": True}))
+
+        bus = EventBus.get_instance()
+        for player_id, message in messages:
+            bus.publish(message.pop("type"), message, player_id)
+
+    def load_npcs(self):
+        ContentRegistry.get_instance().reload("npcs")
+
+    def apply_npcs(self, data: dict):
         from ..models.npc import NPC
         
         try:
-            path = "backend/app/data/npcs.json"
-            if not os.path.exists(path):
-                print(f"NPC data not found at {path}")
-                self.npcs = {}
-                return
-            
-            with open(path, "r") as f:
-                data = json.load(f)
-                self.npcs = {k: NPC(**v) for k, v in data.items()}
+            self.npcs = {k: NPC(**v) for k, v in data.items()}
             print(f"Loaded {len(self.npcs)} NPCs.")
         except Exception as e:
             print(f"Failed to load NPCs: {e}")
             self.npcs = {}
 
-    def spawn_monsters_from_template(self, spawn_config, map_id):
+    def spawn_monsters_from_template(self, spawn_config, map_id, spawn_key: str = None):
+        for monster in self.build_spawn_monsters(spawn_config, map_id, self.monster_templates, spawn_key):
+            self.add_monster(monster)
+
+    @staticmethod
+    def build_spawn_monsters(spawn_config, map_id, monster_templates: dict, spawn_key: str = None) -> List[Monster]:
         import uuid
         import random
         from ..models.monster import Monster
@@ -147,10 +322,11 @@ class StateManager:
         count = spawn_config["count"]
         area = spawn_config["area"]
         
-        template = self.monster_templates.get(template_id)
+        template = monster_templates.get(template_id)
         if not template:
-            return
+            return []
 
+        monsters = []
         for _ in range(count):
             # Random position in area
             # area: {x, y, radius}
@@ -178,20 +354,37 @@ class StateManager:
                 spawn_x=x,
                 spawn_y=y,
                 xp_reward=template["xp_reward"],
-                model_scale=template.get("model_scale", 1.0)
+                model_scale=template.get("model_scale", 1.0),
+                spawn_key=spawn_key
             )
-            self.add_monster(new_monster)
+            monsters.append(new_monster)
+        return monsters
 
     @classmethod
     def get_instance(cls):
         if cls._instance is None:
             cls()
+            cls._instance.subscribe_content()
             cls._instance.load_world_data() # Load data on init
             cls._instance.load_missions()   # Load missions on init
         return cls._instance
 
     def add_player(self, player: Player):
         self.players[player.id] = player
+        self.player_directory.add(player)
+        if player.is_online:
+            self.presence.touch(player.id, player.last_seen)
+
+    def delete_player(self, player_id: str):
+        self.players.pop(player_id, None)
+        self.player_directory.remove(player_id)
+        self.presence.discard(player_id)
+
+    def get_player_directory(self) -> PlayerDirectory:
+        directory = self.player_directory
+        if len(directory.indexed) != len(self.players):
+            directory.rebuild(self.players)
+        return directory
 
     async def remove_player(self, player_id: str):
         if player_id in self.players:
@@ -201,24 +394,47 @@ class StateManager:
             player.state = PlayerState.IDLE
             player.is_online = False
             player.target_position = None
+            self.presence.discard(player_id)
             
             # Broadcast Disconnect so clients remove the entity
-            if hasattr(self, 'connection_manager'):
-                await self.connection_manager.broadcast({
-                    "type": "player_left",
-                    "player_id": player_id
-                })
+            EventBus.get_instance().publish("player_left", {"player_id": player_id})
 
     def mark_player_online(self, player_id: str):
-        if player_id in self.players:
-            self.players[player_id].is_online = True
+        self.update_player_activity(player_id)
 
     def get_player(self, player_id: str) -> Player:
         return self.players.get(player_id)
 
+    def index_players_by_map(self):
+        # Called once per tick by GameLoop so listings don't scan every player
+        index = {}
+        online = []
+        for p in self.players.values():
+            if p.is_online:
+                index.setdefault(p.current_map_id, []).append(p)
+                online.append(p)
+        self.map_players = index
+        self.player_directory.sync_online(self.players, online)
+
+    def get_map_players(self, map_id: str) -> List[Player]:
+        if self.map_players is None:
+            self.index_players_by_map()
+        # The index can be one tick old: re-check map and online status
+        return [p for p in self.map_players.get(map_id, []) if p.is_online and p.current_map_id == map_id]
+
     def add_map(self, game_map: GameMap):
         self.maps[game_map.id] = game_map
 
+    def get_nav_grid(self, map_id: str) -> NavGrid:
+        game_map = self.maps.get(map_id)
+        if not game_map:
+            return None
+        entry = self.nav_grids.get(map_id)
+        if entry is None or entry[0] is not game_map:
+            # Map (re)built by a hot reload since the grid was made
+            entry = self.nav_grids[map_id] = (game_map, NavGrid(game_map))
+        return entry[1]
+
     def get_map(self, map_id: str) -> GameMap:
         return self.maps.get(map_id)
     
@@ -236,7 +452,7 @@ class StateManager:
             del self.monsters[monster_id]
 
     # Respawn System
-    def queue_respawn(self, monster_template_id: str, map_id: str, x: float, y: float, respawn_time: float):
+    def queue_respawn(self, monster_template_id: str, map_id: str, x: float, y: float, respawn_time: float, spawn_key: str = None):
         # We need to store when it should respawn
         import time
         respawn_at = time.time() + respawn_time
@@ -250,7 +466,8 @@ class StateManager:
             "map_id": map_id,
             "x": x,
             "y": y,
-            "respawn_at": respawn_at
+            "respawn_at": respawn_at,
+            "spawn_key": spawn_key
         })
 
     def check_respawns(self):
@@ -273,21 +490,34 @@ class StateManager:
         return to_respawn
 
     def update_player_activity(self, player_id: str):
+        # Called by player commands and WebSocket messages (including heartbeats)
         import time
-        if player_id in self.players:
-            self.players[player_id].last_seen = time.time()
-            self.players[player_id].is_online = True
+        player = self.players.get(player_id)
+        if player:
+            player.last_seen = time.time()
+            player.is_online = True
+            self.presence.touch(player_id, player.last_seen)
 
-    async def cleanup_inactive_players(self, timeout_seconds=30):
+    def expire_inactive_players(self, now: float = None) -> List[str]:
+        """
+        Marks players whose last-seen deadline passed as offline and tells
+        each affected map once ("players_left"). Cost is O(expired), so
+        GameLoop can run it every tick.
+        """
         import time
-        now = time.time()
-        to_remove = []
-        
-        for p_id, player in self.players.items():
-            if player.is_online:
-                if (now - player.last_seen) > timeout_seconds:
-                    print(f"Player {player.name} timed out (Inactive > {timeout_seconds}s)")
-                    to_remove.append(p_id)
-        
-        for p_id in to_remove:
-            await self.remove_player(p_id)
+        expired = self.presence.pop_expired(time.time() if now is None else now)
+        by_map = {}
+        for p_id in expired:
+            player = self.players.get(p_id)
+            if not player or not player.is_online:
+                continue
+            print(f"Player {player.name} timed out (Inactive > {self.presence.timeout}s)")
+            player.state = PlayerState.IDLE
+            player.is_online = False
+            player.target_position = None
+            by_map.setdefault(player.current_map_id, []).append(p_id)
+
+        event_bus = EventBus.get_instance()
+        for map_id, player_ids in by_map.items():
+            event_bus.publish("players_left", {"map_id": map_id, "player_ids": player_ids})
+        return expired
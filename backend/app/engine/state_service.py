@@ -0,0 +1,190 @@
+import asyncio
+import json
+import os
+import stat
+import struct
+import time
+from types import SimpleNamespace
+from typing import List
+
+from .state_manager import StateManager
+
+# Read-mostly GET routes that API workers answer from their replica
+REPLICA_ROUTES = {
+    "/map/{map_id}",
+    "/map/{map_id}/npcs",
+    "/map/{map_id}/monsters",
+    "/map/{map_id}/players",
+    "/content/missions",
+    "/rewards",
+    "/editor/world",
+}
+
+HEADER = struct.Struct("!I")
+
+# Monster fields replicated to API workers (what the replicated routes return)
+MONSTER_ROW = ("id", "template_id", "name", "level", "m_type", "map_id", "position_x", "position_y",
+               "hp", "max_hp", "atk", "def_", "speed", "state", "target_id", "xp_reward", "model_scale")
+
+def check_socket_dir(path: str, create: bool = False):
+    """
+    The socket must live in a directory only this user can write to (0700),
+    so no other local user can bind the path first or replace it.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    if create:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+    st = os.stat(directory)
+    if st.st_uid != os.getuid() or st.st_mode & 0o077:
+        raise RuntimeError(f"STATE_SOCKET directory {directory} must be owned by this user with mode 0700")
+
+class ReplicaPlayer:
+    """Public subset of a Player, as replicated to API workers."""
+    __slots__ = ("id", "name", "level", "p_class", "current_map_id", "is_online", "position", "stats", "state")
+
+    def __init__(self, row: tuple):
+        from ..models.player import PlayerClass, PlayerState
+        player_id, name, level, p_class, map_id, x, y, hp, max_hp, state = row
+        self.id = player_id
+        self.name = name
+        self.level = level
+        self.p_class = PlayerClass(p_class)
+        self.current_map_id = map_id
+        self.is_online = True
+        self.position = SimpleNamespace(x=x, y=y)
+        self.stats = SimpleNamespace(hp=hp, max_hp=max_hp)
+        self.state = PlayerState(state)
+
+class StateService:
+    """
+    Simulation side of multi-worker mode (STATE_SOCKET=/path.sock).
+
+    Publishes a snapshot of live state (monsters, online players, resource
+    cooldowns) to every connected API worker over a Unix socket. The
+    snapshot is JSON-encoded once per interval regardless of worker count;
+    HTTP parsing and JSON encoding for the replicated routes happen in the
+    workers.
+    """
+
+    def __init__(self, path: str, interval: float = 0.25):
+        self.path = path
+        self.interval = interval
+        self.subscribers: List[asyncio.StreamWriter] = []
+
+    async def start(self):
+        check_socket_dir(self.path, create=True)
+        if os.path.lexists(self.path):
+            # Only replace a stale socket of ours
+            st = os.lstat(self.path)
+            if not stat.S_ISSOCK(st.st_mode) or st.st_uid != os.getuid():
+                raise RuntimeError(f"STATE_SOCKET {self.path} exists and is not our socket")
+            os.remove(self.path)
+        await asyncio.start_unix_server(self.on_connect, path=self.path)
+        print(f"[StateService] Publishing state on {self.path}")
+        asyncio.create_task(self.publish_loop())
+
+    async def on_connect(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.subscribers.append(writer)
+        # Send the current state right away instead of waiting for the next interval
+        writer.write(self.encode(self.build_snapshot()))
+
+    @staticmethod
+    def build_snapshot() -> dict:
+        sm = StateManager.get_instance()
+        return {
+            "time": time.time(),
+            # Flat rows, read off attributes (no model_dump on the simulation loop)
+            "monsters": [
+                (m.id, m.template_id, m.name, m.level, m.m_type.value, m.map_id, m.position_x, m.position_y,
+                 m.stats.hp, m.stats.max_hp, m.stats.atk, m.stats.def_, m.stats.speed, m.state, m.target_id,
+                 m.xp_reward, m.model_scale)
+                for m in sm.monsters.values() if m.stats.hp > 0
+            ],
+            "players": [
+                (p.id, p.name, p.level, p.p_class.value, p.current_map_id,
+                 p.position.x, p.position.y, p.stats.hp, p.stats.max_hp, p.state.value)
+                for p in sm.players.values() if p.is_online
+            ],
+            "resource_cooldowns": dict(sm.resource_cooldowns)
+        }
+
+    @staticmethod
+    def encode(snapshot: dict) -> bytes:
+        # JSON, not pickle: decoding a frame must never execute code in the worker
+        payload = json.dumps(snapshot, separators=(",", ":")).encode()
+        return HEADER.pack(len(payload)) + payload
+
+    async def publish_loop(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            if not self.subscribers:
+                continue
+            try:
+                frame = self.encode(self.build_snapshot())
+            except Exception as e:
+                print(f"[StateService] Snapshot error: {e}")
+                continue
+
+            for writer in list(self.subscribers):
+                if writer.is_closing():
+                    self.subscribers.remove(writer)
+                    continue
+                writer.write(frame)
+                try:
+                    await writer.drain()
+                except (ConnectionError, OSError):
+                    self.subscribers.remove(writer)
+                    writer.close()
+
+class StateReplica:
+    """
+    API worker side: applies snapshots from the StateService into this
+    process's StateManager, so the regular route handlers serve them.
+    Content (maps, NPCs, missions) is loaded locally from the data files.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.snapshot_time = 0.0
+
+    async def run(self):
+        check_socket_dir(self.path)
+        sm = StateManager.get_instance()
+        # Monsters spawned by the local world load are not the live ones
+        sm.monsters = {}
+        sm.map_monsters = {}
+
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+                print(f"[StateReplica] Connected to {self.path}")
+                while True:
+                    header = await reader.readexactly(HEADER.size)
+                    payload = await reader.readexactly(HEADER.unpack(header)[0])
+                    self.apply(json.loads(payload))
+            except (ConnectionError, OSError, asyncio.IncompleteReadError) as e:
+                print(f"[StateReplica] Disconnected ({e}), retrying...")
+                await asyncio.sleep(1.0)
+
+    def apply(self, snapshot: dict):
+        from ..models.monster import Monster, MonsterStats, MonsterType
+        sm = StateManager.get_instance()
+
+        monsters = {}
+        map_monsters = {}
+        for row in snapshot["monsters"]:
+            data = dict(zip(MONSTER_ROW, row))
+            stats = MonsterStats.model_construct(**{k: data.pop(k) for k in ("hp", "max_hp", "atk", "def_", "speed")})
+            data["m_type"] = MonsterType(data["m_type"])
+            # Trusted rows from our own process: skip validation, AI-only fields keep their defaults
+            monster = Monster.model_construct(stats=stats, **data)
+            monsters[monster.id] = monster
+            map_monsters.setdefault(monster.map_id, []).append(monster.id)
+
+        # Swap whole dicts: handlers never see a half-applied snapshot
+        sm.monsters = monsters
+        sm.map_monsters = map_monsters
+        sm.players = {row[0]: ReplicaPlayer(row) for row in snapshot["players"]}
+        sm.resource_cooldowns = snapshot["resource_cooldowns"]
+        sm.index_players_by_map()
+        self.snapshot_time = snapshot["time"]
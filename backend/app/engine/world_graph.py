@@ -0,0 +1,90 @@
+import math
+from collections import deque
+from typing import Dict, List, Optional
+
+class WorldGraph:
+    """
+    Portal graph between maps, built once per world load.
+
+    Nodes are map ids, edges are portals. A BFS from every map fills
+    `next_hop[src][dst]` (first portal to take) and `hops[src][dst]`, so a
+    route lookup is a walk over precomputed tables instead of a search.
+    """
+
+    def __init__(self, maps: dict):
+        self.maps = maps
+        # map_id -> [portal dict] (only portals leading to an existing map)
+        self.edges: Dict[str, List[dict]] = {}
+        self.next_hop: Dict[str, Dict[str, str]] = {}
+        self.hops: Dict[str, Dict[str, int]] = {}
+
+        for map_id, map_data in maps.items():
+            self.edges[map_id] = [
+                p for p in map_data.get("portals", [])
+                if p.get("target_map_id") in maps and p.get("target_map_id") != map_id
+            ]
+
+        for map_id in maps:
+            self.build_tables(map_id)
+
+    def build_tables(self, source: str):
+        # next_hop stores the neighbouring map id; the concrete portal is
+        # picked at lookup time (closest to the player's position)
+        next_hop = {}
+        hops = {source: 0}
+        queue = deque([source])
+
+        while queue:
+            current = queue.popleft()
+            for portal in self.edges.get(current, []):
+                target = portal["target_map_id"]
+                if target in hops:
+                    continue
+                hops[target] = hops[current] + 1
+                next_hop[target] = target if current == source else next_hop[current]
+                queue.append(target)
+
+        self.next_hop[source] = next_hop
+        self.hops[source] = hops
+
+    def is_reachable(self, from_map: str, to_map: str) -> bool:
+        return to_map in self.hops.get(from_map, {})
+
+    def pick_portal(self, map_id: str, target_map_id: str, x: float = None, y: float = None) -> Optional[dict]:
+        portals = [p for p in self.edges.get(map_id, []) if p["target_map_id"] == target_map_id]
+        if not portals:
+            return None
+        if x is None or y is None:
+            return portals[0]
+        return min(portals, key=lambda p: math.hypot(p["x"] - x, p["y"] - y))
+
+    def route(self, from_map: str, to_map: str, x: float = None, y: float = None) -> Optional[List[dict]]:
+        """
+        Portal steps from (from_map, x, y) to to_map. [] if already there,
+        None if unreachable. Each step's arrival point seeds the next portal choice.
+        """
+        if from_map == to_map:
+            return []
+        if not self.is_reachable(from_map, to_map):
+            return None
+
+        steps = []
+        current = from_map
+        while current != to_map:
+            next_map = self.next_hop[current][to_map]
+            portal = self.pick_portal(current, next_map, x, y)
+            target_x = portal.get("target_x", portal["x"])
+            target_y = portal.get("target_y", portal["y"])
+            steps.append({
+                "map_id": current,
+                "portal_id": portal["id"],
+                "x": portal["x"],
+                "y": portal["y"],
+                "target_map_id": next_map,
+                "target_x": target_x,
+                "target_y": target_y,
+                "level_requirement": self.maps[next_map].get("level_requirement", 0)
+            })
+            current, x, y = next_map, target_x, target_y
+
+        return steps
@@ -0,0 +1,137 @@
+from typing import Dict, List, Optional, Tuple
+from pydantic_core import core_schema
+from .item import Item
+
+
+class Inventory(list):
+    """
+    Player inventory: a plain list of Items (order and JSON shape unchanged)
+    that keeps lookup indexes in sync on every mutation.
+
+    - by instance id     -> get()
+    - by template id     -> by_template() / count_template()
+    - by stack key       -> find_stack() (name + type, as used for stacking)
+
+    Item quantities are mutated in place by callers; they are not indexed,
+    counts are summed over the (small) template bucket on demand.
+    """
+
+    def __init__(self, items=()):
+        super().__init__(items)
+        self._reindex()
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        # Validate as List[Item], then wrap. Serializes as a normal list.
+        return core_schema.no_info_after_validator_function(cls, handler.generate_schema(List[Item]))
+
+    def __reduce__(self):
+        # Rebuild through __init__ so copies get fresh indexes
+        return (self.__class__, (list(self),))
+
+    @staticmethod
+    def template_of(item: Item) -> str:
+        # Legacy items without template_id use the "<template_id>_<uuid8>" id format
+        return item.template_id or item.id.rsplit("_", 1)[0]
+
+    @staticmethod
+    def stack_key(item: Item) -> Tuple[str, str]:
+        return (item.name, item.type)
+
+    # --- Index maintenance ---
+
+    def _reindex(self):
+        self._by_id: Dict[str, Item] = {}
+        self._by_template: Dict[str, List[Item]] = {}
+        self._stacks: Dict[Tuple[str, str], List[Item]] = {}
+        for item in self:
+            self._index(item)
+
+    def _index(self, item: Item):
+        self._by_id[item.id] = item
+        self._by_template.setdefault(self.template_of(item), []).append(item)
+        self._stacks.setdefault(self.stack_key(item), []).append(item)
+
+    def _unindex(self, item: Item):
+        if self._by_id.get(item.id) is item:
+            del self._by_id[item.id]
+        for index, key in ((self._by_template, self.template_of(item)), (self._stacks, self.stack_key(item))):
+            bucket = index.get(key)
+            if bucket:
+                for i, other in enumerate(bucket):
+                    if other is item:
+                        del bucket[i]
+                        break
+                if not bucket:
+                    del index[key]
+
+    # --- Lookups ---
+
+    def get(self, item_id: str) -> Optional[Item]:
+        return self._by_id.get(item_id)
+
+    def by_template(self, template_id: str) -> List[Item]:
+        return list(self._by_template.get(template_id, ()))
+
+    def count_template(self, template_id: str) -> int:
+        return sum(item.quantity for item in self._by_template.get(template_id, ()))
+
+    def find_stack(self, item: Item) -> Optional[Item]:
+        """Returns the existing item a new stackable item should merge into."""
+        bucket = self._stacks.get(self.stack_key(item))
+        return bucket[0] if bucket else None
+
+    # --- Mutations ---
+
+    def append(self, item: Item):
+        super().append(item)
+        self._index(item)
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def insert(self, index: int, item: Item):
+        super().insert(index, item)
+        self._reindex() # Keeps bucket order consistent with list order
+
+    def remove(self, item: Item):
+        # Match by identity; pydantic equality compares every field
+        for i, other in enumerate(self):
+            if other is item:
+                super().__delitem__(i)
+                self._unindex(item)
+                return
+        super().remove(item)
+        self._reindex()
+
+    def remove_many(self, items):
+        """Removes several items in a single pass over the list."""
+        doomed = {id(item) for item in items}
+        if not doomed:
+            return
+        kept = [item for item in self if id(item) not in doomed]
+        super().clear()
+        super().extend(kept)
+        self._reindex()
+
+    def pop(self, index: int = -1) -> Item:
+        item = super().pop(index)
+        self._unindex(item)
+        return item
+
+    def clear(self):
+        super().clear()
+        self._reindex()
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._reindex()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._reindex()
@@ -1,5 +1,5 @@
 from enum import Enum
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, model_serializer, model_validator
 from typing import Optional
 
 class ItemType(str, Enum):
@@ -25,6 +25,9 @@ class ItemRarity(str, Enum):
     LEGENDARY = "legendary"
 
 class ItemStats(BaseModel):
+    # Frozen: instances are shared between an item prototype and every copy of it
+    model_config = ConfigDict(frozen=True)
+
     strength: int = 0
     intelligence: int = 0
     atk: int = 0
@@ -40,8 +43,21 @@ class ItemStats(BaseModel):
     crit_dmg: float = 0.50  # 50% Bonus (Total 150%)
     lifesteal: float = 0.0
 
+class BulkItemQuery(BaseModel):
+    """Selects inventory items for bulk actions: explicit ids and/or filters."""
+    item_ids: Optional[list[str]] = None
+    rarity: Optional[ItemRarity] = None
+    type: Optional[ItemType] = None
+    # Use only: units per item id (default: as many as are useful, see InventoryService.use_items)
+    quantities: Optional[dict[str, int]] = None
+
+# Fields an instance inherits from its prototype (see data/items.py).
+# Everything else (quantity, enhancement, awakenings) is per-instance state.
+TEMPLATE_FIELDS = ("name", "type", "slot", "rarity", "stats", "power_score", "icon", "stackable")
+
 class Item(BaseModel):
     id: str
+    template_id: Optional[str] = None
     name: str
     type: ItemType
     slot: ItemSlot
@@ -60,3 +76,70 @@ class Item(BaseModel):
     def calculate_power_score(self):
         # Simple power score calculation
         self.power_score = self.stats.strength + self.stats.intelligence + self.stats.atk + self.stats.def_
+
+    @model_validator(mode="before")
+    @classmethod
+    def hydrate_from_prototype(cls, data):
+        """
+        Fills template fields missing from compact records (players.json) from
+        the item prototype, and re-links stats identical to the template to the
+        shared prototype stats object.
+        """
+        if not isinstance(data, dict):
+            return data
+
+        from ..data.items import get_prototype # Import locally to avoid circular
+
+        template_id = data.get("template_id")
+        if not template_id and "id" in data:
+            # Legacy records: ids are "<template_id>_<uuid8>"
+            template_id = str(data["id"]).rsplit("_", 1)[0]
+
+        proto = get_prototype(template_id)
+        if not proto:
+            return data
+
+        data = dict(data)
+        data["template_id"] = template_id
+        for name in TEMPLATE_FIELDS:
+            if name not in data:
+                data[name] = getattr(proto, name)
+
+        stats = data["stats"]
+        if isinstance(stats, dict) and stats == proto.stats.model_dump():
+            data["stats"] = proto.stats
+        return data
+
+    @model_serializer(mode="wrap")
+    def serialize(self, handler, info):
+        # Compact mode (persistence) drops every field still equal to the prototype
+        proto = None
+        if info.context and info.context.get("compact_items"):
+            from ..data.items import get_prototype
+            proto = get_prototype(self.template_id)
+
+        if proto is None:
+            return handler(self)
+
+        data = {
+            "id": self.id,
+            "template_id": self.template_id,
+            "quantity": self.quantity,
+            "enhancement_level": self.enhancement_level,
+            "awakenings": self.awakenings
+        }
+        for name in TEMPLATE_FIELDS:
+            value = getattr(self, name)
+            if name == "stats":
+                if value is not proto.stats and value != proto.stats:
+                    data["stats"] = value.model_dump()
+            elif value != getattr(proto, name):
+                data[name] = value
+        return data
+
+    def clone(self, new_id: str) -> "Item":
+        """Copies the instance under a new id, keeping the shared stats reference."""
+        return self.model_copy(update={
+            "id": new_id,
+            "awakenings": [dict(b) for b in self.awakenings]
+        })
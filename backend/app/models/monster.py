@@ -44,3 +44,5 @@ class Monster(BaseModel):
     xp_reward: int
     model_scale: float = 1.0
     last_attack_time: float = 0
+    # Identity of the world.json spawn entry this monster belongs to (hot reload diffing)
+    spawn_key: Optional[str] = None
@@ -1,7 +1,8 @@
 from enum import Enum
-from typing import List, Dict, Optional
+from typing import Any, List, Dict, Optional, Tuple
 from pydantic import BaseModel, Field
 from .item import Item, ItemSlot
+from .inventory import Inventory
 
 class PlayerClass(str, Enum):
     WARRIOR = "warrior"
@@ -13,6 +14,11 @@ class PlayerState(str, Enum):
     MOVING = "moving"
     COMBAT = "combat"
 
+class AutoFarmSettings(BaseModel):
+    map_id: str
+    target_template_id: Optional[str] = None # None = any monster
+    mission_id: Optional[str] = None # Stop once this mission's kill count is reached
+
 class Position(BaseModel):
     x: float
     y: float
@@ -45,6 +51,9 @@ class Player(BaseModel):
     target_monster_id: Optional[str] = None
     target_position: Optional[Position] = None
     
+    # Server-side Auto-Farm (evaluated by GameLoop while online)
+    auto_farm: Optional[AutoFarmSettings] = None
+
     # Mission System
     active_mission_id: Optional[str] = None
     mission_progress: int = 0
@@ -60,7 +69,7 @@ class Player(BaseModel):
     attribute_points: int = 0
 
     # Inventory and Equipment
-    inventory: List[Item] = []
+    inventory: Inventory = Field(default_factory=Inventory)
     # Key: reward_id, Value: timestamp (or 0 for just claimed)
     claimed_rewards: Dict[str, float] = {}
     equipment: Dict[ItemSlot, Optional[Item]] = {
@@ -83,6 +92,11 @@ class Player(BaseModel):
     gathering_resource_id: Optional[str] = None
     is_online: bool = True
     last_seen: float = 0.0
+    # Server-side pathing: waypoints towards path_for (the target_position they were planned for)
+    waypoints: List[Tuple[float, float]] = Field(default_factory=list, exclude=True)
+    path_for: Optional[Position] = Field(None, exclude=True)
+    # NavGrid.plan() generator while an uncached path is still being searched
+    planner: Optional[Any] = Field(None, exclude=True)
 
     def calculate_stats(self):
         # Base stats from attributes
@@ -121,13 +135,8 @@ class Player(BaseModel):
                 # Import here to avoid circular dependency at module level
                 from ..services.upgrade_service import UpgradeService
                 
-                # Default 5% if config missing
-                bonus_pct = UpgradeService.config.get("stat_bonus_percent", {}).get(item.rarity.value, 5.0)
-                
-                mult = 1.0
-                if item.enhancement_level > 0:
-                    # Compound formula: (1 + pct/100) ^ level
-                    mult = ((1.0 + (bonus_pct / 100.0)) ** item.enhancement_level)
+                # Precomputed (1 + pct/100) ^ level, see UpgradeService.compile_tables
+                mult = UpgradeService.get_stat_multiplier(item.rarity.value, item.enhancement_level)
                 
                 base_hp += int(item.stats.hp * mult)
                 base_atk += int(item.stats.atk * mult)
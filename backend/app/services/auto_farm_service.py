@@ -0,0 +1,117 @@
+import math
+from typing import Optional
+from ..models.player import Player, PlayerState, Position, AutoFarmSettings
+from .movement_service import MovementService
+
+class AutoFarmService:
+    """
+    Server-side auto-farm. GameLoop calls update() for idle players with
+    `auto_farm` set; the player then walks/fights through the regular
+    MOVING/COMBAT states, so clients only see the resulting batch_update.
+    """
+
+    ATTACK_RANGE = 1.5
+    PORTAL_RANGE = 1.5
+
+    @staticmethod
+    def start(player: Player, map_id: str = None, target_template_id: str = None, mission_id: str = None) -> AutoFarmSettings:
+        player.auto_farm = AutoFarmSettings(
+            map_id=map_id or player.current_map_id,
+            target_template_id=target_template_id,
+            mission_id=mission_id
+        )
+        return player.auto_farm
+
+    @staticmethod
+    def start_mission(player: Player, mission: dict) -> AutoFarmSettings:
+        # Same target resolution as CombatService.check_mission_progress
+        target_id = mission.get("target_monster_id") or mission.get("target_template_id")
+        return AutoFarmService.start(player, mission.get("map_id"), target_id, mission["id"])
+
+    @staticmethod
+    def stop(player: Player):
+        player.auto_farm = None
+
+    @staticmethod
+    def is_mission_done(player: Player, settings: AutoFarmSettings) -> bool:
+        from ..engine.state_manager import StateManager
+
+        if not settings.mission_id:
+            return False
+        if player.active_mission_id != settings.mission_id:
+            return True
+        mission = StateManager.get_instance().missions.get(settings.mission_id)
+        return not mission or player.mission_progress >= mission.get("target_count", 1)
+
+    @staticmethod
+    def find_target(player: Player, settings: AutoFarmSettings):
+        from ..engine.state_manager import StateManager
+        sm = StateManager.get_instance()
+
+        # Per-map monster index: only monsters on the player's map are scanned
+        closest = None
+        closest_dist = float("inf")
+        for monster_id in sm.map_monsters.get(player.current_map_id, []):
+            monster = sm.monsters.get(monster_id)
+            if not monster or monster.stats.hp <= 0:
+                continue
+            if settings.target_template_id and monster.template_id != settings.target_template_id:
+                continue
+            dist = (monster.position_x - player.position.x) ** 2 + (monster.position_y - player.position.y) ** 2
+            if dist < closest_dist:
+                closest_dist = dist
+                closest = monster
+        return closest
+
+    @staticmethod
+    def update(player: Player) -> Optional[dict]:
+        """
+        Decides the next action for an idle auto-farming player.
+        Returns an event dict (map switch / stop) for GameLoop to broadcast, or None.
+        """
+        from ..engine.state_manager import StateManager
+        sm = StateManager.get_instance()
+
+        settings = player.auto_farm
+        if player.stats.hp <= 0:
+            return None
+
+        if AutoFarmService.is_mission_done(player, settings):
+            AutoFarmService.stop(player)
+            return {"type": "auto_farm_stopped", "reason": "Mission objective complete"}
+
+        # 1. Map Traversal (precomputed portal routes)
+        if player.current_map_id != settings.map_id:
+            steps = sm.world_graph.route(player.current_map_id, settings.map_id, player.position.x, player.position.y)
+            if not steps:
+                AutoFarmService.stop(player)
+                return {"type": "auto_farm_stopped", "reason": f"No route to {settings.map_id}"}
+
+            step = steps[0]
+            if player.level < step["level_requirement"]:
+                AutoFarmService.stop(player)
+                return {"type": "auto_farm_stopped", "reason": f"Level {step['level_requirement']} required to enter {step['target_map_id']}"}
+
+            dist = math.sqrt((player.position.x - step["x"]) ** 2 + (player.position.y - step["y"]) ** 2)
+            if dist > AutoFarmService.PORTAL_RANGE:
+                player.target_position = Position(x=step["x"], y=step["y"])
+                player.state = PlayerState.MOVING
+                return None
+
+            target_map = sm.get_map(step["target_map_id"])
+            old_map_id = MovementService.switch_map(player, target_map, step["target_map_id"], step["target_x"], step["target_y"])
+            return {"type": "player_left_map", "player_id": player.id, "map_id": old_map_id}
+
+        # 2. Combat on the farming map
+        monster = AutoFarmService.find_target(player, settings)
+        if not monster:
+            return None
+
+        dist = math.sqrt((player.position.x - monster.position_x) ** 2 + (player.position.y - monster.position_y) ** 2)
+        if dist > AutoFarmService.ATTACK_RANGE:
+            player.target_position = Position(x=monster.position_x, y=monster.position_y)
+            player.state = PlayerState.MOVING
+        else:
+            player.target_monster_id = monster.id
+            player.state = PlayerState.COMBAT
+        return None
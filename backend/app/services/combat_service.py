@@ -1,42 +1,112 @@
 import random
 from ..models.player import Player, PlayerState
 from ..models.monster import Monster
-from ..models.item import Item, ItemType, ItemSlot, ItemRarity, ItemStats
+from ..models.item import ItemType, ItemSlot, ItemRarity
 from .inventory_service import InventoryService
+from .leaderboard_service import LeaderboardService
+
+try:
+    import numpy as np
+except ImportError:  # Optional: batches fall back to a Python loop
+    np = None
 
 class CombatService:
-    
+
+    # Below this size a Python loop beats NumPy's per-call overhead
+    NUMPY_MIN_BATCH = 16
+
+    @staticmethod
+    def stat_values(stats) -> tuple:
+        """(atk, def, crit_rate, crit_dmg, lifesteal) from a Stats object or a plain int (legacy)."""
+        if isinstance(stats, int):
+            return stats, stats, 0.05, 0.50, 0.0
+        return (
+            stats.atk,
+            stats.def_,
+            getattr(stats, 'crit_rate', 0.05),
+            getattr(stats, 'crit_dmg', 0.50),
+            getattr(stats, 'lifesteal', 0.0)
+        )
+
     @staticmethod
     def calculate_damage(attacker_stats, defender_stats) -> tuple[int, bool]:
-        # Handle both int (legacy/direct) and Stats objects
-        atk = attacker_stats.atk if hasattr(attacker_stats, 'atk') else attacker_stats
-        def_ = defender_stats.def_ if hasattr(defender_stats, 'def_') else defender_stats
-        
-        # Crit Logic
-        crit_rate = getattr(attacker_stats, 'crit_rate', 0.05) if hasattr(attacker_stats, 'crit_rate') else 0.05
-        crit_dmg_mult = getattr(attacker_stats, 'crit_dmg', 0.50) if hasattr(attacker_stats, 'crit_dmg') else 0.50
-        
-        is_critical = random.random() < crit_rate
-        
-        base_damage = atk - (def_ // 2)
-        base_damage = max(1, base_damage)
-        
-        final_damage = base_damage
-        if is_critical:
-            # Base damage + (Base Damage * Crit Bonus) = Base * (1 + Bonus)
-            # Usually Crit Dmg is total multiplier (e.g. 150% = 1.5x) or bonus (e.g. +50%).
-            # Model default is 0.50. Let's treat it as BONUS (150% total).
-            final_damage = int(base_damage * (1.0 + crit_dmg_mult))
-            
-        return final_damage, is_critical
+        atk, _, crit_rate, crit_dmg, _ = CombatService.stat_values(attacker_stats)
+        def_ = CombatService.stat_values(defender_stats)[1]
+        damage, crits, _ = CombatService.calculate_damage_batch([atk], [def_], [crit_rate], [crit_dmg])
+        return damage[0], crits[0]
 
     @staticmethod
-    def process_combat_round(player: Player, monster: Monster) -> dict:
+    def calculate_damage_batch(atk, def_, crit_rate, crit_dmg, lifesteal=None, rolls=None) -> tuple[list, list, list]:
+        """
+        Damage for many attacker/defender pairs at once (AoE hits, mass fights).
+        Inputs are parallel sequences; rolls (uniform [0, 1) crit rolls) are drawn if omitted.
+        Returns (damage, crit flags, lifesteal heals) as plain lists.
+
+        base = max(1, atk - def // 2); a crit deals int(base * (1 + crit_dmg))
+        (crit_dmg is the bonus, 0.50 -> 150%); heal = int(damage * lifesteal).
+        """
+        n = len(atk)
+        if np is not None and n >= CombatService.NUMPY_MIN_BATCH:
+            atk_a = np.asarray(atk, dtype=np.int64)
+            def_a = np.asarray(def_, dtype=np.int64)
+            rolls_a = np.random.random(n) if rolls is None else np.asarray(rolls, dtype=np.float64)
+            crits = rolls_a < np.asarray(crit_rate, dtype=np.float64)
+            base = np.maximum(1, atk_a - def_a // 2)
+            crit_damage = np.floor(base * (1.0 + np.asarray(crit_dmg, dtype=np.float64))).astype(np.int64)
+            damage = np.where(crits, crit_damage, base)
+            if lifesteal is None:
+                heals = np.zeros(n, dtype=np.int64)
+            else:
+                heals = np.floor(damage * np.maximum(0.0, np.asarray(lifesteal, dtype=np.float64))).astype(np.int64)
+            return damage.tolist(), crits.tolist(), heals.tolist()
+
+        damage, crits, heals = [], [], []
+        for i in range(n):
+            roll = random.random() if rolls is None else rolls[i]
+            is_critical = roll < crit_rate[i]
+            base = max(1, atk[i] - (def_[i] // 2))
+            final_damage = int(base * (1.0 + crit_dmg[i])) if is_critical else base
+            damage.append(final_damage)
+            crits.append(is_critical)
+            heals.append(int(final_damage * lifesteal[i]) if lifesteal is not None and lifesteal[i] > 0 else 0)
+        return damage, crits, heals
+
+    @staticmethod
+    def resolve_attacks(attacks: list, state_manager) -> list:
+        """
+        Resolution phase of the tick's combat step: every (player, monster)
+        pair whose attack cooldown elapsed, in collection order. Pure state
+        changes, no awaits or I/O; GameLoop emits the events afterwards.
+        Returns [(player, monster, log)]; log is empty when the attack no
+        longer applies (monster killed earlier this tick, player dead).
+        """
+        # Player hits don't depend on the order of resolution: roll them all in one batch
+        columns = [[], [], [], [], []]
+        for player, monster in attacks:
+            atk, _, crit_rate, crit_dmg, lifesteal = CombatService.stat_values(player.stats)
+            for column, value in zip(columns, (atk, monster.stats.def_, crit_rate, crit_dmg, lifesteal)):
+                column.append(value)
+        hits = zip(*CombatService.calculate_damage_batch(*columns))
+
+        results = []
+        for (player, monster), hit in zip(attacks, hits):
+            if monster.stats.hp <= 0 or player.stats.hp <= 0:
+                results.append((player, monster, {}))
+                continue
+            results.append((player, monster, CombatService.process_combat_round(player, monster, state_manager, hit)))
+        return results
+
+    @staticmethod
+    def process_combat_round(player: Player, monster: Monster, state_manager=None, hit: tuple = None) -> dict:
         """
         Processes one round of combat.
+        hit: precomputed (damage, crit, heal) for the player's attack (see resolve_attacks).
         Returns a dict with combat log/events.
         """
         log = {}
+        if state_manager is None:
+            from ..engine.state_manager import StateManager
+            state_manager = StateManager.get_instance()
         
         # Validate Combat (Same Map)
         if str(player.current_map_id) != str(monster.map_id):
@@ -52,31 +122,21 @@ class CombatService:
         log['monster_y'] = monster.position_y
         
         # Player hits Monster
-        dmg_to_monster, is_crit = CombatService.calculate_damage(player.stats, monster.stats)
+        if hit is None:
+            atk, _, crit_rate, crit_dmg, lifesteal = CombatService.stat_values(player.stats)
+            hit = next(zip(*CombatService.calculate_damage_batch(
+                [atk], [monster.stats.def_], [crit_rate], [crit_dmg], [lifesteal]
+            )))
+        dmg_to_monster, is_crit, heal_amount = hit
         monster.stats.hp -= dmg_to_monster
         log['player_dmg'] = dmg_to_monster
         if is_crit:
             log['player_crit'] = True
             
         # Lifesteal Logic
-        lifesteal = player.stats.lifesteal if hasattr(player.stats, 'lifesteal') else 0.0
-        
-        # DEBUG LOG
-        print(f"[COMBAT DEBUG] Player: {player.name} | Atk: {player.stats.atk} | Dmg: {dmg_to_monster} | Lifesteal %: {lifesteal}")
-        
-        if lifesteal > 0 and dmg_to_monster > 0:
-            heal_amount = int(dmg_to_monster * lifesteal)
-            print(f"[COMBAT DEBUG] Heal Calc: {dmg_to_monster} * {lifesteal} = {dmg_to_monster * lifesteal} -> Int: {heal_amount}")
-            
-            if heal_amount > 0:
-                old_hp = player.stats.hp
-                player.stats.hp = min(player.stats.max_hp, player.stats.hp + heal_amount)
-                log['player_heal'] = heal_amount
-                print(f"[COMBAT DEBUG] HP Updated: {old_hp} -> {player.stats.hp} (Max: {player.stats.max_hp})")
-            else:
-                print(f"[COMBAT DEBUG] Heal amount was 0 after rounding.")
-        else:
-            print(f"[COMBAT DEBUG] No lifesteal triggered. (LS: {lifesteal}, Dmg: {dmg_to_monster})")
+        if heal_amount > 0:
+            player.stats.hp = min(player.stats.max_hp, player.stats.hp + heal_amount)
+            log['player_heal'] = heal_amount
         
         # Aggro Logic: If monster was passive/idle, it now fights back
         if monster.stats.hp > 0 and not monster.target_id:
@@ -84,8 +144,7 @@ class CombatService:
             monster.state = "CHASING"
             
             # Group Aggro: Alert nearby monsters of same type
-            from ..engine.state_manager import StateManager
-            sm = StateManager.get_instance()
+            sm = state_manager
             nearby_radius = 8.0
             
             map_monsters = sm.map_monsters.get(monster.map_id, [])
@@ -117,16 +176,16 @@ class CombatService:
                 log['level_up'] = True
                 log['new_level'] = player.level
                 
-                # Broadcast Level Up Event
-                try:
-                    import asyncio
-                    asyncio.create_task(state_manager.connection_manager.broadcast({
-                        "type": "level_up",
-                        "player_id": player.id,
-                        "new_level": player.level
-                    }))
-                except Exception as e:
-                    print(f"Error broadcasting level up: {e}")
+                # Level Up Event (with the new level rank), sent with the tick's events
+                leaderboard = LeaderboardService.get_instance()
+                leaderboard.ensure(state_manager.players) # Rank against every account, not only touched ones
+                leaderboard.touch(player)
+                state_manager.outbound.broadcast({
+                    "type": "level_up",
+                    "player_id": player.id,
+                    "new_level": player.level,
+                    "rank": leaderboard.rank("level", player.id)
+                })
             
             log['next_level_xp'] = player.next_level_xp # Send next level XP for UI update
             
@@ -148,8 +207,7 @@ class CombatService:
             
             # Queue Respawn
             try:
-                from ..engine.state_manager import StateManager
-                sm = StateManager.get_instance()
+                sm = state_manager
                 template = sm.monster_templates.get(monster.template_id)
                 respawn_time = template["respawn_time"] if template else 10.0
                 
@@ -158,7 +216,8 @@ class CombatService:
                     monster.map_id, 
                     monster.spawn_x, 
                     monster.spawn_y, 
-                    respawn_time
+                    respawn_time,
+                    spawn_key=monster.spawn_key
                 )
             except Exception as e:
                 print(f"[ERROR] Respawn queueing failed: {e}")
@@ -192,8 +251,7 @@ class CombatService:
         
         # 2. Items (Drop System)
         from ..engine.state_manager import StateManager
-        from ..data.items import ITEMS
-        import uuid
+        from ..data.items import ITEMS, create_item
         
         template = StateManager.get_instance().monster_templates.get(monster.template_id)
         if template and "drops" in template:
@@ -204,15 +262,8 @@ class CombatService:
                     
                     if item_data:
                         # Create new item instance
-                        new_item = Item(
-                            id=f"{item_template_id}_{uuid.uuid4().hex[:8]}",
-                            name=item_data["name"],
-                            type=item_data["type"],
-                            slot=item_data["slot"],
-                            rarity=item_data["rarity"],
-                            stats=item_data["stats"].copy(),
-                            power_score=item_data["power_score"],
-                            icon=item_data.get("icon", "📦"),
+                        new_item = create_item(
+                            item_template_id,
                             stackable=item_data["type"] in ["consumable", "material"]
                         )
                         InventoryService.add_item(player, new_item)
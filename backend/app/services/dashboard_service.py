@@ -0,0 +1,128 @@
+import asyncio
+import heapq
+import json
+import time
+from datetime import datetime
+from typing import List, Optional
+
+import psutil
+
+from ..core.metrics import Metrics
+from ..engine.state_manager import StateManager
+
+class DashboardFeed:
+    """
+    Admin dashboard stream (GET /admin/dashboard/stream, server-sent events).
+
+    One publisher task builds the dashboard once per interval from data the
+    game loop maintains anyway (the per-tick map index, tick histograms,
+    message counters), encodes it once and hands the same frame to every
+    subscriber. The task only runs while at least one admin is watching, and
+    extra admins cost one queue put each.
+    """
+    _instance = None
+
+    TOP_N = 10
+
+    @staticmethod
+    def get_instance():
+        if DashboardFeed._instance is None:
+            DashboardFeed._instance = DashboardFeed()
+        return DashboardFeed._instance
+
+    def __init__(self, interval: float = 1.0):
+        self.interval = interval
+        self.subscribers: List[asyncio.Queue] = []
+        self.task: Optional[asyncio.Task] = None
+        self.latest: Optional[dict] = None
+        self.last_messages = 0.0
+        self.last_sample = time.time()
+
+    def build(self) -> dict:
+        sm = StateManager.get_instance()
+        metrics = Metrics.get_instance()
+        map_players = sm.map_players or {}
+
+        populations = {map_id: len(players) for map_id, players in map_players.items()}
+        online = sum(populations.values())
+
+        top = heapq.nlargest(
+            self.TOP_N,
+            (p for players in map_players.values() for p in players),
+            key=lambda p: p.level
+        )
+
+        # Message rate since the previous sample
+        now = time.time()
+        sent = sum(v for (name, _), v in metrics.counters.items() if name == "ws_messages_sent")
+        elapsed = max(now - self.last_sample, 0.001)
+        rate = (sent - self.last_messages) / elapsed if self.latest else 0.0
+        self.last_messages = sent
+        self.last_sample = now
+
+        tick = metrics.histograms.get("tick")
+        tick_ms = {k: round(v * 1000, 2) for k, v in tick.percentiles().items()} if tick else {}
+
+        return {
+            "online_players": online,
+            "total_players": len(sm.players),
+            # Non-blocking: usage since the previous call
+            "cpu_usage": psutil.cpu_percent(interval=None),
+            "memory_usage": psutil.virtual_memory().percent,
+            "top_players": [
+                {"id": p.id, "name": p.name, "level": p.level, "map_id": p.current_map_id}
+                for p in top
+            ],
+            "map_populations": dict(sorted(populations.items(), key=lambda kv: -kv[1])),
+            "tick_ms": tick_ms,
+            "messages_per_second": round(rate, 1),
+            "server_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        }
+
+    def snapshot(self) -> dict:
+        # Page render: reuse the streamed snapshot while the feed is running
+        if self.latest is None or self.task is None or self.task.done():
+            self.latest = self.build()
+        return self.latest
+
+    async def publish_loop(self):
+        while self.subscribers:
+            try:
+                self.latest = self.build()
+                frame = f"data: {json.dumps(self.latest)}\n\n"
+            except Exception as e:
+                print(f"[Dashboard] Snapshot error: {e}")
+                frame = None
+
+            if frame:
+                for queue in list(self.subscribers):
+                    if queue.full():
+                        # Slow reader: drop its stale frame, keep the newest
+                        queue.get_nowait()
+                    queue.put_nowait(frame)
+            await asyncio.sleep(self.interval)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=1)
+        self.subscribers.append(queue)
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.publish_loop())
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        if queue in self.subscribers:
+            self.subscribers.remove(queue)
+
+    async def stream(self, request):
+        queue = self.subscribe()
+        try:
+            while True:
+                try:
+                    frame = await asyncio.wait_for(queue.get(), timeout=15.0)
+                except asyncio.TimeoutError:
+                    frame = ": keep-alive\n\n"
+                if await request.is_disconnected():
+                    break
+                yield frame
+        finally:
+            self.unsubscribe(queue)
@@ -1,5 +1,5 @@
 from ..models.player import Player
-from ..models.item import Item, ItemSlot
+from ..models.item import Item, ItemSlot, ItemType, BulkItemQuery
 
 class InventoryService:
     
@@ -11,11 +11,11 @@ class InventoryService:
         """
         # Check for stacking
         if item.stackable:
-            for existing_item in player.inventory:
-                if existing_item.name == item.name and existing_item.type == item.type:
-                    existing_item.quantity += item.quantity
-                    InventoryService.check_mission_progress(player, item)
-                    return
+            existing_item = player.inventory.find_stack(item)
+            if existing_item:
+                existing_item.quantity += item.quantity
+                InventoryService.check_mission_progress(player, item)
+                return
         elif item.quantity > 1:
             # Item is NOT stackable but has quantity > 1 (e.g. from Reward)
             # We must split it into multiple items.
@@ -26,11 +26,10 @@ class InventoryService:
             InventoryService.add_single_item_no_stack(player, item)
             
             # Add the rest as copies
-            # We need to deep copy or create new instances.
-            # Since we don't wonder about perfect cloning here, we can rely on model_copy()
+            # clone() keeps the shared prototype stats and copies per-instance state
+            base_id = item.template_id or item.id.split('_')[0]
             for _ in range(qty_to_add - 1):
-                new_copy = item.model_copy(deep=True)
-                new_copy.id = f"{item.id.split('_')[0]}_{InventoryService.generate_uuid()}"
+                new_copy = item.clone(f"{base_id}_{InventoryService.generate_uuid()}")
                 InventoryService.add_single_item_no_stack(player, new_copy)
             
             InventoryService.check_mission_progress(player, item) # Count progress for all? logic complex. 
@@ -104,7 +103,173 @@ class InventoryService:
                  pass
 
     @staticmethod
-    def equip_item(player: Player, item: Item):
+    def select_items(player: Player, query: BulkItemQuery):
+        """
+        Resolves a bulk query against the inventory.
+        Returns (items, missing_ids). Filters apply on top of explicit ids.
+        """
+        missing = []
+        if query.item_ids is not None:
+            candidates = []
+            for item_id in dict.fromkeys(query.item_ids): # Dedupe, keep order
+                item = player.inventory.get(item_id)
+                if item:
+                    candidates.append(item)
+                else:
+                    missing.append(item_id)
+        else:
+            candidates = list(player.inventory)
+
+        items = [
+            i for i in candidates
+            if (query.rarity is None or i.rarity == query.rarity)
+            and (query.type is None or i.type == query.type)
+        ]
+        return items, missing
+
+    @staticmethod
+    def get_sell_price(item: Item) -> int:
+        # Simple price calculation (per unit)
+        return item.power_score * 2 + 5
+
+    @staticmethod
+    def sell_items(player: Player, items: list) -> list:
+        """Sells whole stacks. Inventory is rebuilt once at the end."""
+        results = []
+        for item in items:
+            gold = InventoryService.get_sell_price(item) * item.quantity
+            player.gold += gold
+            results.append({"item_id": item.id, "name": item.name, "quantity": item.quantity, "ok": True, "gold": gold})
+
+        player.inventory.remove_many(items)
+        return results
+
+    @staticmethod
+    def apply_consumable(player: Player, item: Item, quantity: int = 1):
+        """
+        Applies a consumable's effects `quantity` times (does not remove it).
+        Returns (effects, level_result or None).
+        """
+        effects = []
+        level_result = None
+
+        if item.stats.hp > 0:
+            hp_before = player.stats.hp
+            player.stats.hp = min(player.stats.hp + item.stats.hp * quantity, player.stats.max_hp)
+            effects.append(f"Healed {player.stats.hp - hp_before} HP")
+            
+        if item.stats.xp > 0:
+            xp = item.stats.xp * quantity
+            level_result = player.gain_xp(xp)
+            effects.append(f"Gained {xp} XP")
+            if level_result['leveled_up']:
+                effects.append(f"Leveled Up to {level_result['new_level']}!")
+                
+        if item.stats.gold > 0:
+            player.gold += item.stats.gold * quantity
+            effects.append(f"Gained {item.stats.gold * quantity} Gold")
+            
+        if item.stats.diamonds > 0:
+            player.diamonds += item.stats.diamonds * quantity
+            effects.append(f"Gained {item.stats.diamonds * quantity} Diamonds")
+
+        return effects, level_result
+
+    @staticmethod
+    def useful_units(player: Player, item: Item, requested: int) -> int:
+        # Pure healing items stop once HP is full; the rest of the stack is kept
+        stats = item.stats
+        if stats.hp > 0 and not (stats.xp > 0 or stats.gold > 0 or stats.diamonds > 0):
+            missing = player.stats.max_hp - player.stats.hp
+            return min(requested, max(0, -(-missing // stats.hp)))
+        return requested
+
+    @staticmethod
+    def use_items(player: Player, items: list, quantities: dict = None):
+        """
+        Uses consumables: quantities[item_id] units when given, else the whole
+        stack (healing items only up to max HP). Only applied units are consumed.
+        Returns (results, leveled_up). Non-consumables are skipped.
+        """
+        results = []
+        used = []
+        leveled_up = False
+        for item in items:
+            if item.type != ItemType.CONSUMABLE:
+                results.append({"item_id": item.id, "name": item.name, "ok": False, "error": "Item is not consumable"})
+                continue
+
+            requested = item.quantity
+            if quantities and item.id in quantities:
+                requested = max(0, min(item.quantity, quantities[item.id]))
+            units = InventoryService.useful_units(player, item, requested)
+            if units == 0:
+                error = "HP already full" if requested else "Quantity is 0"
+                results.append({"item_id": item.id, "name": item.name, "ok": False, "error": error})
+                continue
+
+            effects, level_result = InventoryService.apply_consumable(player, item, units)
+            if level_result and level_result['leveled_up']:
+                leveled_up = True
+            results.append({"item_id": item.id, "name": item.name, "quantity": units, "ok": True, "effects": effects})
+            if units == item.quantity:
+                used.append(item)
+            else:
+                item.quantity -= units
+
+        player.inventory.remove_many(used)
+        return results, leveled_up
+
+    @staticmethod
+    def equip_from_inventory(player: Player, item: Item, recalculate: bool = True):
+        """Takes an inventory item (splitting broken unstackable stacks) and equips it."""
+        if item.quantity > 1 and not item.stackable:
+            # Split item for equipping because it's a stack of unstackable items (bug fix)
+            # Create a clone for equip with a new UUID suffix
+            base_id = item.template_id or item.id.split('_')[0]
+            final_item = item.clone(f"{base_id}_{InventoryService.generate_uuid()}")
+            final_item.quantity = 1
+            
+            # Decrement original stack
+            item.quantity -= 1
+            
+            # Equip the new single item
+            InventoryService.equip_item(player, final_item, recalculate)
+        else:
+            # Normal behavior: Remove and equip
+            player.inventory.remove(item)
+            InventoryService.equip_item(player, item, recalculate)
+
+    @staticmethod
+    def equip_items(player: Player, items: list) -> list:
+        """
+        Equips at most one item per slot (the highest power_score, first on
+        ties); other matches for that slot are reported as skipped.
+        Stats are recalculated once.
+        """
+        best = {}
+        for item in items:
+            if item.slot != ItemSlot.NONE and (item.slot not in best or item.power_score > best[item.slot].power_score):
+                best[item.slot] = item
+
+        results = []
+        for item in items:
+            if item.slot == ItemSlot.NONE:
+                results.append({"item_id": item.id, "name": item.name, "ok": False, "error": "Item is not equipment"})
+                continue
+            if best[item.slot] is not item:
+                results.append({"item_id": item.id, "name": item.name, "ok": False, "skipped": True,
+                                "error": f"Another item was equipped to {item.slot.value}"})
+                continue
+            InventoryService.equip_from_inventory(player, item, recalculate=False)
+            results.append({"item_id": item.id, "name": item.name, "ok": True, "slot": item.slot})
+
+        if any(r["ok"] for r in results):
+            player.calculate_stats()
+        return results
+
+    @staticmethod
+    def equip_item(player: Player, item: Item, recalculate: bool = True):
         """
         Equips an item, moving the old one to inventory.
         """
@@ -123,8 +288,9 @@ class InventoryService:
         # Add stats from new item
         player.equipment[slot] = item
         
-        # Recalculate stats cleanly
-        player.calculate_stats()
+        # Recalculate stats cleanly (bulk equips do it once at the end)
+        if recalculate:
+            player.calculate_stats()
 
     @staticmethod
     def unequip_item(player: Player, slot: str):
@@ -0,0 +1,111 @@
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+class LeaderboardService:
+    """
+    Ranked indexes over all accounts: level (+xp), combat power, gold and
+    missions completed.
+
+    Each board is a bisect-maintained list of (negated score, player_id), so
+    rank lookups are a bisect (O(log n)) and pages are slices. touch() is
+    called where scores change (kill rewards, mission claims, purchases,
+    admin edits); GameLoop also reconciles online players once a second for
+    the remaining changes (equipment, attribute points).
+    """
+    _instance = None
+
+    BOARDS = ("level", "power", "gold", "missions")
+
+    @staticmethod
+    def get_instance():
+        if LeaderboardService._instance is None:
+            LeaderboardService._instance = LeaderboardService()
+        return LeaderboardService._instance
+
+    def __init__(self):
+        self.entries: Dict[str, List[tuple]] = {board: [] for board in self.BOARDS}
+        # player_id -> {board: indexed entry}
+        self.indexed: Dict[str, Dict[str, tuple]] = {}
+
+    @staticmethod
+    def scores(player) -> Dict[str, tuple]:
+        return {
+            "level": (player.level, player.xp),
+            "power": (player.get_combat_power(),),
+            "gold": (player.gold,),
+            "missions": (len(player.completed_missions),)
+        }
+
+    @staticmethod
+    def make_entry(score: tuple, player_id: str) -> tuple:
+        # Negated so ascending order is best-first; ties ordered by id
+        return tuple(-v for v in score) + (player_id,)
+
+    def rebuild(self, players: dict):
+        self.indexed = {}
+        entries = {board: [] for board in self.BOARDS}
+        for pid, p in players.items():
+            row = {board: self.make_entry(score, pid) for board, score in self.scores(p).items()}
+            self.indexed[pid] = row
+            for board, entry in row.items():
+                entries[board].append(entry)
+        for board in entries:
+            entries[board].sort()
+        self.entries = entries
+
+    def ensure(self, players: dict):
+        if len(self.indexed) != len(players):
+            self.rebuild(players)
+
+    def touch(self, player):
+        row = self.indexed.setdefault(player.id, {})
+        for board, score in self.scores(player).items():
+            entry = self.make_entry(score, player.id)
+            old = row.get(board)
+            if old == entry:
+                continue
+            entries = self.entries[board]
+            if old is not None:
+                i = bisect_left(entries, old)
+                if i < len(entries) and entries[i] == old:
+                    del entries[i]
+            insort(entries, entry)
+            row[board] = entry
+
+    def remove(self, player_id: str):
+        row = self.indexed.pop(player_id, None)
+        if not row:
+            return
+        for board, old in row.items():
+            entries = self.entries[board]
+            i = bisect_left(entries, old)
+            if i < len(entries) and entries[i] == old:
+                del entries[i]
+
+    def sync(self, players: dict, online: List):
+        if len(self.indexed) != len(players):
+            self.rebuild(players)
+            return
+        for p in online:
+            self.touch(p)
+
+    def rank(self, board: str, player_id: str) -> Optional[int]:
+        """1-based rank, or None if the player isn't indexed."""
+        row = self.indexed.get(player_id)
+        if not row:
+            return None
+        return bisect_left(self.entries[board], row[board]) + 1
+
+    def page(self, board: str, offset: int = 0, limit: int = 50) -> List[Tuple[int, str, tuple]]:
+        """[(rank, player_id, score)] for one page of a board."""
+        rows = []
+        for i, entry in enumerate(self.entries[board][offset:offset + limit]):
+            rows.append((offset + i + 1, entry[-1], tuple(-v for v in entry[:-1])))
+        return rows
+
+    def around(self, board: str, player_id: str, radius: int = 5) -> List[Tuple[int, str, tuple]]:
+        rank = self.rank(board, player_id)
+        if rank is None:
+            return []
+        start = max(0, rank - 1 - radius)
+        return self.page(board, start, radius * 2 + 1)
@@ -0,0 +1,103 @@
+import json
+from typing import Callable, Dict, List, Optional, Tuple
+
+class ListingService:
+    """
+    Area filter, field projection and cursor pagination for map entity
+    listings. Rows are built straight from model attributes (no
+    model_dump / response validation) and serialized with json.dumps.
+    """
+
+    MAX_LIMIT = 500
+
+    # Projectable fields -> getter. "stats" sub-fields are flattened (hp, max_hp).
+    MONSTER_FIELDS: Dict[str, Callable] = {
+        "id": lambda m: m.id,
+        "template_id": lambda m: m.template_id,
+        "name": lambda m: m.name,
+        "level": lambda m: m.level,
+        "m_type": lambda m: m.m_type.value,
+        "map_id": lambda m: m.map_id,
+        "position_x": lambda m: m.position_x,
+        "position_y": lambda m: m.position_y,
+        "hp": lambda m: m.stats.hp,
+        "max_hp": lambda m: m.stats.max_hp,
+        "state": lambda m: m.state,
+        "target_id": lambda m: m.target_id,
+        "model_scale": lambda m: m.model_scale,
+    }
+    MONSTER_DEFAULT_FIELDS = ["id", "template_id", "position_x", "position_y", "hp", "max_hp"]
+
+    PLAYER_FIELDS: Dict[str, Callable] = {
+        "id": lambda p: p.id,
+        "name": lambda p: p.name,
+        "level": lambda p: p.level,
+        "p_class": lambda p: p.p_class.value,
+        "position": lambda p: {"x": p.position.x, "y": p.position.y},
+        "x": lambda p: p.position.x,
+        "y": lambda p: p.position.y,
+        "hp": lambda p: p.stats.hp,
+        "max_hp": lambda p: p.stats.max_hp,
+        "state": lambda p: p.state.value,
+    }
+    PLAYER_DEFAULT_FIELDS = ["id", "name", "level", "p_class", "position", "hp", "max_hp", "state"]
+
+    @staticmethod
+    def parse_fields(fields: Optional[str], allowed: Dict[str, Callable], default: List[str]) -> List[str]:
+        """Comma separated field list -> validated names. Raises ValueError on unknown fields."""
+        if not fields:
+            return default
+        names = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [f for f in names if f not in allowed]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}. Allowed: {', '.join(allowed)}")
+        if "id" not in names:
+            names.insert(0, "id") # Needed for the cursor
+        return names
+
+    @staticmethod
+    def in_area(x: float, y: float, area: dict) -> bool:
+        if "radius" in area:
+            return (x - area["x"]) ** 2 + (y - area["y"]) ** 2 <= area["radius"] ** 2
+        return area["min_x"] <= x <= area["max_x"] and area["min_y"] <= y <= area["max_y"]
+
+    @staticmethod
+    def make_area(x: float = None, y: float = None, radius: float = None,
+                  min_x: float = None, min_y: float = None, max_x: float = None, max_y: float = None) -> Optional[dict]:
+        """Radius around (x, y) or a bounding box; any missing box edge is open."""
+        if radius is not None:
+            if x is None or y is None:
+                raise ValueError("radius requires x and y")
+            return {"x": x, "y": y, "radius": radius}
+        if any(v is not None for v in (min_x, min_y, max_x, max_y)):
+            return {
+                "min_x": min_x if min_x is not None else float("-inf"),
+                "min_y": min_y if min_y is not None else float("-inf"),
+                "max_x": max_x if max_x is not None else float("inf"),
+                "max_y": max_y if max_y is not None else float("inf"),
+            }
+        return None
+
+    @staticmethod
+    def paginate(entities: list, limit: Optional[int], cursor: Optional[str]) -> Tuple[list, Optional[str]]:
+        """
+        Stable order by id; cursor is the last id of the previous page.
+        Returns (page, next_cursor) with next_cursor None on the last page.
+        """
+        if limit is None and cursor is None:
+            return entities, None
+
+        entities = sorted(entities, key=lambda e: e.id)
+        if cursor is not None:
+            entities = [e for e in entities if e.id > cursor]
+
+        limit = max(1, min(limit or ListingService.MAX_LIMIT, ListingService.MAX_LIMIT))
+        page = entities[:limit]
+        next_cursor = page[-1].id if len(entities) > limit else None
+        return page, next_cursor
+
+    @staticmethod
+    def project(entities: list, getters: Dict[str, Callable], fields: List[str]) -> bytes:
+        selected = [(name, getters[name]) for name in fields]
+        rows = [{name: get(e) for name, get in selected} for e in entities]
+        return json.dumps(rows, separators=(",", ":")).encode()
@@ -36,16 +36,60 @@ class MovementService:
             return False
 
     @staticmethod
-    def update_player_position(player: Player, game_map: GameMap, dt: float):
-        # For this prototype, we assume simple movement towards a target monster or portal
-        # If player is in MOVING state, they are moving towards something.
-        # But we need a destination. For now, let's assume the client sends a "Move to (x,y)" command
-        # and we store that target in the player object (we might need to add it).
-        
-        # Let's add a temporary target to the player model or just assume they move to (0,0) for now if no target?
-        # The prompt says: "Castle -> Portal -> Forest -> Mob".
-        # So the player has a destination.
-        
-        # We need to add 'target_position' to Player model or handle it here.
-        # Let's assume we added it or we use a simple logic for now.
-        pass
+    def switch_map(player: Player, target_map: GameMap, target_map_id: str, x: float, y: float) -> str:
+        """
+        Places the player on another map (portal use). Level requirements are
+        checked by the caller. Returns the map the player left.
+        """
+        # Update Respawn if Castle
+        if target_map and target_map.type == "castle":
+            player.respawn_map_id = target_map_id
+
+        old_map_id = player.current_map_id
+
+        player.current_map_id = target_map_id
+        player.position.x = x
+        player.position.y = y
+        player.state = PlayerState.IDLE
+        player.target_position = None
+        player.target_monster_id = None # Clear combat target
+        return old_map_id
+
+    @staticmethod
+    def update_player_position(player: Player, game_map: GameMap, dt: float) -> bool:
+        """
+        Moves the player along a path around map obstacles towards
+        player.target_position. The path is planned (NavGrid, cached) whenever
+        a new target is set; an uncached search runs a slice per tick and the
+        player waits until it completes. Returns True once the target is
+        reached or turns out to be unreachable.
+        """
+        target = player.target_position
+        if not target:
+            return True
+
+        if player.path_for is not target:
+            # New command: plan once, then just follow waypoints
+            from ..engine.state_manager import StateManager
+            grid = StateManager.get_instance().get_nav_grid(game_map.id) if game_map else None
+            player.path_for = target
+            player.waypoints = [(target.x, target.y)]
+            player.planner = grid.plan(player.position.x, player.position.y, target.x, target.y) if grid else None
+
+        if player.planner:
+            try:
+                next(player.planner)
+                return False # Still searching
+            except StopIteration as done:
+                player.planner = None
+                player.waypoints = done.value or []
+                if done.value is None:
+                    return True # Unreachable
+
+        if not player.waypoints:
+            return True
+
+        wx, wy = player.waypoints[0]
+        if MovementService.move_towards_target(player, wx, wy, dt):
+            player.waypoints.pop(0)
+        return not player.waypoints
@@ -4,6 +4,7 @@ import asyncio
 from typing import Dict
 from ..models.player import Player
 from ..engine.state_manager import StateManager
+from ..core.metrics import Metrics
 
 # Use absolute path relative to CWD (root of project)
 DATA_DIR = os.path.abspath("data")
@@ -64,10 +65,12 @@ class PersistenceService:
         self.saving = True
         try:
             # Create a snapshot of data to write
-            players_data = {
-                pid: player.dict() 
-                for pid, player in self.state_manager.players.items()
-            }
+            # Compact items only store what differs from their prototype
+            with Metrics.get_instance().span("persistence_snapshot"):
+                players_data = {
+                    pid: player.model_dump(context={"compact_items": True})
+                    for pid, player in self.state_manager.players.items()
+                }
             
             # Write to temp file then rename for atomic write
             temp_file = PLAYERS_FILE + ".tmp"
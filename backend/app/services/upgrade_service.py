@@ -7,6 +7,7 @@ from ..services.inventory_service import InventoryService
 from ..engine.state_manager import StateManager
 
 CONFIG_PATH = "backend/app/data/enhancement_config.json"
+CATALYST_ID = "item_catalyst"
 
 class UpgradeService:
     # Default Configuration
@@ -36,6 +37,9 @@ class UpgradeService:
     }
     
     config = DEFAULT_CONFIG
+    # Dense lookup tables compiled from config (see compile_tables).
+    # Replaced as a whole, never mutated, so readers always see one consistent version.
+    tables = None
 
     @classmethod
     def load_config(cls):
@@ -74,15 +78,69 @@ class UpgradeService:
         else:
             cls.save_config() # Create default
 
+        cls.tables = cls.compile_tables(cls.config)
+
     @classmethod
-    def save_config(cls):
+    def save_config(cls, config: dict = None):
+        # Compile first: an invalid config raises here and the old config + tables stay live
+        config = cls.config if config is None else config
+        tables = cls.compile_tables(config)
+        cls.config, cls.tables = config, tables
         os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
         with open(CONFIG_PATH, "w") as f:
-            json.dump(cls.config, f, indent=4)
+            json.dump(config, f, indent=4)
+
+    @classmethod
+    def compile_tables(cls, config: dict) -> dict:
+        """
+        Expands the config into per-level arrays (index = enhancement level):
+        success rate, catalyst cost per rarity and stat multiplier per rarity.
+        """
+        max_level = int(config.get("max_level", cls.DEFAULT_CONFIG["max_level"]))
+        cost_mults = config.get("cost_multipliers", cls.DEFAULT_CONFIG["cost_multipliers"])
+        bonus_pcts = config.get("stat_bonus_percent", cls.DEFAULT_CONFIG["stat_bonus_percent"])
+        levels = range(max_level + 1)
+
+        costs = {}
+        stat_multipliers = {}
+        for rarity in ItemRarity:
+            mult = float(cost_mults.get(rarity.value, 1.0))
+            costs[rarity.value] = [int((1 + level) * mult) for level in levels]
+
+            # Compound formula: (1 + pct/100) ^ level. Default 5% if config missing
+            step = 1.0 + (float(bonus_pcts.get(rarity.value, 5.0)) / 100.0)
+            stat_multipliers[rarity.value] = [step ** level for level in levels]
+
+        return {
+            "max_level": max_level,
+            "success_rates": [cls.lookup_success_rate(config, level) for level in levels],
+            "costs": costs,
+            "stat_multipliers": stat_multipliers,
+            "bonus_percent": {r.value: float(bonus_pcts.get(r.value, 5.0)) for r in ItemRarity},
+            "failure_penalty_percent": float(config.get("failure_penalty_percent", cls.DEFAULT_CONFIG["failure_penalty_percent"]))
+        }
 
     @classmethod
     def get_success_rate(cls, level: int) -> int:
-        rates = cls.config.get("success_rates", {})
+        rates = cls.tables["success_rates"]
+        if 0 <= level < len(rates):
+            return rates[level]
+        return cls.lookup_success_rate(cls.config, level)
+
+    @classmethod
+    def get_stat_multiplier(cls, rarity: str, level: int) -> float:
+        if level <= 0:
+            return 1.0
+        tables = cls.tables
+        multipliers = tables["stat_multipliers"].get(rarity)
+        if multipliers and level < len(multipliers):
+            return multipliers[level]
+        # Above max level (e.g. max_level lowered after items were upgraded)
+        return (1.0 + tables["bonus_percent"].get(rarity, 5.0) / 100.0) ** level
+
+    @staticmethod
+    def lookup_success_rate(config: dict, level: int) -> int:
+        rates = config.get("success_rates", {})
         
         # 1. Check Exact Match (int or str)
         if level in rates: return rates[level]
@@ -103,6 +161,10 @@ class UpgradeService:
 
     @classmethod
     def get_cost(cls, item: Item) -> int:
+        costs = cls.tables["costs"].get(item.rarity.value)
+        if costs and item.enhancement_level < len(costs):
+            return costs[item.enhancement_level]
+
         mult = cls.config.get("cost_multipliers", {}).get(item.rarity.value, 1.0)
         
         # Scaling cost: (Base 1 + Level) * Multiplier
@@ -111,36 +173,42 @@ class UpgradeService:
 
     @classmethod
     def get_catalyst_count(cls, player: Player) -> int:
-        count = 0
-        for item in player.inventory:
-            if item.id.startswith("item_catalyst"):
-                count += item.quantity
-        return count
+        return player.inventory.count_template(CATALYST_ID)
 
     @classmethod
     def consume_catalysts(cls, player: Player, amount: int):
         remaining = amount
         to_remove = []
         
-        # Iterate inventory to consume
-        for item in player.inventory:
-            if item.id.startswith("item_catalyst"):
-                if item.quantity >= remaining:
-                    item.quantity -= remaining
-                    remaining = 0
-                    if item.quantity == 0:
-                        to_remove.append(item)
-                    break
-                else:
-                    remaining -= item.quantity
-                    item.quantity = 0
+        # Consume from catalyst stacks only
+        for item in player.inventory.by_template(CATALYST_ID):
+            if item.quantity >= remaining:
+                item.quantity -= remaining
+                remaining = 0
+                if item.quantity == 0:
                     to_remove.append(item)
+                break
+            else:
+                remaining -= item.quantity
+                item.quantity = 0
+                to_remove.append(item)
         
         for item in to_remove:
             player.inventory.remove(item)
 
+    @staticmethod
+    def find_item(player: Player, item_instance_id: str):
+        """(item, in_equipment) from the inventory or equipped slots; (None, False) if missing."""
+        item = player.inventory.get(item_instance_id)
+        if item:
+            return item, False
+        for slot, equipped_item in player.equipment.items():
+            if equipped_item and equipped_item.id == item_instance_id:
+                return equipped_item, True
+        return None, False
+
     @classmethod
-    def upgrade_item(cls, player: Player, item_instance_id: str):
+    def upgrade_item(cls, player: Player, item_instance_id: str, recalculate: bool = True):
         # Find item (Inventory or Equipment?)
         # For now, let's assume it MUST be in INVENTORY to upgrade.
         # Or let's support both. Logic is simpler if in Inventory.
@@ -148,21 +216,7 @@ class UpgradeService:
         # Safe to assume we primarily target inventory or unequipped items.
         # But players hate unequipping to upgrade.
         # Let's search both.
-
-        target_item = None
-        in_equipment = False
-        
-        for item in player.inventory:
-            if item.id == item_instance_id:
-                target_item = item
-                break
-        
-        if not target_item:
-            for slot, item in player.equipment.items():
-                if item and item.id == item_instance_id:
-                    target_item = item
-                    in_equipment = True
-                    break
+        target_item, in_equipment = cls.find_item(player, item_instance_id)
         
         if not target_item:
             return {"success": False, "message": "Item not found"}
@@ -170,7 +224,7 @@ class UpgradeService:
         if target_item.rarity in ["common", "uncommon"]:
              return {"success": False, "message": "Item rarity too low"}
 
-        if target_item.enhancement_level >= cls.config["max_level"]:
+        if target_item.enhancement_level >= cls.tables["max_level"]:
              return {"success": False, "message": "Max level reached"}
 
         cost = cls.get_cost(target_item)
@@ -195,8 +249,8 @@ class UpgradeService:
             if item.enhancement_level % 3 == 0:
                 new_buff = cls.roll_awakening(item)
             
-            # Recalculate player stats if equipped
-            if in_equipment:
+            # Recalculate player stats if equipped (batch upgrades do it once at the end)
+            if in_equipment and recalculate:
                 player.calculate_stats()
                 
             msg = f"Upgrade Successful! (+{item.enhancement_level})"
@@ -211,14 +265,16 @@ class UpgradeService:
                 "message": msg,
                 "new_level": item.enhancement_level,
                 "item": item,
-                "catalysts_consumed": cost
+                "catalysts_consumed": cost,
+                "awakening": new_buff,
+                "equipped": in_equipment
             }
         else:
             # Failure
             # Consume reduced amount (simulated by refunding?)
             # Logic: "Perde 50% da quantidade... para o item"
             # Means we consume 50% of the COST. (or consume all and refund 50%?)
-            penalty_pct = cls.config["failure_penalty_percent"] / 100.0
+            penalty_pct = cls.tables["failure_penalty_percent"] / 100.0
             consumed = int(cost * penalty_pct)
             if consumed < 1: consumed = 1 # Minimum 1
             
@@ -228,8 +284,70 @@ class UpgradeService:
                 "success": False, 
                 "message": "Upgrade Failed...",
                 "item": target_item,
-                "catalysts_consumed": consumed
+                "catalysts_consumed": consumed,
+                "equipped": in_equipment
+            }
+
+    @classmethod
+    def upgrade_item_batch(cls, player: Player, item_instance_id: str, target_level: int = None, max_catalysts: int = None, max_rolls: int = 100):
+        """
+        Repeats upgrade_item server-side until the item reaches target_level
+        (default: max level), the catalyst budget would be exceeded, catalysts
+        run out, or max_rolls is hit. Player stats are recalculated once at the end.
+        Returns a compact per-roll result list.
+        """
+        max_level = cls.tables["max_level"]
+        if target_level is None or target_level > max_level:
+            target_level = max_level
+
+        item, equipped = cls.find_item(player, item_instance_id)
+        if not item:
+            return {"success": False, "message": "Item not found", "item": None, "new_level": None, "rolls": [], "catalysts_consumed": 0}
+
+        rolls = []
+        spent = 0
+        stop_reason = "Target level reached"
+
+        # Checked before every roll, including the first
+        while len(rolls) < max_rolls:
+            if item.enhancement_level >= target_level:
+                break
+            if max_catalysts is not None and spent + cls.get_cost(item) > max_catalysts:
+                stop_reason = "Catalyst budget reached"
+                break
+
+            result = cls.upgrade_item(player, item_instance_id, recalculate=False)
+            if "catalysts_consumed" not in result:
+                # Nothing was rolled (not found, too low rarity, max level, no catalysts)
+                stop_reason = result["message"]
+                break
+
+            item = result["item"]
+            equipped = result["equipped"]
+            spent += result["catalysts_consumed"]
+
+            entry = {
+                "success": result["success"],
+                "level": item.enhancement_level,
+                "cost": result["catalysts_consumed"]
             }
+            if result.get("awakening"):
+                entry["awakening"] = result["awakening"].description()
+            rolls.append(entry)
+        else:
+            stop_reason = "Roll limit reached"
+
+        if equipped and any(r["success"] for r in rolls):
+            player.calculate_stats()
+
+        return {
+            "success": any(r["success"] for r in rolls),
+            "message": stop_reason,
+            "item": item,
+            "new_level": item.enhancement_level,
+            "rolls": rolls,
+            "catalysts_consumed": spent
+        }
 
     @classmethod
     def apply_stats_bonus(cls, item: Item):
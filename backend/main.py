@@ -1,9 +1,10 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, PlainTextResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 import asyncio
+import json
 import os
 from typing import List
 
@@ -14,8 +15,28 @@ from .app.engine.game_loop import GameLoop
 from .app.engine.state_manager import StateManager
 from .app.models.monster import Monster, MonsterType, MonsterStats
 from .app.core.logger import logger
+from .app.core.metrics import Metrics
+from .app.core.event_bus import EventBus
+from .app.core.rate_limiter import CommandLimiter
 
 app = FastAPI(docs_url=None, redoc_url=None)
+command_limiter = CommandLimiter.get_instance()
+
+# Registered before CORSMiddleware so CORS stays the outer layer and early 429s carry its headers
+@app.middleware("http")
+async def limit_player_commands(request: Request, call_next):
+    # Per-player token buckets for POST /player/{id}/<action>, checked before routing
+    if request.method == "POST":
+        target = CommandLimiter.parse_path(request.url.path)
+        if target:
+            retry_after = command_limiter.allow(*target)
+            if retry_after:
+                return JSONResponse(
+                    {"detail": "Too many requests"},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, int(retry_after + 0.999)))}
+                )
+    return await call_next(request)
 
 app.add_middleware(
     CORSMiddleware,
@@ -23,6 +44,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "X-Next-Cursor"], # Readable by the browser client (429 retry, listing cursor)
 )
 
 app.include_router(router)
@@ -44,6 +66,13 @@ else:
 
 game_loop = GameLoop()
 state_manager = StateManager.get_instance()
+metrics = Metrics.get_instance()
+event_bus = EventBus.get_instance()
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    # Prometheus scrape target (tick spans, WebSocket message/byte counters)
+    return metrics.prometheus()
 
 # Simple Connection Manager
 class ConnectionManager:
@@ -61,17 +90,34 @@ class ConnectionManager:
 
     async def broadcast(self, message: dict):
         # Broadcast to all connected clients
+        # Serialize once (send_json would re-encode per connection)
+        text = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+        connections = list(self.active_connections.values())
+        metrics.record_message(message, len(text), len(connections))
         # Iterate over a copy to allow safe disconnection during iteration
-        for connection in list(self.active_connections.values()):
+        for connection in connections:
             try:
-                await connection.send_json(message)
+                await connection.send_text(text)
             except:
                 pass
 
     async def send_personal_message(self, client_id: str, message: dict):
         if client_id in self.active_connections:
+            text = json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+            metrics.record_message(message, len(text))
+            try:
+                await self.active_connections[client_id].send_text(text)
+            except:
+                pass
+
+    async def send_frames(self, frames: dict):
+        # Pre-encoded per-client frames (GameLoop's per-tick event flush)
+        for client_id, text in frames.items():
+            connection = self.active_connections.get(client_id)
+            if not connection: continue
+            metrics.record_message({"type": "events"}, len(text))
             try:
-                await self.active_connections[client_id].send_json(message)
+                await connection.send_text(text)
             except:
                 pass
 
@@ -82,6 +128,9 @@ async def startup_event():
     # Inject manager into GameLoop
     game_loop.set_connection_manager(manager)
     state_manager.connection_manager = manager
+
+    # Ordered, bounded dispatch of events published outside the tick
+    asyncio.create_task(event_bus.run(manager))
     
     # Start Game Loop
     logger.info("Starting Game Loop...")
@@ -92,10 +141,18 @@ async def startup_event():
     persistence = PersistenceService.get_instance()
     persistence.load_players()
     asyncio.create_task(persistence.save_players_loop())
+
+    # Optional: reload game data edited on disk (CONTENT_WATCH=1)
+    if os.environ.get("CONTENT_WATCH") == "1":
+        from .app.engine.content_registry import ContentRegistry
+        asyncio.create_task(ContentRegistry.get_instance().watch())
     
-    # Data is loaded by StateManager on init
+    # Optional: replicate live state to API worker processes (see backend/api_worker.py)
+    if os.environ.get("STATE_SOCKET"):
+        from .app.engine.state_service import StateService
+        await StateService(os.environ["STATE_SOCKET"]).start()
 
-import json
+    # Data is loaded by StateManager on init
 
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
@@ -104,13 +161,14 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
     try:
         while True:
             raw = await websocket.receive_text()
+            # Any message (chat, heartbeat) keeps the player online
+            state_manager.update_player_activity(client_id)
             try:
                 data = json.loads(raw)
                 if data.get("type") == "chat":
                     player = state_manager.get_player(client_id)
                     name = player.name if player else "Unknown"
-                    await manager.broadcast({
-                        "type": "chat", 
+                    event_bus.publish("chat", {
                         "player_id": client_id,
                         "name": name,
                         "message": data.get("message")
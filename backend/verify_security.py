@@ -15,7 +15,7 @@ state_manager = StateManager.get_instance()
 # Create Admin
 admin = Player(
     id="admin_id", token="t1", name="admin", password_hash="pqpfdp12345",
-    p_class=PlayerClass.WARRIOR, stats=PlayerStats(hp=100, max_hp=100),
+    p_class=PlayerClass.WARRIOR, stats=PlayerStats(hp=100, max_hp=100, atk=10, def_=5, speed=20.0),
     current_map_id="map1", position=Position(x=0,y=0),
     is_admin=True
 )
@@ -24,7 +24,7 @@ state_manager.add_player(admin)
 # Create User
 user = Player(
     id="user_id", token="t2", name="user", password_hash="hash",
-    p_class=PlayerClass.WARRIOR, stats=PlayerStats(hp=100, max_hp=100),
+    p_class=PlayerClass.WARRIOR, stats=PlayerStats(hp=100, max_hp=100, atk=10, def_=5, speed=20.0),
     current_map_id="map1", position=Position(x=0,y=0),
     is_admin=False
 )
@@ -77,5 +77,19 @@ def test_routes():
     res = client.post("/admin/missions", json={}, headers={"X-Player-ID": "user_id"})
     print(f"[{'PASS' if res.status_code == 403 else f'FAIL ({res.status_code})'}] User POST /admin/missions")
 
+def test_rate_limit_cors():
+    print("\nChecking rate limited cross-origin commands:")
+    origin = {"Origin": "http://localhost:8001"}
+    res = None
+    for _ in range(50):
+        res = client.post("/player/user_id/move", params={"x": 1, "y": 1}, headers=origin)
+        if res.status_code == 429:
+            break
+
+    # The browser only lets the client read the status when CORS headers are present
+    readable = res.status_code == 429 and res.headers.get("access-control-allow-origin") and res.headers.get("retry-after")
+    print(f"[{'PASS' if readable else f'FAIL ({res.status_code})'}] Cross-origin 429 has CORS headers")
+
 if __name__ == "__main__":
     test_routes()
+    test_rate_limit_cors()
@@ -236,6 +236,7 @@ export default {
                     createLevelUpEffect(data.player_id);
                     if (data.player_id === player.value.id) {
                         player.value.level = data.new_level;
+                        if (data.rank) player.value.level_rank = data.rank;
                     }
                 } else if (data.type === 'combat_update') {
                     // DELEGATE TO FCT
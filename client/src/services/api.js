@@ -1,5 +1,5 @@
 import { player, logs, chatMessages, socket, currentMonster, addLog, addAlert, mapMonsters, mapPlayers, mapNpcs, isFreeFarming, selectedTargetId, pendingAttackId, destinationMarker, inspectedPlayer, autoSellInferior, currentMapData, isUpdating, worldData, isManuallyMoving } from '../state.js';
-import { checkAndAct, stopAutoFarm } from './autoFarm.js';
+import { checkAndAct, stopAutoFarm, onServerAutoFarmStopped } from './autoFarm.js';
 import { API_BASE_URL, WS_BASE_URL } from '../config.js';
 
 export const API_URL = API_BASE_URL;
@@ -115,6 +115,7 @@ export const api = {
     async movePlayer(mapId, x, y) {
         if (!player.value) return;
         const res = await fetch(`${API_URL}/player/${player.value.id}/move?target_map_id=${mapId}&x=${x}&y=${y}`, { method: 'POST' });
+        if (res.status === 429) return; // Rate limited: the next resend corrects us
         if (!res.ok) {
             const data = await res.json();
             addAlert(data.detail || "Cannot move there!", 'error', '🚫');
@@ -137,6 +138,14 @@ export const api = {
         player.value.state = 'idle';
     },
 
+    // Server-side auto-farm: the game loop walks/fights for us, we only get batch updates
+    async startServerAutoFarm(params) {
+        if (!player.value) return false;
+        const query = new URLSearchParams(Object.entries(params).filter(([, v]) => v)).toString();
+        const res = await fetch(`${API_URL}/player/${player.value.id}/auto_farm/start?${query}`, { method: 'POST' });
+        return res.ok;
+    },
+
     async attackMonster(monsterId) {
         if (!player.value) return;
         player.value.state = 'combat';
@@ -422,6 +431,8 @@ export const api = {
     }
 };
 
+let heartbeatTimer = null;
+
 export const connectWebSocket = (playerId) => {
     if (socket.value) return;
 
@@ -429,11 +440,25 @@ export const connectWebSocket = (playerId) => {
 
     socket.value.onopen = () => {
         addLog('Connected to server.', 'text-green-500');
+        // Presence: the server marks players offline after 5s without activity
+        heartbeatTimer = setInterval(() => {
+            if (socket.value && socket.value.readyState === WebSocket.OPEN) {
+                socket.value.send(JSON.stringify({ type: 'heartbeat' }));
+            }
+        }, 2000);
     };
 
     socket.value.onmessage = async (event) => {
         const data = JSON.parse(event.data);
 
+        if (data.type === 'events') {
+            // Per-tick frame: replay each event to every listener (this one and GameMap)
+            for (const e of data.events) {
+                socket.value.dispatchEvent(new MessageEvent('message', { data: JSON.stringify(e) }));
+            }
+            return;
+        }
+
         if (data.type === 'combat_update') {
             handleCombatUpdate(data);
         } else if (data.type === 'combat_drops') {
@@ -519,6 +544,33 @@ export const connectWebSocket = (playerId) => {
                     }
                 }
             }
+        } else if (data.type === 'auto_farm_stopped') {
+            onServerAutoFarmStopped(data.reason);
+        } else if (data.type === 'map_update') {
+            // Incremental world reload: only this map's changed spawns are sent
+            if (player.value && data.map_id === player.value.current_map_id) {
+                if (data.removed_monsters.length) {
+                    const removed = new Set(data.removed_monsters);
+                    mapMonsters.value = mapMonsters.value.filter(m => !removed.has(m.id));
+                }
+                if (data.added_monsters.length) {
+                    mapMonsters.value = [...mapMonsters.value, ...data.added_monsters];
+                }
+                if (data.map_changed) api.fetchMapDetails(data.map_id);
+            }
+            if (data.map_changed || data.portals_changed) {
+                try {
+                    const worldRes = await fetch(`${API_URL}/editor/world`);
+                    if (worldRes.ok) worldData.value = await worldRes.json();
+                } catch (e) { console.error(e); }
+            }
+        } else if (data.type === 'world_update') {
+            if (data.portals_changed) {
+                try {
+                    const worldRes = await fetch(`${API_URL}/editor/world`);
+                    if (worldRes.ok) worldData.value = await worldRes.json();
+                } catch (e) { console.error(e); }
+            }
         } else if (data.type === 'server_update') {
             isUpdating.value = true;
 
@@ -549,6 +601,12 @@ export const connectWebSocket = (playerId) => {
             if (inspectedPlayer.value && inspectedPlayer.value.id === data.player_id) {
                 inspectedPlayer.value = null;
             }
+        } else if (data.type === 'players_left') {
+            const left = new Set(data.player_ids);
+            mapPlayers.value = mapPlayers.value.filter(p => !left.has(p.id));
+            if (inspectedPlayer.value && left.has(inspectedPlayer.value.id)) {
+                inspectedPlayer.value = null;
+            }
         } else if (data.type === 'player_left_map') {
             // Remove player if they left OUR current map
             if (player.value && data.map_id === player.value.current_map_id) {
@@ -559,6 +617,8 @@ export const connectWebSocket = (playerId) => {
 
     socket.value.onclose = () => {
         addLog('Disconnected from server.', 'text-red-500');
+        clearInterval(heartbeatTimer);
+        heartbeatTimer = null;
         socket.value = null;
         stopAutoFarm();
     };
@@ -4,11 +4,13 @@ import { api } from './api.js';
 import { pathfinder } from './Pathfinder.js';
 
 let autoFarmInterval = null;
+let serverFarming = false; // Combat farming runs in the server game loop
 
 export const startAutoFarm = () => {
     if (autoFarmInterval) {
         clearInterval(autoFarmInterval);
     }
+    serverFarming = false;
     addLog("Starting Auto-Farm Logic...", "text-gray-500");
     checkAndAct();
     autoFarmInterval = setInterval(checkAndAct, 1000);
@@ -19,6 +21,7 @@ export const stopAutoFarm = (stopServer = true) => {
         clearInterval(autoFarmInterval);
         autoFarmInterval = null;
     }
+    serverFarming = false;
     isFreeFarming.value = false;
     currentMonster.value = null; // Clear UI
     activeMission.value = null; // Clear active mission tracking
@@ -45,10 +48,29 @@ export const startMission = async (mission) => {
     // Fix: Prioritize monster ID for combat missions, otherwise template ID
     selectedTargetId.value = mission.target_monster_id || mission.target_template_id;
 
-    // Start Auto-Farm loop for ALL mission types (including Talk/Delivery)
+    // Kill missions are farmed by the server; Talk/Delivery/Gather keep the client loop
+    if ((mission.type || 'kill') === 'kill' && await startServerAutoFarm({ mission_id: mission.id })) return;
     startAutoFarm();
 };
 
+// Falls back to the client loop if the server refuses (e.g. older server)
+const startServerAutoFarm = async (params) => {
+    if (autoFarmInterval) {
+        clearInterval(autoFarmInterval);
+        autoFarmInterval = null;
+    }
+    if (!await api.startServerAutoFarm(params)) return false;
+    serverFarming = true;
+    addLog("Auto-Farm running on server.", "text-gray-500");
+    return true;
+};
+
+export const onServerAutoFarmStopped = (reason) => {
+    if (!serverFarming) return;
+    addLog(`Auto-Farm stopped: ${reason}`, "text-yellow-400");
+    stopAutoFarm(false);
+};
+
 export const stopMission = (reason = "") => {
     stopAutoFarm();
     addLog(`Mission Paused. ${reason}`, "text-yellow-400");
@@ -68,13 +90,16 @@ export const toggleFreeFarm = () => {
         if (player.value) {
             selectedMapId.value = player.value.current_map_id;
         }
-        startAutoFarm();
+        startServerAutoFarm({ map_id: selectedMapId.value }).then(ok => {
+            if (!ok) startAutoFarm();
+        });
     }
 };
 
 let isProcessing = false;
 
 export const checkAndAct = async () => {
+    if (serverFarming) return;
     if (isProcessing) return;
     if (!player.value) return;
 
@@ -107,10 +132,7 @@ export const checkAndAct = async () => {
 
             //console.log(`[AutoFarm] Wrong Map. Finding path from ${player.value.current_map_id} to ${requiredMapId}...`);
 
-            // Lazy load world data
-            if (!pathfinder.worldData) await pathfinder.init();
-
-            const path = pathfinder.findPath(player.value.current_map_id, requiredMapId);
+            const path = await pathfinder.findPath(player.value.id, requiredMapId);
 
             if (!path || path.length === 0) {
                 //console.warn(`[AutoFarm] NO KEY FOUND from ${player.value.current_map_id} to ${requiredMapId}`);